@@ -36,6 +36,15 @@ def set_backend(backend, custom_optimizer=None):
         >>> import tensorflow as tf
         >>> pyhf.set_backend(pyhf.tensor.tensorflow_backend(session=tf.Session()))
 
+    The floating point precision of the evaluation is set on the backend,
+    e.g. ``pyhf.tensor.numpy_backend(precision='32b')``. The log-likelihood
+    sums are accumulated in double precision in either case.
+
+    The SciPy optimizer can be used with the PyTorch and TensorFlow backends
+    as well, e.g. ``pyhf.set_backend(pyhf.tensor.pytorch_backend(),
+    pyhf.optimize.scipy_optimizer())``, in which case the gradient of the
+    objective is evaluated through the autodiff of the backend.
+
     Args:
         backend: One of the supported pyhf backends: NumPy,
                  TensorFlow, PyTorch, and MXNet
@@ -48,6 +57,7 @@ def set_backend(backend, custom_optimizer=None):
 
     # need to determine if the tensorlib changed or the optimizer changed for events
     tensorlib_changed = bool(backend.name != tensorlib.name)
+    tensorlib_changed |= bool(backend.precision != tensorlib.precision)
     optimizer_changed = False
 
     if backend.name == 'tensorflow':
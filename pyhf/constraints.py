@@ -1,8 +1,12 @@
+import math
+
+from scipy.special import gammaln
+
 from . import get_backend, default_backend
-from . import events
+from .tensor.common import _BackendCached, _batched_gather
 
 
-class gaussian_constraint_combined(object):
+class gaussian_constraint_combined(_BackendCached):
     def __init__(self, pdfconfig):
         # iterate over all constraints order doesn't matter....
 
@@ -12,8 +16,7 @@ class gaussian_constraint_combined(object):
             (pdfconfig.param_set(cname), pdfconfig.par_slice(cname))
             for cname in pdfconfig.auxdata_order
         ]
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -62,6 +65,8 @@ class gaussian_constraint_combined(object):
                 )
             )
 
+            self._normal_data, self._normal_sigmas = normal_data, normal_sigmas
+            self._normal_mean_idc = normal_mean_idc
             self.normal_data = tensorlib.astensor(
                 default_backend.tolist(normal_data), dtype='int'
             )
@@ -72,6 +77,8 @@ class gaussian_constraint_combined(object):
                 default_backend.tolist(normal_mean_idc), dtype='int'
             )
         else:
+            self._normal_data, self._normal_sigmas = None, None
+            self._normal_mean_idc = None
             self.normal_data, self.normal_sigmas, self.normal_mean_idc = (
                 None,
                 None,
@@ -82,13 +89,58 @@ class gaussian_constraint_combined(object):
         if self.normal_data is None:
             return 0
         tensorlib, _ = get_backend()
+        # either the auxdata or the pars (or both) can carry a leading batch
+        # dimension, the pdf then broadcasts the other one against it
+        if len(tensorlib.shape(auxdata)) == 1:
+            normal_data = tensorlib.gather(auxdata, self.normal_data)
+        else:
+            normal_data = _batched_gather(
+                auxdata, tensorlib.reshape(self.normal_data, (1, -1)), 0
+            )
+        if len(tensorlib.shape(pars)) == 1:
+            normal_means = tensorlib.gather(pars, self.normal_mean_idc)
+        else:
+            normal_means = _batched_gather(
+                pars, tensorlib.reshape(self.normal_mean_idc, (1, -1)), 0
+            )
+        normal = tensorlib.normal_logpdf(normal_data, normal_means, self.normal_sigmas)
+        if len(tensorlib.shape(normal)) == 2:
+            return tensorlib.accumulate(normal, axis=1)
+        return tensorlib.accumulate(normal)
+
+    def logpdf_derivatives(self, auxdata, pars, order=1):
+        """
+        The derivatives of ``logpdf(auxdata, pars)`` for a single parameter vector.
+
+        Each constraint term depends on a single parameter, so the second
+        derivatives only populate the diagonal of the Hessian.
+
+        Args:
+            auxdata (`tensor`): The auxiliary data
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives and the index of the parameter each one is
+                   taken with respect to
+        """
+        if self.normal_data is None:
+            return
+        tensorlib, _ = get_backend()
         normal_data = tensorlib.gather(auxdata, self.normal_data)
         normal_means = tensorlib.gather(pars, self.normal_mean_idc)
-        normal = tensorlib.normal_logpdf(normal_data, normal_means, self.normal_sigmas)
-        return tensorlib.sum(normal)
+        if order == 2:
+            return (
+                -1 / tensorlib.power(self.normal_sigmas, 2) + 0 * normal_means,
+                self.normal_mean_idc,
+            )
+        return (
+            (normal_data - normal_means) / tensorlib.power(self.normal_sigmas, 2),
+            self.normal_mean_idc,
+        )
 
 
-class poisson_constraint_combined(object):
+class poisson_constraint_combined(_BackendCached):
     def __init__(self, pdfconfig):
         # iterate over all constraints order doesn't matter....
 
@@ -98,8 +150,7 @@ class poisson_constraint_combined(object):
             (pdfconfig.param_set(cname), pdfconfig.par_slice(cname))
             for cname in pdfconfig.auxdata_order
         ]
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -155,6 +206,9 @@ class poisson_constraint_combined(object):
                 )
             )
 
+            self._poisson_data = poisson_data
+            self._poisson_rate_idc = poisson_rate_idc
+            self._poisson_rate_fac = poisson_rate_fac
             self.poisson_data = tensorlib.astensor(
                 default_backend.tolist(poisson_data), dtype='int'
             )
@@ -165,6 +219,8 @@ class poisson_constraint_combined(object):
                 default_backend.tolist(poisson_rate_fac), dtype='float'
             )
         else:
+            self._poisson_data = None
+            self._poisson_rate_idc, self._poisson_rate_fac = None, None
             self.poisson_rate_idc, self.poisson_data, self.poisson_rate_fac = (
                 None,
                 None,
@@ -175,12 +231,192 @@ class poisson_constraint_combined(object):
         if self.poisson_data is None:
             return 0
         tensorlib, _ = get_backend()
+        if len(tensorlib.shape(auxdata)) == 1:
+            poisson_data = tensorlib.gather(auxdata, self.poisson_data)
+        else:
+            poisson_data = _batched_gather(
+                auxdata, tensorlib.reshape(self.poisson_data, (1, -1)), 0
+            )
+        if len(tensorlib.shape(pars)) == 1:
+            poisson_rate_base = tensorlib.gather(pars, self.poisson_rate_idc)
+        else:
+            poisson_rate_base = _batched_gather(
+                pars, tensorlib.reshape(self.poisson_rate_idc, (1, -1)), 0
+            )
+        poisson_factors = self.poisson_rate_fac
+
+        poisson_rate = poisson_rate_base * poisson_factors
+        poisson = tensorlib.poisson_logpdf(poisson_data, poisson_rate)
+        if len(tensorlib.shape(poisson)) == 2:
+            return tensorlib.accumulate(poisson, axis=1)
+        return tensorlib.accumulate(poisson)
+
+    def logpdf_derivatives(self, auxdata, pars, order=1):
+        """
+        The derivatives of ``logpdf(auxdata, pars)`` for a single parameter vector.
+
+        Each constraint term depends on a single parameter, so the second
+        derivatives only populate the diagonal of the Hessian.
+
+        Args:
+            auxdata (`tensor`): The auxiliary data
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives and the index of the parameter each one is
+                   taken with respect to
+        """
+        if self.poisson_data is None:
+            return
+        tensorlib, _ = get_backend()
         poisson_data = tensorlib.gather(auxdata, self.poisson_data)
         poisson_rate_base = tensorlib.gather(pars, self.poisson_rate_idc)
-        poisson_factors = self.poisson_rate_fac
+        # d/dx of n log(x f) - x f
+        if order == 2:
+            return (
+                -tensorlib.divide(poisson_data, tensorlib.power(poisson_rate_base, 2)),
+                self.poisson_rate_idc,
+            )
+        return (
+            tensorlib.divide(poisson_data, poisson_rate_base) - self.poisson_rate_fac,
+            self.poisson_rate_idc,
+        )
+
 
-        poisson_rate = tensorlib.product(
-            tensorlib.stack([poisson_rate_base, poisson_factors]), axis=0
+class fused_constraint_combined(_BackendCached):
+    def __init__(self, gaussian, poisson):
+        """
+        All constraint terms of the model in a single evaluation.
+
+        The auxiliary data and the parameters of the Gaussian and the Poisson
+        constraints are each collected with one gather, Gaussian constraints
+        first. The normalization of the Gaussian constraints only depends on
+        their widths and is computed here, the one of the Poisson
+        constraints depends on the auxiliary data and is computed by
+        :meth:`_bind`.
+
+        Args:
+            gaussian (`gaussian_constraint_combined`): The Gaussian constraints
+            poisson (`poisson_constraint_combined`): The Poisson constraints
+        """
+        self.gaussian = gaussian
+        self.poisson = poisson
+        self._track_backend()
+
+    def _precompute(self):
+        # must run after the _precompute of the constraints it fuses
+        tensorlib, _ = get_backend()
+        data_idc, par_idc, factors, sigmas = [], [], [], []
+        self.n_normal, self.n_poisson = 0, 0
+        if self.gaussian._normal_data is not None:
+            data_idc.append(self.gaussian._normal_data)
+            par_idc.append(self.gaussian._normal_mean_idc)
+            factors.append(default_backend.ones(self.gaussian._normal_data.shape))
+            sigmas = self.gaussian._normal_sigmas
+            self.n_normal = len(sigmas)
+        if self.poisson._poisson_data is not None:
+            data_idc.append(self.poisson._poisson_data)
+            par_idc.append(self.poisson._poisson_rate_idc)
+            factors.append(self.poisson._poisson_rate_fac)
+            self.n_poisson = len(self.poisson._poisson_data)
+
+        if not data_idc:
+            self.data_idc, self.par_idc, self.factors, self.weights = (
+                None,
+                None,
+                None,
+                None,
+            )
+            return
+        self.normal_normalization = -float(
+            default_backend.sum(
+                default_backend.log(
+                    default_backend.astensor(sigmas) * math.sqrt(2 * math.pi)
+                )
+            )
         )
-        poisson = tensorlib.poisson_logpdf(poisson_data, poisson_rate)
-        return tensorlib.sum(poisson)
+        self._data_idc = default_backend.concatenate(data_idc)
+        self.data_idc = tensorlib.astensor(
+            default_backend.tolist(self._data_idc), dtype='int'
+        )
+        self.par_idc = tensorlib.astensor(
+            default_backend.tolist(default_backend.concatenate(par_idc)), dtype='int'
+        )
+        self.factors = tensorlib.astensor(
+            default_backend.tolist(default_backend.concatenate(factors))
+        )
+        self.weights = tensorlib.astensor(
+            default_backend.tolist(1 / (2 * default_backend.astensor(sigmas) ** 2))
+        )
+
+    def _gather(self, tensor, indices):
+        tensorlib, _ = get_backend()
+        if len(tensorlib.shape(tensor)) == 1:
+            return tensorlib.gather(tensor, indices)
+        return _batched_gather(tensor, tensorlib.reshape(indices, (1, -1)), 0)
+
+    def _logpdf(self, data, pars, normalized):
+        # the Poisson terms are only normalized on request, the Gaussian
+        # normalization is a constant that is added by the callers
+        tensorlib, _ = get_backend()
+        expected = self._gather(pars, self.par_idc) * self.factors
+        n = self.n_normal
+        result = 0
+        if n:
+            residuals = data[..., :n] - expected[..., :n]
+            result = result - tensorlib.accumulate(
+                self.weights * residuals * residuals, axis=-1
+            )
+        if self.n_poisson:
+            counts, rates = data[..., n:], expected[..., n:]
+            if normalized:
+                poisson = tensorlib.poisson_logpdf(counts, rates)
+            else:
+                poisson = counts * tensorlib.log(rates) - rates
+            result = result + tensorlib.accumulate(poisson, axis=-1)
+        return result
+
+    def logpdf(self, auxdata, pars, constants=True):
+        """
+        Compute the log density of all constraints.
+
+        Either the auxiliary data or the parameters (or both) can carry a
+        leading batch dimension, the other one is broadcast against it.
+
+        Args:
+            auxdata (`tensor`): The auxiliary data
+            pars (`tensor`): The parameter values
+            constants (`bool`): Whether to include the terms that do not
+                                depend on the parameters
+
+        Returns:
+            Tensor: The log density of the constraints
+        """
+        if self.data_idc is None:
+            return 0
+        data = self._gather(auxdata, self.data_idc)
+        if not constants:
+            return self._logpdf(data, pars, False)
+        return self.normal_normalization + self._logpdf(data, pars, True)
+
+    def _bind(self, auxdata, constants=True):
+        # the terms of logpdf that only depend on the (default backend)
+        # auxdata: the gathered data and, optionally, the normalization
+        if self.data_idc is None:
+            return None
+        tensorlib, _ = get_backend()
+        data = default_backend.gather(auxdata, self._data_idc)
+        normalization = 0.0
+        if constants:
+            normalization = self.normal_normalization - float(
+                default_backend.sum(gammaln(data[self.n_normal :] + 1.0))
+            )
+        return tensorlib.astensor(default_backend.tolist(data)), normalization
+
+    def _bound_logpdf(self, bound, pars):
+        # logpdf for a single parameter vector and the terms from _bind
+        if bound is None:
+            return 0
+        data, normalization = bound
+        return normalization + self._logpdf(data, pars, False)
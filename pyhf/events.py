@@ -1,3 +1,5 @@
+import weakref
+
 __events = {}
 __disabled_events = set([])
 
@@ -6,18 +8,88 @@ def noop(*args, **kwargs):
     pass
 
 
+class WeakCallable(object):
+    """
+    A weak reference to a function or bound method.
+
+    For a bound method only its instance is referenced weakly, so that
+    subscribing a method does not keep the instance alive.
+    """
+
+    def __init__(self, func):
+        if getattr(func, '__self__', None) is not None:
+            self._ref = weakref.ref(func.__self__)
+            self._func = func.__func__
+        else:
+            self._ref = weakref.ref(func)
+            self._func = None
+
+    def resolve(self):
+        """
+        The function or bound method, or None if it was garbage collected.
+        """
+        obj = self._ref()
+        if obj is None or self._func is None:
+            return obj
+        return self._func.__get__(obj, type(obj))
+
+    @property
+    def dead(self):
+        return self._ref() is None
+
+    def __call__(self, *args, **kwargs):
+        func = self.resolve()
+        if func is not None:
+            return func(*args, **kwargs)
+
+    def __eq__(self, other):
+        func = self.resolve()
+        return func is not None and func == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "WeakCallable(%r)" % self.resolve()
+
+
 class Callables(list):
+    def __init__(self, *args):
+        super(Callables, self).__init__(*args)
+        self._n_pruned = 0
+
     def __call__(self, *args, **kwargs):
-        for f in self:
+        self.prune()
+        for f in list(self):
             f(*args, **kwargs)
 
+    def prune(self):
+        """
+        Drop the weak subscribers that were garbage collected.
+        """
+        self[:] = [f for f in self if not (isinstance(f, WeakCallable) and f.dead)]
+        self._n_pruned = len(self)
+
+    def append(self, f):
+        # prune whenever the size doubled, so that the subscribers of objects
+        # that were collected do not pile up between triggers
+        if len(self) >= 2 * self._n_pruned + 8:
+            self.prune()
+        super(Callables, self).append(f)
+
     def __repr__(self):
         return "Callables(%s)" % list.__repr__(self)
 
 
-def subscribe(event):
+def subscribe(event, weak=False):
     """
     This is meant to be used as a decorator.
+
+    With ``weak=True`` only a weak reference to the subscriber is kept, see
+    :class:`WeakCallable`. A bound method of an object then no longer keeps
+    the object alive, and is unsubscribed once the object is collected.
     """
     # Example:
     #
@@ -30,7 +102,9 @@ def subscribe(event):
     global __events
 
     def __decorator(func):
-        __events.setdefault(event, Callables()).append(func)
+        __events.setdefault(event, Callables()).append(
+            WeakCallable(func) if weak else func
+        )
         return func
 
     return __decorator
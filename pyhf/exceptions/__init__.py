@@ -44,6 +44,14 @@ class InvalidModel(Exception):
     pass
 
 
+class InvalidCompiledModel(Exception):
+    """
+    InvalidCompiledModel is raised when a saved compiled model cannot be loaded, because it was written by a different version of pyhf or does not match the given specification.
+    """
+
+    pass
+
+
 class InvalidModifier(Exception):
     """
     InvalidModifier is raised when an invalid modifier is requested. This includes:
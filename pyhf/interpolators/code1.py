@@ -1,12 +1,12 @@
 import logging
 from .. import get_backend, default_backend
-from .. import events
+from ..tensor.common import _BackendCached
 from . import _slow_interpolator_looper
 
 log = logging.getLogger(__name__)
 
 
-class code1(object):
+class code1(_BackendCached):
     r"""
     The piecewise-exponential interpolation strategy.
 
@@ -25,8 +25,6 @@ class code1(object):
     def __init__(self, histogramssets, subscribe=True):
         # nb: this should never be a tensor, store in default backend (e.g. numpy)
         self._histogramssets = default_backend.astensor(histogramssets)
-        # initial shape will be (nsysts, 1)
-        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         # precompute terms that only depend on the histogramssets
         self._deltas_up = default_backend.divide(
             self._histogramssets[:, :, 2], self._histogramssets[:, :, 1]
@@ -38,12 +36,15 @@ class code1(object):
             default_backend.shape(self._deltas_up)
         )
 
-        self._precompute()
         if subscribe:
-            events.subscribe('tensorlib_changed')(self._precompute)
+            self._track_backend()
+        else:
+            self._precompute()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
+        # initial shape will be (nsysts, 1)
+        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         self.deltas_up = tensorlib.astensor(self._deltas_up)
         self.deltas_dn = tensorlib.astensor(self._deltas_dn)
         self.broadcast_helper = tensorlib.astensor(self._broadcast_helper)
@@ -56,6 +57,28 @@ class code1(object):
         self.mask_on = tensorlib.ones(self.alphasets_shape)
         self.mask_off = tensorlib.zeros(self.alphasets_shape)
 
+    def _update(self, index, histograms):
+        """
+        Replace some of the histograms and the terms derived from them.
+
+        The backend tensors are not touched, call ``_precompute`` once all
+        updates are done.
+
+        Args:
+            index: tuple ``(sets, histos, bins)`` selecting the histograms
+            histograms: the new (lo, nom, hi) values, with the axis of size 3
+                        second to last
+        """
+        sets, histos, bins = index
+        self._histogramssets[sets, histos, :, bins] = histograms
+        histograms = self._histogramssets[sets, histos, :, bins]
+        self._deltas_up[sets, histos, bins] = default_backend.divide(
+            histograms[..., 2, :], histograms[..., 1, :]
+        )
+        self._deltas_dn[sets, histos, bins] = default_backend.divide(
+            histograms[..., 0, :], histograms[..., 1, :]
+        )
+
     def _precompute_alphasets(self, alphasets_shape):
         if alphasets_shape == self.alphasets_shape:
             return
@@ -92,6 +115,41 @@ class code1(object):
         bases = tensorlib.where(masks, self.bases_up, self.bases_dn)
         return tensorlib.power(bases, exponents)
 
+    def derivative(self, alphasets, order=1):
+        """
+        The derivative of the interpolated factors with respect to the alphas.
+
+        Args:
+            alphasets (`tensor`): The alphas, of shape (n_sets, n_alphas)
+            order (`int`): The order of the derivative, 1 or 2
+
+        Returns:
+            Tensor: The derivatives, in the shape of the interpolated factors
+        """
+        tensorlib, _ = get_backend()
+        self._precompute_alphasets(tensorlib.shape(alphasets))
+        # at the kink at alpha = 0 the slope of the up variation is taken, as
+        # by a forward finite difference
+        where_alphasets_positive = tensorlib.where(
+            alphasets >= 0, self.mask_on, self.mask_off
+        )
+
+        exponents = tensorlib.einsum(
+            'sa,shb->shab', tensorlib.abs(alphasets), self.broadcast_helper
+        )
+        masks = tensorlib.einsum(
+            'sa,shb->shab', where_alphasets_positive, self.broadcast_helper
+        )
+
+        # d/dalpha base^|alpha| = sign(alpha) * log(base) * base^|alpha|
+        bases = tensorlib.where(masks, self.bases_up, self.bases_dn)
+        if order == 2:
+            return tensorlib.power(tensorlib.log(bases), 2) * tensorlib.power(
+                bases, exponents
+            )
+        signs = 2 * masks - 1
+        return signs * tensorlib.log(bases) * tensorlib.power(bases, exponents)
+
 
 class _slow_code1(object):
     def product(self, down, nom, up, alpha):
@@ -1,12 +1,12 @@
 import logging
 from .. import get_backend, default_backend
-from .. import events
+from ..tensor.common import _BackendCached
 from . import _slow_interpolator_looper
 
 log = logging.getLogger(__name__)
 
 
-class code2(object):
+class code2(_BackendCached):
     r"""
     The quadratic interpolation and linear extrapolation strategy.
 
@@ -29,8 +29,6 @@ class code2(object):
     def __init__(self, histogramssets, subscribe=True):
         # nb: this should never be a tensor, store in default backend (e.g. numpy)
         self._histogramssets = default_backend.astensor(histogramssets)
-        # initial shape will be (nsysts, 1)
-        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         # precompute terms that only depend on the histogramssets
         self._a = (
             0.5 * (self._histogramssets[:, :, 2] + self._histogramssets[:, :, 0])
@@ -40,12 +38,15 @@ class code2(object):
         self._b_plus_2a = self._b + 2 * self._a
         self._b_minus_2a = self._b - 2 * self._a
         self._broadcast_helper = default_backend.ones(default_backend.shape(self._a))
-        self._precompute()
         if subscribe:
-            events.subscribe('tensorlib_changed')(self._precompute)
+            self._track_backend()
+        else:
+            self._precompute()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
+        # initial shape will be (nsysts, 1)
+        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         self.a = tensorlib.astensor(self._a)
         self.b = tensorlib.astensor(self._b)
         self.b_plus_2a = tensorlib.astensor(self._b_plus_2a)
@@ -107,6 +108,51 @@ class code2(object):
         #   not(alpha >= -1): fill with (b-2a)(alpha + 1)
         return tensorlib.where(masks_not_lt1, results_gt1_btwn, value_lt1)
 
+    def derivative(self, alphasets, order=1):
+        """
+        The derivative of the interpolated deltas with respect to the alphas.
+
+        Args:
+            alphasets (`tensor`): The alphas, of shape (n_sets, n_alphas)
+            order (`int`): The order of the derivative, 1 or 2
+
+        Returns:
+            Tensor: The derivatives, in the shape of the interpolated deltas
+        """
+        tensorlib, _ = get_backend()
+        self._precompute_alphasets(tensorlib.shape(alphasets))
+
+        where_alphasets_gt1 = tensorlib.where(
+            alphasets > 1, self.mask_on, self.mask_off
+        )
+        where_alphasets_not_lt1 = tensorlib.where(
+            alphasets >= -1, self.mask_on, self.mask_off
+        )
+
+        if order == 2:
+            # only the quadratic part in between is curved
+            slope_gt1 = tensorlib.einsum(
+                'sa,shb->shab', self.mask_off, self.broadcast_helper
+            )
+            slope_btwn = 2 * tensorlib.einsum('sa,shb->shab', self.mask_on, self.a)
+            slope_lt1 = slope_gt1
+        else:
+            slope_gt1 = tensorlib.einsum('sa,shb->shab', self.mask_on, self.b_plus_2a)
+            slope_btwn = 2 * tensorlib.einsum(
+                'sa,shb->shab', alphasets, self.a
+            ) + tensorlib.einsum('sa,shb->shab', self.mask_on, self.b)
+            slope_lt1 = tensorlib.einsum('sa,shb->shab', self.mask_on, self.b_minus_2a)
+
+        masks_gt1 = tensorlib.einsum(
+            'sa,shb->shab', where_alphasets_gt1, self.broadcast_helper
+        )
+        masks_not_lt1 = tensorlib.einsum(
+            'sa,shb->shab', where_alphasets_not_lt1, self.broadcast_helper
+        )
+
+        results_gt1_btwn = tensorlib.where(masks_gt1, slope_gt1, slope_btwn)
+        return tensorlib.where(masks_not_lt1, results_gt1_btwn, slope_lt1)
+
 
 class _slow_code2(object):
     def summand(self, down, nom, up, alpha):
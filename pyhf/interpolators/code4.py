@@ -1,13 +1,13 @@
 import logging
 import math
 from .. import get_backend, default_backend
-from .. import events
+from ..tensor.common import _BackendCached
 from . import _slow_interpolator_looper
 
 log = logging.getLogger(__name__)
 
 
-class code4(object):
+class code4(_BackendCached):
     r"""
     The polynomial interpolation and exponential extrapolation strategy.
 
@@ -36,8 +36,6 @@ class code4(object):
         self.__alpha0 = alpha0
         # nb: this should never be a tensor, store in default backend (e.g. numpy)
         self._histogramssets = default_backend.astensor(histogramssets)
-        # initial shape will be (nsysts, 1)
-        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         # precompute terms that only depend on the histogramssets
         self._deltas_up = default_backend.divide(
             self._histogramssets[:, :, 2], self._histogramssets[:, :, 1]
@@ -121,12 +119,15 @@ class code4(object):
             'rc,shb,cshb->rshb', A_inverse, self._broadcast_helper, b
         )
 
-        self._precompute()
         if subscribe:
-            events.subscribe('tensorlib_changed')(self._precompute)
+            self._track_backend()
+        else:
+            self._precompute()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
+        # initial shape will be (nsysts, 1)
+        self.alphasets_shape = (self._histogramssets.shape[0], 1)
         self.deltas_up = tensorlib.astensor(self._deltas_up)
         self.deltas_dn = tensorlib.astensor(self._deltas_dn)
         self.broadcast_helper = tensorlib.astensor(self._broadcast_helper)
@@ -225,6 +226,71 @@ class code4(object):
         )
         return tensorlib.power(bases, masked_exponents)
 
+    def derivative(self, alphasets, order=1):
+        """
+        The derivative of the interpolated factors with respect to the alphas.
+
+        Args:
+            alphasets (`tensor`): The alphas, of shape (n_sets, n_alphas)
+            order (`int`): The order of the derivative, 1 or 2
+
+        Returns:
+            Tensor: The derivatives, in the shape of the interpolated factors
+        """
+        tensorlib, _ = get_backend()
+        self._precompute_alphasets(tensorlib.shape(alphasets))
+
+        where_alphasets_gtalpha0 = tensorlib.where(
+            alphasets >= self.__alpha0, self.mask_on, self.mask_off
+        )
+        masks_gtalpha0 = tensorlib.einsum(
+            'sa,shb->shab', where_alphasets_gtalpha0, self.broadcast_helper
+        )
+        where_alphasets_not_ltalpha0 = tensorlib.where(
+            alphasets > -self.__alpha0, self.mask_on, self.mask_off
+        )
+        masks_not_ltalpha0 = tensorlib.einsum(
+            'sa,shb->shab', where_alphasets_not_ltalpha0, self.broadcast_helper
+        )
+
+        # outside of alpha0: d^n/dalpha^n base^|alpha| = (+-log(base))^n base^|alpha|
+        exponents = tensorlib.einsum(
+            'sa,shb->shab', tensorlib.abs(alphasets), self.broadcast_helper
+        )
+        powers_up = tensorlib.power(self.bases_up, exponents)
+        powers_dn = tensorlib.power(self.bases_dn, exponents)
+        slope_up = tensorlib.power(tensorlib.log(self.bases_up), order) * powers_up
+        slope_dn = tensorlib.power(-tensorlib.log(self.bases_dn), order) * powers_dn
+        # in between: the derivative of the polynomial 1 + sum_i a_i alpha^i
+        if order == 2:
+            alphasets_powers = tensorlib.stack(
+                [
+                    self.mask_off,
+                    2 * self.mask_on,
+                    6 * alphasets,
+                    12 * tensorlib.power(alphasets, 2),
+                    20 * tensorlib.power(alphasets, 3),
+                    30 * tensorlib.power(alphasets, 4),
+                ]
+            )
+        else:
+            alphasets_powers = tensorlib.stack(
+                [
+                    self.mask_on,
+                    2 * alphasets,
+                    3 * tensorlib.power(alphasets, 2),
+                    4 * tensorlib.power(alphasets, 3),
+                    5 * tensorlib.power(alphasets, 4),
+                    6 * tensorlib.power(alphasets, 5),
+                ]
+            )
+        slope_btwn = tensorlib.einsum(
+            'rshb,rsa->shab', self.coefficients, alphasets_powers
+        )
+
+        results_gtalpha0_btwn = tensorlib.where(masks_gtalpha0, slope_up, slope_btwn)
+        return tensorlib.where(masks_not_ltalpha0, results_gtalpha0_btwn, slope_dn)
+
 
 class _slow_code4(object):
     """
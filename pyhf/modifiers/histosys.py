@@ -2,8 +2,10 @@ import logging
 
 from . import modifier
 from ..paramsets import constrained_by_normal
-from .. import get_backend, events
+from .. import get_backend, default_backend
 from .. import interpolators
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -23,14 +25,21 @@ class histosys(object):
             'auxdata': (0.0,),
         }
 
+    @classmethod
+    def is_noop(cls, modifier_data, nominal):
+        # interpolating between identical templates does not change the rates
+        templates = [modifier_data['hi_data'], modifier_data['lo_data']]
+        return all(list(template) == list(nominal) for template in templates)
+
 
-class histosys_combined(object):
+class histosys_combined(_BackendCached):
     def __init__(self, histosys_mods, pdfconfig, mega_mods):
         self._parindices = list(range(len(pdfconfig.suggested_init())))
 
         pnames = [pname for _, _, pname in histosys_mods]
         keys = ['{}/{}'.format(mtype, m) for m, mtype, _ in histosys_mods]
         histosys_mods = [m for m, _, _ in histosys_mods]
+        self._keys = keys
         self._histo_indices = [self._parindices[pdfconfig.par_slice(p)] for p in pnames]
         self._histosys_histoset = [
             [
@@ -47,11 +56,21 @@ class histosys_combined(object):
             [[mega_mods[s][m]['data']['mask']] for s in pdfconfig.samples] for m in keys
         ]
 
+        self._sparse = None
+        if pdfconfig.sparse and len(histosys_mods):
+            self._sparse = sparse_applier(
+                self._histosys_mask,
+                self._histo_indices,
+                0.0,
+                histogramssets=self._histosys_histoset,
+                interpcode=interpolators.code0,
+            )
+            return
+
         if len(histosys_mods):
             self.interpolator = interpolators.code0(self._histosys_histoset)
 
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -59,14 +78,91 @@ class histosys_combined(object):
         self.histosys_default = tensorlib.zeros(self.histosys_mask.shape)
         self.histo_indices = tensorlib.astensor(self._histo_indices, dtype='int')
 
+    def _update(self, pdfconfig, mega_mods, sample, keys, bins):
+        """
+        Refresh the histograms of a sample from the mega-channel data.
+
+        Args:
+            pdfconfig: the model configuration
+            mega_mods: the mega-channel modifier data
+            sample: the name of the sample
+            keys: the modifiers of the sample to refresh
+            bins: slice of the bins to refresh
+        """
+        sample_index = pdfconfig.samples.index(sample)
+        for key in keys:
+            data = mega_mods[sample][key]['data']
+            histograms = default_backend.stack(
+                [data['lo_data'][bins], data['nom_data'][bins], data['hi_data'][bins]]
+            )
+            mod_index = self._keys.index(key)
+            if self._sparse is not None:
+                self._sparse._update_histograms(
+                    mod_index, sample_index, bins, histograms
+                )
+            else:
+                self.interpolator._update((mod_index, sample_index, bins), histograms)
+        if self._sparse is not None:
+            self._sparse.interpolator._refresh()
+        else:
+            self.interpolator._refresh()
+
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._histo_indices:
+            return None
+        return sparse_applier(
+            self._histosys_mask,
+            self._histo_indices,
+            0.0,
+            histogramssets=self.interpolator._histogramssets,
+            interpcode=interpolators.code0,
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         if not tensorlib.shape(self.histo_indices)[0]:
             return
-        histosys_alphaset = tensorlib.gather(pars, self.histo_indices)
+        if len(tensorlib.shape(pars)) == 1:
+            histosys_alphaset = tensorlib.gather(pars, self.histo_indices)
+        else:
+            histosys_alphaset = _batched_gather(pars, self.histo_indices, 1)
         results_histo = self.interpolator(histosys_alphaset)
         # either rely on numerical no-op or force with line below
         results_histo = tensorlib.where(
             self.histosys_mask, results_histo, self.histosys_default
         )
         return results_histo
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        if not tensorlib.shape(self.histo_indices)[0]:
+            return
+        histosys_alphaset = tensorlib.gather(pars, self.histo_indices)
+        derivatives = tensorlib.where(
+            self.histosys_mask,
+            self.interpolator.derivative(histosys_alphaset, order),
+            self.histosys_default,
+        )
+        return derivatives, tensorlib.reshape(self.histo_indices, (-1, 1, 1, 1))
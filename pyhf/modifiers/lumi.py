@@ -2,7 +2,9 @@ import logging
 
 from . import modifier
 from ..paramsets import constrained_by_normal
-from .. import get_backend, default_backend, events
+from .. import get_backend
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -25,7 +27,7 @@ class lumi(object):
         }
 
 
-class lumi_combined(object):
+class lumi_combined(_BackendCached):
     def __init__(self, lumi_mods, pdfconfig, mega_mods):
         self._parindices = list(range(len(pdfconfig.suggested_init())))
 
@@ -37,26 +39,71 @@ class lumi_combined(object):
         self._lumi_mask = [
             [[mega_mods[s][m]['data']['mask']] for s in pdfconfig.samples] for m in keys
         ]
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+
+        self._sparse = None
+        if pdfconfig.sparse and len(lumi_mods):
+            self._sparse = sparse_applier(self._lumi_mask, self._lumi_indices, 1.0)
+            return
+
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
-        self.lumi_mask = default_backend.astensor(self._lumi_mask)
-        self.lumi_default = default_backend.ones(self.lumi_mask.shape)
-        self.lumi_indices = default_backend.astensor(self._lumi_indices, dtype='int')
+        self.lumi_mask = tensorlib.astensor(self._lumi_mask)
+        self.lumi_default = tensorlib.ones(tensorlib.shape(self.lumi_mask))
+        self.lumi_indices = tensorlib.astensor(self._lumi_indices, dtype='int')
+
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._lumi_indices:
+            return None
+        return sparse_applier(self._lumi_mask, self._lumi_indices, 1.0)
 
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         lumi_indices = tensorlib.astensor(self.lumi_indices, dtype='int')
         lumi_mask = tensorlib.astensor(self.lumi_mask)
         if not tensorlib.shape(lumi_indices)[0]:
             return
-        lumis = tensorlib.gather(pars, lumi_indices)
-        results_lumi = lumi_mask * tensorlib.reshape(
-            lumis, tensorlib.shape(lumis) + (1, 1)
-        )
+        if len(tensorlib.shape(pars)) == 1:
+            lumis = tensorlib.gather(pars, lumi_indices)
+        else:
+            lumis = _batched_gather(pars, lumi_indices, 1)
+        n_mods, n_alphas = tensorlib.shape(lumis)
+        results_lumi = lumi_mask * tensorlib.reshape(lumis, (n_mods, 1, n_alphas, 1))
         results_lumi = tensorlib.where(
             lumi_mask, results_lumi, tensorlib.astensor(self.lumi_default)
         )
         return results_lumi
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        lumi_indices = tensorlib.astensor(self.lumi_indices, dtype='int')
+        if not tensorlib.shape(lumi_indices)[0]:
+            return
+        lumi_mask = tensorlib.astensor(self.lumi_mask)
+        return (
+            lumi_mask if order == 1 else 0 * lumi_mask,
+            tensorlib.reshape(lumi_indices, (-1, 1, 1, 1)),
+        )
@@ -2,7 +2,9 @@ import logging
 
 from . import modifier
 from ..paramsets import unconstrained
-from .. import get_backend, default_backend, events
+from .. import get_backend
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -22,7 +24,7 @@ class normfactor(object):
         }
 
 
-class normfactor_combined(object):
+class normfactor_combined(_BackendCached):
     def __init__(self, normfactor_mods, pdfconfig, mega_mods):
         self._parindices = list(range(len(pdfconfig.suggested_init())))
 
@@ -36,26 +38,54 @@ class normfactor_combined(object):
         self._normfactor_mask = [
             [[mega_mods[s][m]['data']['mask']] for s in pdfconfig.samples] for m in keys
         ]
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+
+        self._sparse = None
+        if pdfconfig.sparse and len(normfactor_mods):
+            self._sparse = sparse_applier(
+                self._normfactor_mask, self._normfactor_indices, 1.0
+            )
+            return
+
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
-        self.normfactor_mask = default_backend.astensor(self._normfactor_mask)
-        self.normfactor_default = default_backend.ones(self.normfactor_mask.shape)
-        self.normfactor_indices = default_backend.astensor(
+        self.normfactor_mask = tensorlib.astensor(self._normfactor_mask)
+        self.normfactor_default = tensorlib.ones(tensorlib.shape(self.normfactor_mask))
+        self.normfactor_indices = tensorlib.astensor(
             self._normfactor_indices, dtype='int'
         )
 
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._normfactor_indices:
+            return None
+        return sparse_applier(
+            self._normfactor_mask, self._normfactor_indices, 1.0, subscribe=False
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         normfactor_indices = tensorlib.astensor(self.normfactor_indices, dtype='int')
         normfactor_mask = tensorlib.astensor(self.normfactor_mask)
         if not tensorlib.shape(normfactor_indices)[0]:
             return
-        normfactors = tensorlib.gather(pars, normfactor_indices)
+        if len(tensorlib.shape(pars)) == 1:
+            normfactors = tensorlib.gather(pars, normfactor_indices)
+        else:
+            normfactors = _batched_gather(pars, normfactor_indices, 1)
+        # (n_mods, n_alphas) -> (n_mods, 1, n_alphas, 1) to broadcast over
+        # samples and bins
+        n_mods, n_alphas = tensorlib.shape(normfactors)
         results_normfactor = normfactor_mask * tensorlib.reshape(
-            normfactors, tensorlib.shape(normfactors) + (1, 1)
+            normfactors, (n_mods, 1, n_alphas, 1)
         )
         results_normfactor = tensorlib.where(
             normfactor_mask,
@@ -63,3 +93,29 @@ class normfactor_combined(object):
             tensorlib.astensor(self.normfactor_default),
         )
         return results_normfactor
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        normfactor_indices = tensorlib.astensor(self.normfactor_indices, dtype='int')
+        if not tensorlib.shape(normfactor_indices)[0]:
+            return
+        # the factor is the parameter itself wherever the modifier applies
+        normfactor_mask = tensorlib.astensor(self.normfactor_mask)
+        return (
+            normfactor_mask if order == 1 else 0 * normfactor_mask,
+            tensorlib.reshape(normfactor_indices, (-1, 1, 1, 1)),
+        )
@@ -2,8 +2,10 @@ import logging
 
 from . import modifier
 from ..paramsets import constrained_by_normal
-from .. import get_backend, events
+from .. import get_backend, default_backend
 from .. import interpolators
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -23,14 +25,20 @@ class normsys(object):
             'auxdata': (0.0,),
         }
 
+    @classmethod
+    def is_noop(cls, modifier_data, nominal):
+        # a factor of one for any value of the parameter
+        return modifier_data['hi'] == 1.0 and modifier_data['lo'] == 1.0
+
 
-class normsys_combined(object):
+class normsys_combined(_BackendCached):
     def __init__(self, normsys_mods, pdfconfig, mega_mods):
         self._parindices = list(range(len(pdfconfig.suggested_init())))
 
         pnames = [pname for _, _, pname in normsys_mods]
         keys = ['{}/{}'.format(mtype, m) for m, mtype, _ in normsys_mods]
         normsys_mods = [m for m, _, _ in normsys_mods]
+        self._keys = keys
 
         self._normsys_indices = [
             self._parindices[pdfconfig.par_slice(p)] for p in pnames
@@ -50,11 +58,21 @@ class normsys_combined(object):
             [[mega_mods[s][m]['data']['mask']] for s in pdfconfig.samples] for m in keys
         ]
 
+        self._sparse = None
+        if pdfconfig.sparse and len(normsys_mods):
+            self._sparse = sparse_applier(
+                self._normsys_mask,
+                self._normsys_indices,
+                1.0,
+                histogramssets=self._normsys_histoset,
+                interpcode=interpolators.code1,
+            )
+            return
+
         if len(normsys_mods):
             self.interpolator = interpolators.code1(self._normsys_histoset)
 
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -62,11 +80,62 @@ class normsys_combined(object):
         self.normsys_default = tensorlib.ones(self.normsys_mask.shape)
         self.normsys_indices = tensorlib.astensor(self._normsys_indices, dtype='int')
 
+    def _update(self, pdfconfig, mega_mods, sample, keys, bins):
+        """
+        Refresh the histograms of a sample from the mega-channel data.
+
+        Args:
+            pdfconfig: the model configuration
+            mega_mods: the mega-channel modifier data
+            sample: the name of the sample
+            keys: the modifiers of the sample to refresh
+            bins: slice of the bins to refresh
+        """
+        sample_index = pdfconfig.samples.index(sample)
+        for key in keys:
+            data = mega_mods[sample][key]['data']
+            histograms = default_backend.stack(
+                [data['lo'][bins], data['nom_data'][bins], data['hi'][bins]]
+            )
+            mod_index = self._keys.index(key)
+            if self._sparse is not None:
+                self._sparse._update_histograms(
+                    mod_index, sample_index, bins, histograms
+                )
+            else:
+                self.interpolator._update((mod_index, sample_index, bins), histograms)
+        if self._sparse is not None:
+            self._sparse.interpolator._refresh()
+        else:
+            self.interpolator._refresh()
+
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._normsys_indices:
+            return None
+        return sparse_applier(
+            self._normsys_mask,
+            self._normsys_indices,
+            1.0,
+            histogramssets=self.interpolator._histogramssets,
+            interpcode=interpolators.code1,
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         if not tensorlib.shape(self.normsys_indices)[0]:
             return
-        normsys_alphaset = tensorlib.gather(pars, self.normsys_indices)
+        if len(tensorlib.shape(pars)) == 1:
+            normsys_alphaset = tensorlib.gather(pars, self.normsys_indices)
+        else:
+            normsys_alphaset = _batched_gather(pars, self.normsys_indices, 1)
         results_norm = self.interpolator(normsys_alphaset)
 
         # either rely on numerical no-op or force with line below
@@ -74,3 +143,29 @@ class normsys_combined(object):
             self.normsys_mask, results_norm, self.normsys_default
         )
         return results_norm
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        if not tensorlib.shape(self.normsys_indices)[0]:
+            return
+        normsys_alphaset = tensorlib.gather(pars, self.normsys_indices)
+        derivatives = tensorlib.where(
+            self.normsys_mask,
+            self.interpolator.derivative(normsys_alphaset, order),
+            tensorlib.zeros(tensorlib.shape(self.normsys_mask)),
+        )
+        return derivatives, tensorlib.reshape(self.normsys_indices, (-1, 1, 1, 1))
@@ -2,7 +2,9 @@ import logging
 
 from . import modifier
 from ..paramsets import unconstrained
-from .. import get_backend, default_backend, events
+from .. import get_backend, default_backend
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -22,7 +24,7 @@ class shapefactor(object):
         }
 
 
-class shapefactor_combined(object):
+class shapefactor_combined(_BackendCached):
     def __init__(self, shapefactor_mods, pdfconfig, mega_mods):
         """
         Imagine a situation where we have 2 channels (SR, CR), 3 samples (sig1,
@@ -92,8 +94,14 @@ class shapefactor_combined(object):
             for indices in self._shapefactor_indices
         ]
 
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._sparse = None
+        if pdfconfig.sparse and self._shapefactor_indices:
+            self._sparse = sparse_applier(
+                self._shapefactor_mask, self._shapefactor_indices, 1.0
+            )
+            return
+
+        self._track_backend()
 
     def _precompute(self):
         if not self._shapefactor_indices:
@@ -109,15 +117,66 @@ class shapefactor_combined(object):
         self.sample_ones = tensorlib.ones(tensorlib.shape(self.shapefactor_mask)[1])
         self.alpha_ones = tensorlib.ones([1])
 
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._shapefactor_indices:
+            return None
+        return sparse_applier(
+            self._shapefactor_mask, self._shapefactor_indices, 1.0, subscribe=False
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         if not self._shapefactor_indices:
             return
         tensorlib, _ = get_backend()
-        shapefactors = tensorlib.gather(pars, self.shapefactor_indices)
-        results_shapefactor = tensorlib.einsum(
-            's,a,mb->msab', self.sample_ones, self.alpha_ones, shapefactors
-        )
+        if len(tensorlib.shape(pars)) == 1:
+            shapefactors = tensorlib.gather(pars, self.shapefactor_indices)
+            results_shapefactor = tensorlib.einsum(
+                's,a,mb->msab', self.sample_ones, self.alpha_ones, shapefactors
+            )
+        else:
+            n_mods, n_bins = tensorlib.shape(self.shapefactor_indices)
+            shapefactors = _batched_gather(
+                pars,
+                tensorlib.reshape(self.shapefactor_indices, (n_mods, 1, n_bins)),
+                1,
+            )
+            results_shapefactor = tensorlib.einsum(
+                's,mab->msab', self.sample_ones, shapefactors
+            )
         results_shapefactor = tensorlib.where(
             self.shapefactor_mask, results_shapefactor, self.shapefactor_default
         )
         return results_shapefactor
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        if not self._shapefactor_indices:
+            return
+        tensorlib, _ = get_backend()
+        n_mods, n_bins = tensorlib.shape(self.shapefactor_indices)
+        # every bin has its own parameter as the factor
+        return (
+            self.shapefactor_mask if order == 1 else 0 * self.shapefactor_mask,
+            tensorlib.reshape(self.shapefactor_indices, (n_mods, 1, 1, n_bins)),
+        )
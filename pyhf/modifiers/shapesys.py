@@ -2,7 +2,9 @@ import logging
 
 from . import modifier
 from ..paramsets import constrained_by_poisson
-from .. import get_backend, default_backend, events
+from .. import get_backend, default_backend
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -27,13 +29,19 @@ class shapesys(object):
             'factors': (None,) * n_parameters,
         }
 
+    @classmethod
+    def is_noop(cls, modifier_data, nominal):
+        # without uncertainties, the gammas are fixed to one
+        return not any(modifier_data)
+
 
-class shapesys_combined(object):
+class shapesys_combined(_BackendCached):
     def __init__(self, shapesys_mods, pdfconfig, mega_mods):
 
         pnames = [pname for _, _, pname in shapesys_mods]
         keys = ['{}/{}'.format(mtype, m) for m, mtype, _ in shapesys_mods]
         shapesys_mods = [m for m, _, _ in shapesys_mods]
+        self._keys = keys
 
         self._shapesys_mods = shapesys_mods
         self._pnames = pnames
@@ -80,8 +88,14 @@ class shapesys_combined(object):
         else:
             self._factor_access_indices = None
 
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._sparse = None
+        if pdfconfig.sparse and self._shapesys_indices:
+            self._sparse = sparse_applier(
+                self._shapesys_mask, self._factor_access_indices, 1.0
+            )
+            return
+
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -98,8 +112,12 @@ class shapesys_combined(object):
         else:
             self.factor_access_indices = None
 
-    def finalize(self, pdfconfig):
-        for uncert_this_mod, pname in zip(self.__shapesys_uncrt, self._pnames):
+    def finalize(self, pdfconfig, indices=None):
+        if indices is None:
+            indices = range(len(self._pnames))
+        for index in indices:
+            uncert_this_mod = self.__shapesys_uncrt[index]
+            pname = self._pnames[index]
             unc_nom = default_backend.astensor(
                 [x for x in uncert_this_mod[:, :, :] if any(x[0][x[0] > 0])]
             )
@@ -124,25 +142,110 @@ class shapesys_combined(object):
             pdfconfig.param_set(pname).factors = default_backend.tolist(factors)
             pdfconfig.param_set(pname).auxdata = default_backend.tolist(factors)
 
+    def _update(self, pdfconfig, mega_mods, sample, keys, bins):
+        """
+        Refresh the uncertainties of a sample from the mega-channel data.
+
+        Args:
+            pdfconfig: the model configuration
+            mega_mods: the mega-channel modifier data
+            sample: the name of the sample
+            keys: the modifiers of the sample to refresh
+            bins: slice of the bins to refresh
+        """
+        sample_index = pdfconfig.samples.index(sample)
+        indices = []
+        for key in keys:
+            data = mega_mods[sample][key]['data']
+            index = self._keys.index(key)
+            uncert_this_mod = self.__shapesys_uncrt[index]
+            uncert_this_mod[sample_index, 0, bins] = data['uncrt'][bins]
+            uncert_this_mod[sample_index, 1, bins] = data['nom_data'][bins]
+            indices.append(index)
+        self.finalize(pdfconfig, indices)
+
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._shapesys_indices:
+            return None
+        return sparse_applier(
+            self._shapesys_mask, self._factor_access_indices, 1.0, subscribe=False
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         if self.factor_access_indices is None:
             return
         tensorlib, _ = get_backend()
 
-        factor_row = tensorlib.gather(
-            tensorlib.concatenate([tensorlib.astensor(pars), self.default_value]),
-            self.factor_access_indices,
-        )
+        if len(tensorlib.shape(pars)) == 1:
+            factor_row = tensorlib.gather(
+                tensorlib.concatenate([tensorlib.astensor(pars), self.default_value]),
+                self.factor_access_indices,
+            )
 
-        results_shapesys = tensorlib.einsum(
-            's,a,mb->msab',
-            tensorlib.astensor(self.sample_ones),
-            tensorlib.astensor(self.alpha_ones),
-            factor_row,
-        )
+            sample_ones = tensorlib.astensor(self.sample_ones)
+            alpha_ones = tensorlib.astensor(self.alpha_ones)
+            # the broadcast factors are only an input to the masking below
+            out = tensorlib.buffer(
+                tensorlib.shape(factor_row)[:1]
+                + tensorlib.shape(sample_ones)
+                + tensorlib.shape(alpha_ones)
+                + tensorlib.shape(factor_row)[1:],
+                name='shapesys_combined.factors',
+                owner=self,
+            )
+            results_shapesys = tensorlib.einsum(
+                's,a,mb->msab', sample_ones, alpha_ones, factor_row, out=out
+            )
+        else:
+            batch_size = tensorlib.shape(pars)[0]
+            select_from = tensorlib.concatenate(
+                [pars, tensorlib.ones((batch_size, 1))], axis=1
+            )
+            n_mods, n_bins = tensorlib.shape(self.factor_access_indices)
+            factor_rows = _batched_gather(
+                select_from,
+                tensorlib.reshape(self.factor_access_indices, (n_mods, 1, n_bins)),
+                1,
+            )
+            results_shapesys = tensorlib.einsum(
+                's,mab->msab', self.sample_ones, factor_rows
+            )
 
         results_shapesys = tensorlib.where(
             self.shapesys_mask, results_shapesys, self.shapesys_default
         )
         return results_shapesys
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        if self.factor_access_indices is None:
+            return
+        n_mods, n_bins = tensorlib.shape(self.factor_access_indices)
+        # every bin has its own parameter as the factor
+        return (
+            self.shapesys_mask if order == 1 else 0 * self.shapesys_mask,
+            tensorlib.reshape(self.factor_access_indices, (n_mods, 1, 1, n_bins)),
+        )
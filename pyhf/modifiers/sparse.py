@@ -0,0 +1,187 @@
+import logging
+
+from .. import get_backend, default_backend
+from ..tensor.common import _BackendCached, _batched_gather
+
+log = logging.getLogger(__name__)
+
+
+class sparse_applier(_BackendCached):
+    def __init__(
+        self,
+        mask,
+        par_indices,
+        default,
+        histogramssets=None,
+        interpcode=None,
+        subscribe=True,
+    ):
+        """
+        Apply a set of modifiers to only the (sample, bin) entries they touch.
+
+        The dense layout of the combined modifiers holds one
+        (n_samples, n_alphas, n_bins) block per modifier, which for large
+        workspaces is mostly masked out. Instead, this keeps a flat list of
+        the E touched entries, each with the index of the parameter it reads.
+        The entries are evaluated as a vector and gathered, together with a
+        default value for the untouched cells, into a stack of shape
+        (K, n_samples, n_alphas, n_bins), where K is the largest number of
+        modifiers touching any single cell. As K rarely exceeds a handful,
+        this stack can be reduced by the model exactly like the dense one.
+
+        Args:
+            mask: nested list of shape (n_mods, n_samples, 1, n_bins)
+            par_indices: parameter index for every modifier and bin, of shape
+                         (n_mods, n_bins) or (n_mods, 1) if shared by all bins
+            default: the value of cells that are not touched (the no-op)
+            histogramssets: nested list of shape (n_mods, n_samples, 3, n_bins)
+                            with the (lo, nom, hi) histograms to interpolate
+            interpcode: the interpolator class to use with histogramssets
+            subscribe: whether to subscribe to backend changes
+        """
+        mask = default_backend.astensor(mask, dtype='bool')[:, :, 0, :]
+        n_mods, n_samples, n_bins = default_backend.shape(mask)
+        par_indices = default_backend.astensor(par_indices, dtype='int')
+        par_indices = par_indices * default_backend.astensor(
+            default_backend.ones((n_mods, n_bins)), dtype='int'
+        )
+
+        mod_idx, sample_idx, bin_idx = mask.nonzero()
+        self.n_entries = len(mod_idx)
+        # the flat (mod, sample, bin) index of every entry, in ascending order
+        self._entry_cells = mask.reshape(-1).nonzero()[0]
+        self._cells_shape = (n_mods, n_samples, n_bins)
+        self._entry_indices = default_backend.tolist(par_indices[mod_idx, bin_idx])
+
+        # place each entry at the next free slot of its (sample, bin) cell,
+        # all other slots point to the default value after the last entry
+        counts = {}
+        for sample, bin in zip(sample_idx.tolist(), bin_idx.tolist()):
+            counts[(sample, bin)] = counts.get((sample, bin), 0) + 1
+        self.max_multiplicity = max(counts.values()) if counts else 1
+        access = [
+            [[self.n_entries] * n_bins for _ in range(n_samples)]
+            for _ in range(self.max_multiplicity)
+        ]
+        counts = {}
+        for entry, (sample, bin) in enumerate(
+            zip(sample_idx.tolist(), bin_idx.tolist())
+        ):
+            slot = counts.get((sample, bin), 0)
+            counts[(sample, bin)] = slot + 1
+            access[slot][sample][bin] = entry
+        self._access_indices = access
+        self._default = default
+
+        self.interpolator = None
+        if interpcode is not None:
+            histogramssets = default_backend.astensor(histogramssets)
+            # every entry is its own set with a single one-bin histogram
+            entry_histos = histogramssets[mod_idx, sample_idx, :, bin_idx]
+            self.interpolator = interpcode(
+                default_backend.tolist(
+                    default_backend.reshape(entry_histos, (self.n_entries, 1, 3, 1))
+                ),
+                subscribe=subscribe,
+            )
+
+        if subscribe:
+            self._track_backend()
+        else:
+            self._precompute()
+
+    def _update_histograms(self, mod, sample, bins, histograms):
+        """
+        Replace the histograms interpolated for one modifier and sample.
+
+        Args:
+            mod: the index of the modifier
+            sample: the index of the sample
+            bins: slice of the bins to replace
+            histograms: the new (lo, nom, hi) values of shape (3, n_bins in slice)
+        """
+        _, n_samples, n_bins = self._cells_shape
+        cells = (mod * n_samples + sample) * n_bins + default_backend.astensor(
+            range(bins.start, bins.stop), dtype='int'
+        )
+        entries = self._entry_cells.searchsorted(cells)
+        touched = entries < self.n_entries
+        touched[touched] = self._entry_cells[entries[touched]] == cells[touched]
+        histograms = default_backend.astensor(histograms)[:, touched]
+        self.interpolator._update(
+            (entries[touched], 0, slice(0, 1)),
+            default_backend.reshape(
+                default_backend.einsum('hb->bh', histograms), (-1, 3, 1)
+            ),
+        )
+
+    def _precompute(self):
+        tensorlib, _ = get_backend()
+        self.entry_indices = tensorlib.astensor([self._entry_indices], dtype='int')
+        n_samples, n_bins = (
+            len(self._access_indices[0]),
+            len(self._access_indices[0][0]),
+        )
+        self.access_indices = tensorlib.reshape(
+            tensorlib.astensor(self._access_indices, dtype='int'),
+            (self.max_multiplicity, n_samples, 1, n_bins),
+        )
+
+    def apply(self, pars):
+        tensorlib, _ = get_backend()
+        if len(tensorlib.shape(pars)) == 1:
+            pars = tensorlib.reshape(pars, (1, -1))
+        n_alphas = tensorlib.shape(pars)[0]
+
+        # (n_alphas, n_entries)
+        values = _batched_gather(pars, self.entry_indices, 0)
+        if self.interpolator is not None:
+            results = self.interpolator(tensorlib.einsum('ae->ea', values))
+            values = tensorlib.einsum(
+                'ea->ae', tensorlib.reshape(results, (self.n_entries, n_alphas))
+            )
+
+        defaults = self._default * tensorlib.ones((n_alphas, 1))
+        values = tensorlib.concatenate([values, defaults], axis=1)
+        return _batched_gather(values, self.access_indices, 2)
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives and the index of the parameter each one is
+                   taken with respect to, both in the shape of the result of
+                   ``apply``
+        """
+        tensorlib, _ = get_backend()
+        values = tensorlib.gather(pars, tensorlib.reshape(self.entry_indices, (-1,)))
+        if self.interpolator is not None:
+            derivatives = tensorlib.reshape(
+                self.interpolator.derivative(
+                    tensorlib.reshape(values, (self.n_entries, 1)), order
+                ),
+                (-1,),
+            )
+        elif order == 1:
+            derivatives = tensorlib.ones((self.n_entries,))
+        else:
+            derivatives = tensorlib.zeros((self.n_entries,))
+
+        # untouched cells do not depend on any parameter, point them at the
+        # first one with a zero derivative
+        derivatives = tensorlib.concatenate([derivatives, tensorlib.zeros((1,))])
+        par_indices = tensorlib.concatenate(
+            [
+                tensorlib.reshape(self.entry_indices, (-1,)),
+                tensorlib.astensor([0], dtype='int'),
+            ]
+        )
+        return (
+            tensorlib.gather(derivatives, self.access_indices),
+            tensorlib.gather(par_indices, self.access_indices),
+        )
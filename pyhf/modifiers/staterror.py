@@ -2,7 +2,9 @@ import logging
 
 from . import modifier
 from ..paramsets import constrained_by_normal
-from .. import get_backend, default_backend, events
+from .. import get_backend, default_backend
+from ..tensor.common import _BackendCached, _batched_gather
+from .sparse import sparse_applier
 
 log = logging.getLogger(__name__)
 
@@ -23,13 +25,14 @@ class staterror(object):
         }
 
 
-class staterror_combined(object):
+class staterror_combined(_BackendCached):
     def __init__(self, staterr_mods, pdfconfig, mega_mods):
         self._parindices = list(range(len(pdfconfig.suggested_init())))
 
         pnames = [pname for _, _, pname in staterr_mods]
         keys = ['{}/{}'.format(mtype, m) for m, mtype, _ in staterr_mods]
         staterr_mods = [m for m, _, _ in staterr_mods]
+        self._keys = keys
 
         self._staterror_indices = [
             self._parindices[pdfconfig.par_slice(p)] for p in pnames
@@ -73,8 +76,14 @@ class staterror_combined(object):
         else:
             self._factor_access_indices = None
 
-        self._precompute()
-        events.subscribe('tensorlib_changed')(self._precompute)
+        self._sparse = None
+        if pdfconfig.sparse and self._staterror_indices:
+            self._sparse = sparse_applier(
+                self._staterror_mask, self._factor_access_indices, 1.0
+            )
+            return
+
+        self._track_backend()
 
     def _precompute(self):
         tensorlib, _ = get_backend()
@@ -91,11 +100,13 @@ class staterror_combined(object):
         else:
             self.factor_access_indices = None
 
-    def finalize(self, pdfconfig):
-        staterror_mask = default_backend.astensor(self._staterror_mask)
-        for this_mask, uncert_this_mod, mod in zip(
-            staterror_mask, self.__staterror_uncrt, self._staterr_mods
-        ):
+    def finalize(self, pdfconfig, indices=None):
+        if indices is None:
+            indices = range(len(self._staterr_mods))
+        for index in indices:
+            this_mask = default_backend.astensor(self._staterror_mask[index])
+            uncert_this_mod = self.__staterror_uncrt[index]
+            mod = self._staterr_mods[index]
             active_nominals = default_backend.where(
                 this_mask[:, 0, :],
                 uncert_this_mod[:, 1, :],
@@ -122,21 +133,108 @@ class staterror_combined(object):
             assert len(sigmas[sigmas > 0]) == pdfconfig.param_set(mod).n_parameters
             pdfconfig.param_set(mod).sigmas = default_backend.tolist(sigmas[sigmas > 0])
 
+    def _update(self, pdfconfig, mega_mods, sample, keys, bins):
+        """
+        Refresh the uncertainties of a sample from the mega-channel data.
+
+        Args:
+            pdfconfig: the model configuration
+            mega_mods: the mega-channel modifier data
+            sample: the name of the sample
+            keys: the modifiers of the sample to refresh
+            bins: slice of the bins to refresh
+        """
+        sample_index = pdfconfig.samples.index(sample)
+        indices = []
+        for key in keys:
+            data = mega_mods[sample][key]['data']
+            index = self._keys.index(key)
+            uncert_this_mod = self.__staterror_uncrt[index]
+            uncert_this_mod[sample_index, 0, bins] = data['uncrt'][bins]
+            uncert_this_mod[sample_index, 1, bins] = data['nom_data'][bins]
+            indices.append(index)
+        self.finalize(pdfconfig, indices)
+
+    def _as_sparse(self):
+        """
+        The same modifiers as a :class:`sparse_applier`, see
+        :meth:`pyhf.pdf.Model.compile`.
+        """
+        if self._sparse is not None:
+            return self._sparse
+        if not self._staterror_indices:
+            return None
+        return sparse_applier(
+            self._staterror_mask, self._factor_access_indices, 1.0, subscribe=False
+        )
+
     def apply(self, pars):
+        if self._sparse is not None:
+            return self._sparse.apply(pars)
         tensorlib, _ = get_backend()
         if self.factor_access_indices is None:
             return
-        select_from = tensorlib.concatenate([pars, self.default_value])
-        factor_row = tensorlib.gather(select_from, self.factor_access_indices)
-
-        results_staterr = tensorlib.einsum(
-            's,a,mb->msab',
-            tensorlib.astensor(self.sample_ones),
-            tensorlib.astensor(self.alpha_ones),
-            factor_row,
-        )
+        if len(tensorlib.shape(pars)) == 1:
+            select_from = tensorlib.concatenate([pars, self.default_value])
+            factor_row = tensorlib.gather(select_from, self.factor_access_indices)
+
+            sample_ones = tensorlib.astensor(self.sample_ones)
+            alpha_ones = tensorlib.astensor(self.alpha_ones)
+            # the broadcast factors are only an input to the masking below
+            out = tensorlib.buffer(
+                tensorlib.shape(factor_row)[:1]
+                + tensorlib.shape(sample_ones)
+                + tensorlib.shape(alpha_ones)
+                + tensorlib.shape(factor_row)[1:],
+                name='staterror_combined.factors',
+                owner=self,
+            )
+            results_staterr = tensorlib.einsum(
+                's,a,mb->msab', sample_ones, alpha_ones, factor_row, out=out
+            )
+        else:
+            # pad every parameter vector with the default value and gather
+            # one row of factors per vector in the batch
+            batch_size = tensorlib.shape(pars)[0]
+            select_from = tensorlib.concatenate(
+                [pars, tensorlib.ones((batch_size, 1))], axis=1
+            )
+            n_mods, n_bins = tensorlib.shape(self.factor_access_indices)
+            factor_rows = _batched_gather(
+                select_from,
+                tensorlib.reshape(self.factor_access_indices, (n_mods, 1, n_bins)),
+                1,
+            )
+            results_staterr = tensorlib.einsum(
+                's,mab->msab', self.sample_ones, factor_rows
+            )
 
         results_staterr = tensorlib.where(
             self.staterror_mask, results_staterr, self.staterror_default
         )
         return results_staterr
+
+    def derivatives(self, pars, order=1):
+        """
+        The derivatives of ``apply(pars)`` for a single parameter vector.
+
+        Args:
+            pars (`tensor`): The parameter values
+            order (`int`): The order of the derivatives, 1 or 2
+
+        Returns:
+            tuple: The derivatives, in the shape of the result of ``apply``,
+                   and the index of the parameter each one is taken with
+                   respect to, broadcastable to the same shape
+        """
+        if self._sparse is not None:
+            return self._sparse.derivatives(pars, order)
+        tensorlib, _ = get_backend()
+        if self.factor_access_indices is None:
+            return
+        n_mods, n_bins = tensorlib.shape(self.factor_access_indices)
+        # every bin has its own parameter as the factor
+        return (
+            self.staterror_mask if order == 1 else 0 * self.staterror_mask,
+            tensorlib.reshape(self.factor_access_indices, (n_mods, 1, 1, n_bins)),
+        )
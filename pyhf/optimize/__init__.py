@@ -10,6 +10,13 @@ class _OptimizerRetriever(object):
             # for autocomplete and dir() calls
             self.scipy_optimizer = scipy_optimizer
             return scipy_optimizer
+        elif name == 'newton_optimizer':
+            from .opt_newton import newton_optimizer
+
+            assert newton_optimizer
+            # for autocomplete and dir() calls
+            self.newton_optimizer = newton_optimizer
+            return newton_optimizer
         elif name == 'pytorch_optimizer':
             try:
                 from .opt_pytorch import pytorch_optimizer
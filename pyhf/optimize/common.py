@@ -0,0 +1,105 @@
+class _FixedParameters(object):
+    """
+    Split the parameters of a fit into the free parameters, which the
+    minimizer sees, and the fixed parameters, which are held at their initial
+    values.
+
+    The full parameter vector is reassembled from the free parameters with a
+    single ``concatenate`` and ``gather``, so the objective stays
+    differentiable with respect to the free parameters in all backends.
+
+    Args:
+        init_pars (`list`): The initial values of all parameters
+        par_bounds (`list`): The bounds of all parameters
+        fixed_params (`list` of `bool`): Which parameters are fixed, ``None``
+                                         leaves all parameters free
+    """
+
+    def __init__(self, init_pars, par_bounds, fixed_params=None):
+        init_pars = list(init_pars)
+        if fixed_params is None:
+            fixed_params = [False] * len(init_pars)
+        self.free = [i for i, fixed in enumerate(fixed_params) if not fixed]
+        self.fixed = [i for i, fixed in enumerate(fixed_params) if fixed]
+        self.init_pars = [init_pars[i] for i in self.free]
+        self.par_bounds = [par_bounds[i] for i in self.free] if par_bounds else None
+        self.fixed_vals = [init_pars[i] for i in self.fixed]
+        # position of each parameter in the concatenation of free and fixed
+        self.order = [0] * len(init_pars)
+        for position, i in enumerate(self.free + self.fixed):
+            self.order[i] = position
+
+    @classmethod
+    def constrained(cls, pdf, constrained_mu, init_pars, par_bounds, fixed_params=None):
+        """
+        The fixed parameters of a fit conditional on the POI, which is held at
+        ``constrained_mu``.
+        """
+        init_pars = list(init_pars)
+        init_pars[pdf.config.poi_index] = constrained_mu
+        fixed_params = (
+            list(fixed_params) if fixed_params is not None else [False] * len(init_pars)
+        )
+        fixed_params[pdf.config.poi_index] = True
+        return cls(init_pars, par_bounds, fixed_params)
+
+    def assemble(self, free_pars):
+        """
+        The full parameter vector given the values of the free parameters.
+        """
+        from .. import get_backend
+
+        tensorlib, _ = get_backend()
+        if not self.fixed:
+            return tensorlib.astensor(free_pars)
+        if not self.free:
+            return tensorlib.astensor(self.fixed_vals)
+        return tensorlib.gather(
+            tensorlib.concatenate(
+                [tensorlib.astensor(free_pars), tensorlib.astensor(self.fixed_vals)]
+            ),
+            tensorlib.astensor(self.order, dtype='int'),
+        )
+
+    def values(self, free_vals):
+        """
+        The full list of parameter values given the fitted free parameters.
+        """
+        values = list(free_vals) + self.fixed_vals
+        return [values[position] for position in self.order]
+
+    def objective(self, objective):
+        """
+        The objective as a function of the free parameters only. The analytic
+        gradient and Hessian of the objective, if it provides them, are
+        restricted to the free parameters as well.
+        """
+
+        def reduced(free_pars, data, pdf):
+            return objective(self.assemble(free_pars), data, pdf)
+
+        value_and_grad = getattr(objective, 'value_and_grad', None)
+        if value_and_grad is not None:
+
+            def reduced_value_and_grad(free_pars, data, pdf):
+                from .. import get_backend
+
+                tensorlib, _ = get_backend()
+                value, grad = value_and_grad(self.assemble(free_pars), data, pdf)
+                return (
+                    value,
+                    tensorlib.gather(grad, tensorlib.astensor(self.free, dtype='int')),
+                )
+
+            reduced.value_and_grad = reduced_value_and_grad
+
+        hessian = getattr(objective, 'hessian', None)
+        if hessian is not None:
+
+            def reduced_hessian(free_pars, data, pdf):
+                # dense or sparse, both support indexing rows and columns
+                result = hessian(self.assemble(free_pars), data, pdf)
+                return result[self.free, :][:, self.free]
+
+            reduced.hessian = reduced_hessian
+        return reduced
@@ -13,7 +13,14 @@ class minuit_optimizer(object):
         self.steps = steps
 
     def _make_minuit(
-        self, objective, data, pdf, init_pars, init_bounds, constrained_mu=None
+        self,
+        objective,
+        data,
+        pdf,
+        init_pars,
+        init_bounds,
+        constrained_mu=None,
+        fixed_params=None,
     ):
         def f(pars):
             result = objective(pars, data, pdf)
@@ -27,11 +34,15 @@ class minuit_optimizer(object):
             'error_p{}'.format(i): (b[1] - b[0]) / float(self.steps)
             for i, b in enumerate(init_bounds)
         }
+        # Minuit removes the fixed parameters from the minimization itself
+        constraints = {
+            'fix_p{}'.format(i): True
+            for i, fixed in enumerate(fixed_params or [])
+            if fixed
+        }
         if constrained_mu is not None:
-            constraints = {'fix_p{}'.format(pdf.config.poi_index): True}
+            constraints['fix_p{}'.format(pdf.config.poi_index)] = True
             initvals['p{}'.format(pdf.config.poi_index)] = constrained_mu
-        else:
-            constraints = {}
         kwargs = {}
         for d in [kw, constraints, initvals, step_sizes]:
             kwargs.update(**d)
@@ -45,19 +56,36 @@ class minuit_optimizer(object):
         )
         return mm
 
-    def unconstrained_bestfit(self, objective, data, pdf, init_pars, par_bounds):
+    def unconstrained_bestfit(
+        self, objective, data, pdf, init_pars, par_bounds, fixed_params=None
+    ):
         # The Global Fit
-        mm = self._make_minuit(objective, data, pdf, init_pars, par_bounds)
+        mm = self._make_minuit(
+            objective, data, pdf, init_pars, par_bounds, fixed_params=fixed_params
+        )
         result = mm.migrad(ncall=self.ncall)
         assert result
         return np.asarray([x[1] for x in mm.values.items()])
 
     def constrained_bestfit(
-        self, objective, constrained_mu, data, pdf, init_pars, par_bounds
+        self,
+        objective,
+        constrained_mu,
+        data,
+        pdf,
+        init_pars,
+        par_bounds,
+        fixed_params=None,
     ):
         # The Fit Conditions on a specific POI value
         mm = self._make_minuit(
-            objective, data, pdf, init_pars, par_bounds, constrained_mu=constrained_mu
+            objective,
+            data,
+            pdf,
+            init_pars,
+            par_bounds,
+            constrained_mu=constrained_mu,
+            fixed_params=fixed_params,
         )
         result = mm.migrad(ncall=self.ncall)
         assert result
@@ -0,0 +1,149 @@
+from scipy import sparse
+from scipy.optimize import OptimizeResult
+from scipy.sparse.linalg import MatrixRankWarning, spsolve
+import numpy as np
+import logging
+import warnings
+
+from .common import _FixedParameters
+
+log = logging.getLogger(__name__)
+
+
+class newton_optimizer(object):
+    def __init__(self, **kwargs):
+        """
+        A bounded trust-region Newton method for HistFactory likelihoods.
+
+        Each iteration solves the Newton system with the analytic gradient
+        and Hessian of the objective, see :meth:`pyhf.pdf.Model.hessian`.
+        The Hessian is kept sparse: it is block-diagonal in the per-bin
+        gammas and only dense in the parameters acting on many bins, so the
+        system is solved with a sparse factorization. The size of the steps
+        is controlled by a Levenberg-Marquardt damping of the Hessian,
+        which is adapted to how well the quadratic model predicted the
+        change of the objective. Parameters at a bound, with the gradient
+        pointing out of the bounds, are held there for the iteration and the
+        steps are projected onto the bounds.
+
+        Only the numpy backend is supported.
+
+        Keyword Args:
+            maxiter (`int`): The maximum number of iterations
+            gtol (`float`): The tolerance on the largest projected gradient
+            ftol (`float`): The tolerance on the relative change of the objective
+        """
+        self.maxiter = kwargs.get('maxiter', 100)
+        self.gtol = kwargs.get('gtol', 1e-6)
+        self.ftol = kwargs.get('ftol', 1e-12)
+
+    def _minimize(self, objective, data, pdf, fixed):
+        value_and_grad = getattr(objective, 'value_and_grad', None)
+        hessian = getattr(objective, 'hessian', None)
+        if value_and_grad is None or hessian is None:
+            raise ValueError(
+                'The Newton optimizer needs the analytic gradient and Hessian of the objective.'
+            )
+        if not fixed.free:
+            return np.asarray(fixed.values([]))
+        result = self._newton(
+            fixed.objective(objective), data, pdf, fixed.init_pars, fixed.par_bounds
+        )
+        try:
+            assert result.success
+        except AssertionError:
+            log.error(result)
+            raise
+        return np.asarray(fixed.values(result.x))
+
+    def _newton(self, objective, data, pdf, init_pars, par_bounds):
+        lower, upper = np.asarray(par_bounds, dtype=np.float64).T
+        x = np.clip(np.asarray(init_pars, dtype=np.float64), lower, upper)
+        fun, grad = self._value_and_grad(objective, x, data, pdf)
+        damping = 0.0
+        message = 'Maximum number of iterations reached.'
+        success = False
+        for nit in range(1, self.maxiter + 1):
+            # converged if no parameter can move downhill within its bounds
+            if np.max(np.abs(np.clip(x - grad, lower, upper) - x)) <= self.gtol:
+                message = 'Projected gradient below tolerance.'
+                success = True
+                break
+            # hold the parameters that are pushed against their bounds
+            free = ~(((x <= lower) & (grad > 0)) | ((x >= upper) & (grad < 0)))
+            hess = sparse.csr_matrix(objective.hessian(x, data, pdf))
+            hess = hess[free, :][:, free].tocsc()
+            scale = np.maximum(np.abs(hess.diagonal()), 1e-8)
+            while True:
+                step = np.zeros_like(x)
+                step[free] = self._solve(hess, scale, damping, -grad[free])
+                trial = np.clip(x + step, lower, upper)
+                step = trial - x
+                predicted = -(
+                    grad.dot(step) + 0.5 * step[free].dot(hess.dot(step[free]))
+                )
+                if np.all(np.isfinite(step)) and predicted > 0:
+                    trial_fun, trial_grad = self._value_and_grad(
+                        objective, trial, data, pdf
+                    )
+                    ratio = (fun - trial_fun) / predicted
+                else:
+                    ratio = -np.inf
+                # widen or narrow the trust region for the next step
+                if ratio > 0.75:
+                    damping = damping / 3.0 if damping > 1e-8 else 0.0
+                elif ratio < 0.25:
+                    damping = max(4.0 * damping, 1e-4)
+                if ratio > 1e-4:
+                    break
+                if damping > 1e12:
+                    break
+            if ratio <= 1e-4:
+                message = 'The trust region collapsed without a descent step.'
+                break
+            change = fun - trial_fun
+            x, fun, grad = trial, trial_fun, trial_grad
+            if change <= self.ftol * max(1.0, abs(fun)):
+                message = 'Relative change of the objective below tolerance.'
+                success = True
+                break
+        return OptimizeResult(
+            x=x, fun=fun, jac=grad, nit=nit, success=success, message=message
+        )
+
+    @staticmethod
+    def _value_and_grad(objective, x, data, pdf):
+        value, grad = objective.value_and_grad(x, data, pdf)
+        return float(np.sum(value)), np.asarray(grad, dtype=np.float64)
+
+    @staticmethod
+    def _solve(hess, scale, damping, rhs):
+        # a singular (damped) Hessian gives non-finite steps and is rejected
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', MatrixRankWarning)
+            return np.atleast_1d(
+                spsolve(hess + sparse.diags(damping * scale, format='csc'), rhs)
+            )
+
+    def unconstrained_bestfit(
+        self, objective, data, pdf, init_pars, par_bounds, fixed_params=None
+    ):
+        # The Global Fit
+        fixed = _FixedParameters(init_pars, par_bounds, fixed_params)
+        return self._minimize(objective, data, pdf, fixed)
+
+    def constrained_bestfit(
+        self,
+        objective,
+        constrained_mu,
+        data,
+        pdf,
+        init_pars,
+        par_bounds,
+        fixed_params=None,
+    ):
+        # The Fit Conditions on a specific POI value
+        fixed = _FixedParameters.constrained(
+            pdf, constrained_mu, init_pars, par_bounds, fixed_params
+        )
+        return self._minimize(objective, data, pdf, fixed)
@@ -1,41 +1,113 @@
 from scipy.optimize import minimize
+import numpy as np
 import logging
 
+from .common import _FixedParameters
+
 log = logging.getLogger(__name__)
 
 
 class scipy_optimizer(object):
-    def __init__(self):
-        pass
+    def __init__(self, **kwargs):
+        # evaluate the gradient through the autodiff of the backend
+        # (PyTorch, TensorFlow) instead of finite differences
+        self.autodiff = kwargs.get('autodiff', True)
+        # without constraints in the fit other bounded methods can be used,
+        # e.g. L-BFGS-B. Unlike SLSQP, L-BFGS-B does not recover from steps
+        # to parameters where some expected rates are negative, so it is only
+        # suited for models whose rates stay positive within the bounds.
+        self.method = kwargs.get('method', 'SLSQP')
+        # the POI is not a parameter of the conditional fits, which then stop
+        # earlier than with the constraint, so the tolerance is tighter than
+        # the default of scipy
+        self.tol = kwargs.get('tol', 1e-10)
 
-    def unconstrained_bestfit(self, objective, data, pdf, init_pars, par_bounds):
-        # The Global Fit
+    def _objective_and_jac(self, objective, data, pdf, init_pars):
+        # use the analytic gradient of the objective if it provides one,
+        # otherwise the backend's autodiff or, failing that, the
+        # minimizer falls back to finite differences
+        from .. import get_backend
+
+        tensorlib, _ = get_backend()
+        value_and_grad = getattr(objective, 'value_and_grad', None)
+        if value_and_grad is not None and tensorlib.name == 'numpy':
+            return value_and_grad, True
+        if self.autodiff and tensorlib.name == 'pytorch':
+            return self._pytorch_value_and_grad(objective, tensorlib), True
+        if self.autodiff and tensorlib.name == 'tensorflow':
+            return (
+                self._tflow_value_and_grad(objective, tensorlib, data, pdf, init_pars),
+                True,
+            )
+        return objective, None
+
+    def _pytorch_value_and_grad(self, objective, tensorlib):
+        import torch
+
+        def value_and_grad(pars, data, pdf):
+            pars = tensorlib.astensor(pars).detach().requires_grad_()
+            value = torch.sum(objective(pars, data, pdf))
+            (grad,) = torch.autograd.grad(value, pars)
+            return value.item(), np.asarray(grad.numpy(), dtype=np.float64)
+
+        return value_and_grad
+
+    def _tflow_value_and_grad(self, objective, tensorlib, data, pdf, init_pars):
+        import tensorflow as tf
+
+        # build the graph once, the parameters are fed at each evaluation
+        pars = tensorlib.astensor(init_pars)
+        value = tf.reduce_sum(objective(pars, data, pdf))
+        grad = tf.gradients(value, pars)[0]
+
+        def value_and_grad(x, data, pdf):
+            v, g = tensorlib.session.run([value, grad], feed_dict={pars: x})
+            return float(v), np.asarray(g, dtype=np.float64)
+
+        return value_and_grad
+
+    def _minimize(self, objective, data, pdf, fixed):
+        if not fixed.free:
+            return np.asarray(fixed.values([]))
+        objective, jac = self._objective_and_jac(
+            fixed.objective(objective), data, pdf, fixed.init_pars
+        )
         result = minimize(
-            objective, init_pars, method='SLSQP', args=(data, pdf), bounds=par_bounds
+            objective,
+            fixed.init_pars,
+            method=self.method,
+            jac=jac,
+            args=(data, pdf),
+            bounds=fixed.par_bounds,
+            tol=self.tol,
         )
         try:
             assert result.success
         except AssertionError:
             log.error(result)
             raise
-        return result.x
+        return np.asarray(fixed.values(result.x))
+
+    def unconstrained_bestfit(
+        self, objective, data, pdf, init_pars, par_bounds, fixed_params=None
+    ):
+        # The Global Fit
+        fixed = _FixedParameters(init_pars, par_bounds, fixed_params)
+        return self._minimize(objective, data, pdf, fixed)
 
     def constrained_bestfit(
-        self, objective, constrained_mu, data, pdf, init_pars, par_bounds
+        self,
+        objective,
+        constrained_mu,
+        data,
+        pdf,
+        init_pars,
+        par_bounds,
+        fixed_params=None,
     ):
-        # The Fit Conditions on a specific POI value
-        cons = {'type': 'eq', 'fun': lambda v: v[pdf.config.poi_index] - constrained_mu}
-        result = minimize(
-            objective,
-            init_pars,
-            constraints=cons,
-            method='SLSQP',
-            args=(data, pdf),
-            bounds=par_bounds,
+        # The Fit Conditions on a specific POI value, which is fixed and
+        # removed from the parameters the minimizer sees
+        fixed = _FixedParameters.constrained(
+            pdf, constrained_mu, init_pars, par_bounds, fixed_params
         )
-        try:
-            assert result.success
-        except AssertionError:
-            log.error(result)
-            raise
-        return result.x
+        return self._minimize(objective, data, pdf, fixed)
@@ -2,6 +2,8 @@ import logging
 import numpy as np
 import tensorflow as tf
 
+from .common import _FixedParameters
+
 log = logging.getLogger(__name__)
 
 
@@ -12,65 +14,47 @@ class tflow_optimizer(object):
         self.maxit = 1000
         self.eps = 1e-4
 
-    def unconstrained_bestfit(self, objective, data, pdf, init_pars, par_bounds):
-        # the graph
+    def _minimize(self, objective, data, pdf, fixed):
+        if not fixed.free:
+            return fixed.values([])
+        # the graph, only the free parameters are fed and updated
         data = self.tb.astensor(data)
-        parlist = [self.tb.astensor([p]) for p in init_pars]
+        parlist = [self.tb.astensor([p]) for p in fixed.init_pars]
 
-        pars = self.tb.concatenate(parlist)
-        objective = objective(pars, data, pdf)
-        hessian = tf.hessians(objective, pars)[0]
-        gradient = tf.gradients(objective, pars)[0]
+        free_pars = self.tb.concatenate(parlist)
+        objective = objective(fixed.assemble(free_pars), data, pdf)
+        hessian = tf.hessians(objective, free_pars)[0]
+        gradient = tf.gradients(objective, free_pars)[0]
         invhess = tf.linalg.inv(hessian)
         update = tf.transpose(tf.matmul(invhess, tf.transpose(tf.stack([gradient]))))[0]
 
         # run newton's method
-        best_fit = init_pars
+        best_fit = fixed.init_pars
         for i in range(self.maxit):
-            up = self.tb.session.run(update, feed_dict={pars: best_fit})
+            up = self.tb.session.run(update, feed_dict={free_pars: best_fit})
             best_fit = best_fit - self.relax * up
             if np.abs(np.max(up)) < self.eps:
                 break
 
-        return best_fit.tolist()
+        return fixed.values(best_fit.tolist())
 
-    def constrained_bestfit(
-        self, objective, constrained_mu, data, pdf, init_pars, par_bounds
+    def unconstrained_bestfit(
+        self, objective, data, pdf, init_pars, par_bounds, fixed_params=None
     ):
-        # the graph
-        data = self.tb.astensor(data)
-
-        nuis_pars = [
-            self.tb.astensor([p])
-            for i, p in enumerate(init_pars)
-            if i != pdf.config.poi_index
-        ]
-        poi_par = self.tb.astensor([constrained_mu])
+        fixed = _FixedParameters(init_pars, par_bounds, fixed_params)
+        return self._minimize(objective, data, pdf, fixed)
 
-        nuis_cat = self.tb.concatenate(nuis_pars)
-        pars = self.tb.concatenate(
-            [
-                nuis_cat[: pdf.config.poi_index],
-                poi_par,
-                nuis_cat[pdf.config.poi_index :],
-            ]
+    def constrained_bestfit(
+        self,
+        objective,
+        constrained_mu,
+        data,
+        pdf,
+        init_pars,
+        par_bounds,
+        fixed_params=None,
+    ):
+        fixed = _FixedParameters.constrained(
+            pdf, constrained_mu, init_pars, par_bounds, fixed_params
         )
-        objective = objective(pars, data, pdf)
-        hessian = tf.hessians(objective, nuis_cat)[0]
-        gradient = tf.gradients(objective, nuis_cat)[0]
-        invhess = tf.linalg.inv(hessian)
-        update = tf.transpose(tf.matmul(invhess, tf.transpose(tf.stack([gradient]))))[0]
-
-        # run newton's method
-        best_fit_nuis = [
-            x for i, x in enumerate(init_pars) if i != pdf.config.poi_index
-        ]
-        for i in range(self.maxit):
-            up = self.tb.session.run(update, feed_dict={nuis_cat: best_fit_nuis})
-            best_fit_nuis = best_fit_nuis - self.relax * up
-            if np.abs(np.max(up)) < self.eps:
-                break
-
-        best_fit = best_fit_nuis.tolist()
-        best_fit.insert(pdf.config.poi_index, constrained_mu)
-        return best_fit
+        return self._minimize(objective, data, pdf, fixed)
@@ -7,6 +7,7 @@ class paramset(object):
         self.n_parameters = kwargs.pop('n_parameters')
         self.suggested_init = kwargs.pop('inits')
         self.suggested_bounds = kwargs.pop('bounds')
+        self.suggested_fixed = [kwargs.pop('fixed', False)] * self.n_parameters
 
 
 class unconstrained(paramset):
@@ -35,9 +36,8 @@ class constrained_by_poisson(paramset):
 
     def expected_data(self, pars):
         tensorlib, _ = get_backend()
-        return tensorlib.product(
-            tensorlib.stack([pars, tensorlib.astensor(self.factors)]), axis=0
-        )
+        # broadcasts over a leading batch dimension of pars
+        return pars * tensorlib.astensor(self.factors)
 
 
 def reduce_paramsets_requirements(paramsets_requirements, paramsets_user_configs):
@@ -51,6 +51,7 @@ def reduce_paramsets_requirements(paramsets_requirements, paramsets_user_configs
         'auxdata',
         'factors',
         'sigmas',
+        'fixed',
     ]
 
     """
@@ -79,6 +80,9 @@ def reduce_paramsets_requirements(paramsets_requirements, paramsets_user_configs
                 )
             else:
                 default_v = combined_paramset[k].pop()
+                # every paramset can be fixed by the user, none is by default
+                if k == 'fixed' and default_v == 'undefined':
+                    default_v = False
                 # get user-defined-config if it exists or set to default config
                 v = paramset_user_configs.get(k, default_v)
                 # if v is a tuple, it's not user-configured, so convert to list
@@ -1,19 +1,344 @@
 import copy
+import hashlib
+import importlib
+import json
 import logging
 
+import numpy as np
+from scipy import sparse
+from scipy.special import gammaln
+from six import string_types
+
 from . import get_backend, default_backend
 from . import exceptions
 from . import modifiers
 from . import utils
-from .constraints import gaussian_constraint_combined, poisson_constraint_combined
+from .constraints import (
+    gaussian_constraint_combined,
+    poisson_constraint_combined,
+    fused_constraint_combined,
+)
 from .paramsets import reduce_paramsets_requirements
+from .tensor.common import _BackendCached, _batched_gather
+from .version import __version__
 
 log = logging.getLogger(__name__)
 
 
+def _compiled_key(spec, schema, config_kwargs):
+    blob = json.dumps(
+        [spec, utils.load_schema(schema), config_kwargs, __version__], sort_keys=True
+    )
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def _fill_modifier_data(data, sl, modifier):
+    # write the data of a modifier of the spec into the bins sl of its row of
+    # the mega-modifier data
+    mtype = modifier['type']
+    if mtype == 'histosys':
+        data['lo_data'][sl] = modifier['data']['lo_data']
+        data['hi_data'][sl] = modifier['data']['hi_data']
+    elif mtype == 'normsys':
+        # broadcasting
+        data['lo'][sl] = modifier['data']['lo']
+        data['hi'][sl] = modifier['data']['hi']
+    elif mtype in ['shapesys', 'staterror']:
+        data['uncrt'][sl] = modifier['data']
+
+
+def _compact_entries(active, arrays):
+    # move the active entries of every cell (column) to the front and drop
+    # the rows that are inactive in all cells, the padding is zero
+    slots = np.cumsum(active, axis=0) - 1
+    n_slots = int(active.sum(axis=0).max()) if active.size else 0
+    entries, cells = np.nonzero(active)
+    compacted = []
+    for array in arrays:
+        table = np.zeros((n_slots, active.shape[1]), dtype=array.dtype)
+        table[slots[entries, cells], cells] = array[entries, cells]
+        compacted.append(table)
+    return compacted
+
+
+def _products_but_one(factors):
+    # the product of all rows but one, from the products of the rows before
+    # and after it
+    ones = np.ones_like(factors[:1])
+    before = np.cumprod(np.concatenate([ones, factors[:-1]]), axis=0)
+    after = np.cumprod(np.concatenate([ones, factors[:0:-1]]), axis=0)[::-1]
+    return before * after
+
+
+def _sparse_sum(terms, shape):
+    # a sparse matrix from (values, rows, columns) triples of broadcastable
+    # arrays, duplicate entries are summed up
+    terms = [np.broadcast_arrays(*term) for term in terms]
+    values, rows, columns = [
+        np.concatenate([np.ravel(term[i]) for term in terms] or [[]]) for i in range(3)
+    ]
+    return sparse.coo_matrix(
+        (values, (rows.astype(int), columns.astype(int))), shape=shape
+    )
+
+
+def _merge_signature(sample):
+    # Samples with the same multiplicative modifiers can be merged exactly:
+    # their factors are the same for all parameters. The histosys deltas are
+    # linear in the templates, so they are merged by summing the templates.
+    # Others, like shapesys with their own parameters, cannot be merged.
+    signature = []
+    for modifier in sample['modifiers']:
+        if modifier['type'] == 'histosys':
+            continue
+        elif modifier['type'] == 'normsys':
+            signature.append(
+                (
+                    modifier['type'],
+                    modifier['name'],
+                    modifier['data']['hi'],
+                    modifier['data']['lo'],
+                )
+            )
+        elif modifier['type'] in ['normfactor', 'lumi', 'shapefactor', 'staterror']:
+            signature.append((modifier['type'], modifier['name']))
+        else:
+            return None
+    return tuple(sorted(signature))
+
+
+def _merge_samples(samples):
+    # merge the samples of a channel with the same signature into the first
+    # of them, returns the samples and (name, merged sample names) pairs
+    keys = []
+    groups = {}
+    for sample in samples:
+        signature = _merge_signature(sample)
+        keys.append(sample['name'] if signature is None else signature)
+        groups.setdefault(keys[-1], []).append(sample)
+
+    merged_samples, merged = [], []
+    for sample, key in zip(samples, keys):
+        group = groups[key]
+        if len(group) == 1:
+            merged_samples.append(sample)
+        elif group[0] is sample:
+            merged_samples.append(_merged_sample(group))
+            merged.append((sample['name'], sorted(s['name'] for s in group)))
+    return merged_samples, merged
+
+
+def _modifier_data(sample, mtype, name, default=None):
+    return next(
+        (
+            m['data']
+            for m in sample['modifiers']
+            if (m['type'], m['name']) == (mtype, name)
+        ),
+        default,
+    )
+
+
+def _merged_sample(group):
+    # the sample with the summed nominal rates of the group, its modifiers
+    # are those of the first one, with the staterror uncertainties added in
+    # quadrature (for non-empty bins, as staterror does to compute the
+    # widths of the gammas) and the histosys templates summed up
+    nominals = [default_backend.astensor(s['data']) for s in group]
+    modifiers = []
+    for modifier in group[0]['modifiers']:
+        if modifier['type'] == 'histosys':
+            continue
+        modifier = copy.deepcopy(modifier)
+        if modifier['type'] == 'staterror':
+            uncertainties = default_backend.stack(
+                [
+                    default_backend.astensor(
+                        _modifier_data(s, 'staterror', modifier['name'])
+                    )
+                    * (nominal > 0)
+                    for s, nominal in zip(group, nominals)
+                ]
+            )
+            modifier['data'] = default_backend.tolist(
+                default_backend.sqrt(
+                    default_backend.sum(default_backend.power(uncertainties, 2), axis=0)
+                )
+            )
+        modifiers.append(modifier)
+
+    histosys = {
+        m['name'] for s in group for m in s['modifiers'] if m['type'] == 'histosys'
+    }
+    for name in sorted(histosys):
+        templates = {}
+        for k in ['lo_data', 'hi_data']:
+            templates[k] = default_backend.tolist(
+                default_backend.sum(
+                    [
+                        default_backend.astensor(
+                            _modifier_data(s, 'histosys', name, {k: nominal})[k]
+                        )
+                        for s, nominal in zip(group, nominals)
+                    ],
+                    axis=0,
+                )
+            )
+        modifiers.append({'name': name, 'type': 'histosys', 'data': templates})
+
+    return {
+        'name': group[0]['name'],
+        'data': default_backend.tolist(default_backend.sum(nominals, axis=0)),
+        'modifiers': modifiers,
+    }
+
+
+def _reduce_into_buffers(tensors, reduce, name, owner):
+    # concatenate the modifier outputs and reduce them along the modifier
+    # axis, both into scratch buffers of owner, see
+    # :meth:`pyhf.tensor.numpy_backend.buffer`. The result is overwritten by
+    # the next call and must not escape the caller.
+    tensorlib, _ = get_backend()
+    shapes = [tensorlib.shape(tensor) for tensor in tensors]
+    stacked = tensorlib.concatenate(
+        tensors,
+        out=tensorlib.buffer(
+            (sum(shape[0] for shape in shapes),) + shapes[0][1:],
+            name=name + '.stacked',
+            owner=owner,
+        ),
+    )
+    return reduce(
+        stacked,
+        axis=0,
+        out=tensorlib.buffer(shapes[0][1:], name=name + '.reduced', owner=owner),
+    )
+
+
+def _encode_state(obj, arrays, memo):
+    # a JSON description of the compiled state, with the numpy arrays stored
+    # in arrays and shared objects stored once and referenced by index
+    if obj is None or isinstance(obj, (bool, int, float) + string_types):
+        return obj
+    if type(obj).__module__.split('.')[0] in ['torch', 'tensorflow', 'mxnet']:
+        # tensors of the non-default backends are rebuilt by _precompute when
+        # loading, so they are not stored
+        return None
+    if isinstance(obj, tuple):
+        return {'tuple': [_encode_state(v, arrays, memo) for v in obj]}
+    if isinstance(obj, slice):
+        return {'slice': [obj.start, obj.stop, obj.step]}
+    if isinstance(obj, np.generic):
+        obj = np.asarray(obj)
+    if id(obj) in memo:
+        return {'ref': memo[id(obj)][0]}
+    # keep obj alive, so that its id is not reused while encoding
+    memo[id(obj)] = (len(memo), obj)
+    ref = memo[id(obj)][0]
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            raise TypeError('Arrays of Python objects cannot be saved.')
+        base = obj
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        if base is not obj and (base.flags.c_contiguous or base.flags.f_contiguous):
+            # views, e.g. the rows of the mega-modifier data, must keep
+            # sharing the memory of the array they are taken from
+            address = obj.__array_interface__['data'][0]
+            return {
+                'id': ref,
+                'view': _encode_state(base, arrays, memo),
+                'offset': address - base.__array_interface__['data'][0],
+                'shape': list(obj.shape),
+                'strides': list(obj.strides),
+                'dtype': obj.dtype.str,
+            }
+        name = 'array{0:d}'.format(len(arrays))
+        arrays[name] = obj
+        return {'id': ref, 'array': name, 'scalar': obj.ndim == 0}
+    if isinstance(obj, list):
+        return {'id': ref, 'list': [_encode_state(v, arrays, memo) for v in obj]}
+    if isinstance(obj, dict):
+        return {
+            'id': ref,
+            'dict': [
+                [_encode_state(k, arrays, memo), _encode_state(v, arrays, memo)]
+                for k, v in obj.items()
+            ],
+        }
+    if type(obj).__module__.split('.')[0] == 'pyhf' and hasattr(obj, '__dict__'):
+        return {
+            'id': ref,
+            'object': [type(obj).__module__, type(obj).__name__],
+            'state': _encode_state(obj.__dict__, arrays, memo),
+        }
+    raise TypeError('Objects of type {0} cannot be saved.'.format(type(obj)))
+
+
+def _decode_state(obj, arrays, refs):
+    # the inverse of _encode_state, which only creates builtin containers,
+    # numpy arrays and instances of pyhf classes
+    if not isinstance(obj, dict):
+        return obj
+    if 'tuple' in obj:
+        return tuple(_decode_state(v, arrays, refs) for v in obj['tuple'])
+    if 'slice' in obj:
+        return slice(*obj['slice'])
+    if 'ref' in obj:
+        return refs[obj['ref']]
+    if 'array' in obj:
+        result = arrays[obj['array']]
+        result = result[()] if obj['scalar'] else result
+    elif 'view' in obj:
+        result = np.ndarray(
+            obj['shape'],
+            dtype=obj['dtype'],
+            buffer=_decode_state(obj['view'], arrays, refs),
+            offset=obj['offset'],
+            strides=obj['strides'],
+        )
+    elif 'list' in obj:
+        result = refs[obj['id']] = []
+        result.extend(_decode_state(v, arrays, refs) for v in obj['list'])
+    elif 'dict' in obj:
+        result = refs[obj['id']] = {}
+        for k, v in obj['dict']:
+            result[_decode_state(k, arrays, refs)] = _decode_state(v, arrays, refs)
+    else:
+        module, name = obj['object']
+        if module.split('.')[0] != 'pyhf':
+            raise exceptions.InvalidCompiledModel(
+                'Objects of {0:s}.{1:s} cannot be loaded.'.format(module, name)
+            )
+        cls = getattr(importlib.import_module(module), name)
+        result = refs[obj['id']] = cls.__new__(cls)
+        result.__dict__.update(_decode_state(obj['state'], arrays, refs))
+    refs[obj['id']] = result
+    return result
+
+
 class _ModelConfig(object):
-    def __init__(self, spec, poiname='mu'):
+    def __init__(
+        self,
+        spec,
+        poiname='mu',
+        sparse=False,
+        incremental=False,
+        fold_constants=False,
+        merge_samples=False,
+    ):
         self.poi_index = None
+        # whether the combined modifiers only store the entries they touch
+        self.sparse = sparse
+        # whether the combined modifiers are only re-evaluated if their
+        # parameters changed since the last evaluation
+        self.incremental = incremental
+        # whether the modifiers and samples that do not depend on any
+        # parameter are folded into constants when the model is built
+        self.fold_constants = fold_constants
+        # whether the samples of a channel with the same multiplicative
+        # modifiers are merged into a single mega-sample
+        self.merge_samples = merge_samples
         self.par_map = {}
         self.par_order = []
         self.auxdata = []
@@ -29,7 +354,9 @@ class _ModelConfig(object):
                         parameter['name']
                     )
                 )
-            _paramsets_user_configs[parameter.pop('name')] = parameter
+            _paramsets_user_configs[parameter['name']] = {
+                k: v for k, v in parameter.items() if k != 'name'
+            }
 
         self.channels = []
         self.samples = []
@@ -113,6 +440,12 @@ class _ModelConfig(object):
             bounds = bounds + self.par_map[name]['paramset'].suggested_bounds
         return bounds
 
+    def suggested_fixed(self):
+        fixed = []
+        for name in self.par_order:
+            fixed = fixed + self.par_map[name]['paramset'].suggested_fixed
+        return fixed
+
     def par_slice(self, name):
         return self.par_map[name]['slice']
 
@@ -156,8 +489,9 @@ class _ModelConfig(object):
 
 class Model(object):
     def __init__(self, spec, **config_kwargs):
-        self.spec = copy.deepcopy(spec)  # may get modified by config
+        self.spec = copy.deepcopy(spec)
         self.schema = config_kwargs.pop('schema', utils.get_default_schema())
+        self._config_kwargs = dict(config_kwargs)
         # run jsonschema validation of input specification against the (provided) schema
         log.info("Validating spec against schema: {0:s}".format(self.schema))
         utils.validate(self.spec, self.schema)
@@ -175,9 +509,13 @@ class Model(object):
             if hasattr(parset, 'pdf_type'):  # is constrained
                 self.config.auxdata += parset.auxdata
                 self.config.auxdata_order.append(k)
+        self._precompute_auxdata()
 
         self.constraints_gaussian = gaussian_constraint_combined(self.config)
         self.constraints_poisson = poisson_constraint_combined(self.config)
+        self.constraints = fused_constraint_combined(
+            self.constraints_gaussian, self.constraints_poisson
+        )
 
         self._factor_mods = [
             modtype
@@ -191,21 +529,6 @@ class Model(object):
         ]
 
     def _create_nominal_and_modifiers(self):
-        default_data_makers = {
-            'histosys': lambda: {
-                'hi_data': [],
-                'lo_data': [],
-                'nom_data': [],
-                'mask': [],
-            },
-            'lumi': lambda: {'mask': []},
-            'normsys': lambda: {'hi': [], 'lo': [], 'nom_data': [], 'mask': []},
-            'normfactor': lambda: {'mask': []},
-            'shapefactor': lambda: {'mask': []},
-            'shapesys': lambda: {'mask': [], 'uncrt': [], 'nom_data': []},
-            'staterror': lambda: {'mask': [], 'uncrt': [], 'nom_data': []},
-        }
-
         # the mega-channel will consist of mega-samples that subscribe to
         # mega-modifiers. i.e. while in normal histfactory, each sample might
         # be affected by some modifiers and some not, here we change it so that
@@ -214,134 +537,366 @@ class Model(object):
         # change the bin value for bins that are not originally affected by
         # that modifier
         #
-        # We don't actually set up the modifier data here for no-ops, but we do
-        # set up the entire structure
-        mega_mods = {}
-        for m, mtype, _ in self.config.modifiers:
+        # The arrays for the whole mega-channel are allocated up front, filled
+        # with the no-op values, and then only the bins of the channel/sample
+        # pairs that are defined in the spec get written. This keeps the build
+        # linear in the size of the spec.
+        channel_slices = {}
+        n_bins = 0
+        for c in self.config.channels:
+            channel_slices[c] = slice(n_bins, n_bins + self.config.channel_nbins[c])
+            n_bins += self.config.channel_nbins[c]
+
+        noop_mods, fixed_samples, dropped_mods = set(), set(), set()
+        if self.config.fold_constants:
+            noop_mods, fixed_samples, dropped_mods = self._find_constants()
+        # the samples of each channel as they enter the mega-channel, without
+        # the no-op modifiers
+        channel_samples = {
+            c['name']: [
+                dict(
+                    s,
+                    modifiers=[
+                        m
+                        for m in s['modifiers']
+                        if (c['name'], s['name'], m['type'], m['name']) not in noop_mods
+                    ],
+                )
+                for s in c['samples']
+            ]
+            for c in self.spec['channels']
+        }
+        merged_samples = []
+        if self.config.merge_samples:
+            for c, samples in channel_samples.items():
+                channel_samples[c], merged = _merge_samples(
+                    [s for s in samples if (c, s['name']) not in fixed_samples]
+                )
+                channel_samples[c] += [
+                    s for s in samples if (c, s['name']) in fixed_samples
+                ]
+                merged_samples += [(c,) + merge for merge in merged]
+        if self.config.fold_constants or self.config.merge_samples:
+            # only keep the mega-samples that are used in some channel
+            used_samples = {
+                s['name']
+                for c, samples in channel_samples.items()
+                for s in samples
+                if (c, s['name']) not in fixed_samples
+            }
+            self.config.samples = [
+                s for s in self.config.samples if s in used_samples
+            ] or self.config.samples[:1]
+        sample_indices = {s: i for i, s in enumerate(self.config.samples)}
+        n_samples = len(self.config.samples)
+
+        # set nominal to 0 for channel/sample if the pair doesn't exist, the
+        # fixed samples are summed up into constant rates instead
+        thenom = default_backend.zeros((n_samples, n_bins))
+        constant_rates = default_backend.zeros((n_bins,))
+        for c, samples in channel_samples.items():
+            sl = channel_slices[c]
+            for s in samples:
+                if (c, s['name']) in fixed_samples:
+                    constant_rates[sl] += default_backend.astensor(s['data'])
+                else:
+                    thenom[sample_indices[s['name']], sl] = s['data']
+        self._constant_rates = constant_rates if fixed_samples else None
+
+        default_data_makers = {
+            'histosys': lambda: {
+                'hi_data': thenom.copy(),
+                'lo_data': thenom.copy(),
+                'nom_data': thenom,
+            },
+            'lumi': lambda: {},
+            'normsys': lambda: {
+                'hi': default_backend.ones((n_samples, n_bins)),
+                'lo': default_backend.ones((n_samples, n_bins)),
+                'nom_data': default_backend.ones((n_samples, n_bins)),
+            },
+            'normfactor': lambda: {},
+            'shapefactor': lambda: {},
+            'shapesys': lambda: {
+                'uncrt': default_backend.zeros((n_samples, n_bins)),
+                'nom_data': thenom,
+            },
+            'staterror': lambda: {
+                'uncrt': default_backend.zeros((n_samples, n_bins)),
+                'nom_data': thenom,
+            },
+        }
+
+        mega_mods = {s: {} for s in self.config.samples}
+        mega_mods_data = {}
+        config_modifiers = [
+            x
+            for x in self.config.modifiers
+            if '{}/{}'.format(x[1], x[0]) not in dropped_mods
+        ]
+        for m, mtype, _ in config_modifiers:
             key = '{}/{}'.format(mtype, m)
-            for s in self.config.samples:
-                mega_mods.setdefault(s, {})[key] = {
+            try:
+                data = default_data_makers[mtype]()
+            except KeyError:
+                raise RuntimeError(
+                    'not sure how to combine {mtype} into the mega-channel'.format(
+                        mtype=mtype
+                    )
+                )
+            data['mask'] = default_backend.astensor(
+                default_backend.zeros((n_samples, n_bins)), dtype='bool'
+            )
+            mega_mods_data[key] = data
+            # each mega-sample sees its row of the mega-modifier data
+            for s, i in sample_indices.items():
+                mega_mods[s][key] = {
                     'type': mtype,
                     'name': m,
-                    'data': default_data_makers[mtype](),
+                    'data': {k: v[i] for k, v in data.items()},
                 }
 
-        # helper maps channel-name/sample-name to pairs of channel-sample structs
-        helper = {}
-        for c in self.spec['channels']:
-            for s in c['samples']:
-                helper.setdefault(c['name'], {})[s['name']] = (c, s)
-
-        mega_samples = {}
-        for s in self.config.samples:
-            mega_nom = []
-            for c in self.config.channels:
-                defined_samp = helper.get(c, {}).get(s)
-                defined_samp = None if not defined_samp else defined_samp[1]
-                # set nominal to 0 for channel/sample if the pair doesn't exist
-                nom = (
-                    defined_samp['data']
-                    if defined_samp
-                    else [0.0] * self.config.channel_nbins[c]
-                )
-                mega_nom += nom
-                defined_mods = (
-                    {
-                        '{}/{}'.format(x['type'], x['name']): x
-                        for x in defined_samp['modifiers']
-                    }
-                    if defined_samp
-                    else {}
-                )
-                for m, mtype, _ in self.config.modifiers:
-                    key = '{}/{}'.format(mtype, m)
-                    # this is None if modifier doesn't affect channel/sample.
-                    thismod = defined_mods.get(key)
-                    # print('key',key,thismod['data'] if thismod else None)
-                    if mtype == 'histosys':
-                        lo_data = thismod['data']['lo_data'] if thismod else nom
-                        hi_data = thismod['data']['hi_data'] if thismod else nom
-                        maskval = True if thismod else False
-                        mega_mods[s][key]['data']['lo_data'] += lo_data
-                        mega_mods[s][key]['data']['hi_data'] += hi_data
-                        mega_mods[s][key]['data']['nom_data'] += nom
-                        mega_mods[s][key]['data']['mask'] += [maskval] * len(
-                            nom
-                        )  # broadcasting
-                        pass
-                    elif mtype == 'normsys':
-                        maskval = True if thismod else False
-                        lo_factor = thismod['data']['lo'] if thismod else 1.0
-                        hi_factor = thismod['data']['hi'] if thismod else 1.0
-                        mega_mods[s][key]['data']['nom_data'] += [1.0] * len(nom)
-                        mega_mods[s][key]['data']['lo'] += [lo_factor] * len(
-                            nom
-                        )  # broadcasting
-                        mega_mods[s][key]['data']['hi'] += [hi_factor] * len(nom)
-                        mega_mods[s][key]['data']['mask'] += [maskval] * len(
-                            nom
-                        )  # broadcasting
-                    elif mtype in ['normfactor', 'shapefactor', 'lumi']:
-                        maskval = True if thismod else False
-                        mega_mods[s][key]['data']['mask'] += [maskval] * len(
-                            nom
-                        )  # broadcasting
-                    elif mtype in ['shapesys', 'staterror']:
-                        uncrt = thismod['data'] if thismod else [0.0] * len(nom)
-                        maskval = [True if thismod else False] * len(nom)
-                        mega_mods[s][key]['data']['mask'] += maskval
-                        mega_mods[s][key]['data']['uncrt'] += uncrt
-                        mega_mods[s][key]['data']['nom_data'] += nom
-                    else:
-                        raise RuntimeError(
-                            'not sure how to combine {mtype} into the mega-channel'.format(
-                                mtype=mtype
-                            )
-                        )
-            sample_dict = {
-                'name': 'mega_{}'.format(s),
-                'nom': mega_nom,
-                'modifiers': list(mega_mods[s].values()),
-            }
-            mega_samples[s] = sample_dict
+        for c, samples in channel_samples.items():
+            sl = channel_slices[c]
+            for s in samples:
+                for thismod in s['modifiers']:
+                    key = '{}/{}'.format(thismod['type'], thismod['name'])
+                    data = mega_mods[s['name']][key]['data']
+                    data['mask'][sl] = True
+                    _fill_modifier_data(data, sl, thismod)
 
         self.mega_mods = mega_mods
+        self._channel_slices = channel_slices
 
         tensorlib, _ = get_backend()
-        thenom = default_backend.astensor(
-            [mega_samples[s]['nom'] for s in self.config.samples]
-        )
-        self.thenom = default_backend.reshape(
-            thenom,
-            (
-                1,
-                len(self.config.samples),
-                1,
-                sum(list(self.config.channel_nbins.values())),
-            ),
-        )
+        self.thenom = default_backend.reshape(thenom, (1, n_samples, 1, n_bins))
         self.modifiers_appliers = {
             k: c(
-                [x for x in self.config.modifiers if x[1] == k],  # x[1] is mtype
+                [x for x in config_modifiers if x[1] == k],  # x[1] is mtype
                 self.config,
                 mega_mods,
             )
             for k, c in modifiers.combined.items()
         }
+        # the parameters read by each of the combined modifiers
+        self._modifiers_par_indices = {
+            k: default_backend.astensor(
+                sorted(
+                    {
+                        index
+                        for _, mtype, pname in config_modifiers
+                        if mtype == k
+                        for index in range(
+                            self.config.par_slice(pname).start,
+                            self.config.par_slice(pname).stop,
+                        )
+                    }
+                ),
+                dtype='int',
+            )
+            for k in self.modifiers_appliers
+        }
+        self._modifications_cache = {}
+
+        for key in dropped_mods:
+            mtype, m = key.split('/', 1)
+            if mtype == 'shapesys':
+                # the gammas are not used, but keep them with a constraint
+                # that is maximal at one so that the parameters do not change
+                parset = self.config.param_set(m)
+                parset.factors = [1.0] * parset.n_parameters
+                parset.auxdata = [1.0] * parset.n_parameters
+        self.folded = {
+            'modifiers': sorted(noop_mods),
+            'samples': sorted(fixed_samples),
+            'combined': sorted(dropped_mods),
+        }
+        self.merged = sorted(merged_samples)
+        if self.config.merge_samples:
+            log.info(
+                'Merged {0:d} samples into {1:d}.'.format(
+                    sum(len(samples) for _, _, samples in merged_samples),
+                    len(merged_samples),
+                )
+            )
+        if self.config.fold_constants:
+            log.info(
+                'Folded {0:d} no-op modifiers and {1:d} fixed samples into constants, '
+                'dropped {2:d} combined modifiers and {3:d} mega-samples.'.format(
+                    len(noop_mods),
+                    len(fixed_samples),
+                    len(dropped_mods),
+                    len(set(s for _, s in fixed_samples) - set(self.config.samples)),
+                )
+            )
+
+    def _find_constants(self):
+        # the modifiers of the samples that never change the rates, the
+        # samples of the channels that are left without any other modifier,
+        # and the combined modifiers that only have no-op entries
+        noop_mods, fixed_samples, active_mods = set(), set(), set()
+        for c in self.spec['channels']:
+            for s in c['samples']:
+                is_fixed = True
+                for m in s['modifiers']:
+                    is_noop = getattr(modifiers.registry[m['type']], 'is_noop', None)
+                    if is_noop is not None and is_noop(m['data'], s['data']):
+                        noop_mods.add((c['name'], s['name'], m['type'], m['name']))
+                    else:
+                        is_fixed = False
+                        active_mods.add('{}/{}'.format(m['type'], m['name']))
+                if is_fixed:
+                    fixed_samples.add((c['name'], s['name']))
+        dropped_mods = {
+            '{}/{}'.format(mtype, m) for m, mtype, _ in self.config.modifiers
+        } - active_mods
+        return noop_mods, fixed_samples, dropped_mods
+
+    def update_sample(self, channel, sample, data=None, modifiers=None):
+        """
+        Replace the nominal rates and modifier data of a sample in place.
+
+        This is meant for scans over many signal hypotheses with a fixed
+        background model. Instead of building a new model for every signal,
+        only the entries of ``sample`` in ``channel`` are rewritten, so the
+        cost does not grow with the rest of the workspace. The modifiers
+        acting on the sample cannot change, so the parameters of the model
+        stay the same.
+
+        Example:
+
+            >>> import pyhf
+            >>> model = pyhf.simplemodels.hepdata_like([5.0], [10.0], [3.5])
+            >>> model.update_sample('singlechannel', 'signal', data=[7.0])
+            >>> model.expected_actualdata(model.config.suggested_init())
+            array([17.])
+
+        Args:
+            channel (`str`): The name of the channel
+            sample (`str`): The name of the sample in the channel
+            data (`list`): The new nominal rates of the sample
+            modifiers (`list`): The specifications of the modifiers of the
+                                sample whose data changes, in the same format
+                                as in the model specification
+
+        Raises:
+            ~pyhf.exceptions.InvalidModel: The sample, or one of the
+                modifiers, is not defined in the channel
+        """
+        try:
+            sample_spec = next(
+                s
+                for c in self.spec['channels']
+                if c['name'] == channel
+                for s in c['samples']
+                if s['name'] == sample
+            )
+        except StopIteration:
+            raise exceptions.InvalidModel(
+                "The sample '{0:s}' is not defined in the channel '{1:s}'.".format(
+                    sample, channel
+                )
+            )
+        if (channel, sample) in self.folded['samples'] or any(
+            (c, s) == (channel, sample) for c, s, _, _ in self.folded['modifiers']
+        ):
+            raise exceptions.InvalidModel(
+                "The sample '{0:s}' in the channel '{1:s}' was folded into constants.".format(
+                    sample, channel
+                )
+            )
+        if any(c == channel and sample in samples for c, _, samples in self.merged):
+            raise exceptions.InvalidModel(
+                "The sample '{0:s}' in the channel '{1:s}' was merged with other samples.".format(
+                    sample, channel
+                )
+            )
+        sl = self._channel_slices[channel]
+
+        if data is not None:
+            if len(data) != self.config.channel_nbins[channel]:
+                raise exceptions.InvalidModel(
+                    "The channel '{0:s}' has {1:d} bins, but {2:d} rates were given.".format(
+                        channel, self.config.channel_nbins[channel], len(data)
+                    )
+                )
+            sample_spec['data'] = list(data)
+            self.thenom[0, self.config.samples.index(sample), 0, sl] = data
+
+        sample_modifiers = {(m['name'], m['type']): m for m in sample_spec['modifiers']}
+        for modifier in modifiers or []:
+            try:
+                modifier_spec = sample_modifiers[(modifier['name'], modifier['type'])]
+            except KeyError:
+                raise exceptions.InvalidModel(
+                    "The sample '{0:s}' has no {1:s} modifier '{2:s}'.".format(
+                        sample, modifier['type'], modifier['name']
+                    )
+                )
+            modifier_spec['data'] = copy.deepcopy(modifier['data'])
+            key = '{}/{}'.format(modifier['type'], modifier['name'])
+            _fill_modifier_data(self.mega_mods[sample][key]['data'], sl, modifier)
+
+        # the nominal rates also enter the interpolated histograms and the
+        # relative uncertainties, so refresh all modifiers of the sample
+        for mtype in ['histosys', 'normsys', 'shapesys', 'staterror']:
+            keys = [
+                '{}/{}'.format(m['type'], m['name'])
+                for m in sample_spec['modifiers']
+                if m['type'] == mtype
+            ]
+            if keys:
+                self.modifiers_appliers[mtype]._update(
+                    self.config, self.mega_mods, sample, keys, sl
+                )
+
+        # shapesys and staterror set the auxdata and widths of the constraints
+        self.config.auxdata = [
+            auxdata
+            for k in self.config.auxdata_order
+            for auxdata in self.config.param_set(k).auxdata
+        ]
+        self._precompute_auxdata()
+        self.constraints_gaussian._refresh()
+        self.constraints_poisson._refresh()
+        self.constraints._refresh()
+        self._modifications_cache = {}
+        self._key = None
+
+    def _precompute_auxdata(self):
+        # the parameter and the factor of each auxdata entry, in the order
+        # the auxdata was generated in, so that the expected auxdata of all
+        # constrained paramsets is a single gather and multiplication
+        indices, factors = [], []
+        for parname in self.config.auxdata_order:
+            parslice = self.config.par_slice(parname)
+            parset = self.config.param_set(parname)
+            indices += range(parslice.start, parslice.stop)
+            # only the poisson constraints scale their rates
+            factors += getattr(parset, 'factors', [1.0] * parset.n_parameters)
+        self._auxdata_indices = default_backend.astensor(indices, dtype='int')
+        self._auxdata_factors = default_backend.astensor(factors)
 
     def expected_auxdata(self, pars):
+        if not self.config.auxdata_order:
+            return None
         tensorlib, _ = get_backend()
-        auxdata = None
-        for parname in self.config.auxdata_order:
-            # order matters! because we generated auxdata in a certain order
-            thisaux = self.config.param_set(parname).expected_data(
-                pars[self.config.par_slice(parname)]
-            )
-            tocat = [thisaux] if auxdata is None else [auxdata, thisaux]
-            auxdata = tensorlib.concatenate(tocat)
-        return auxdata
+        indices = tensorlib.astensor(self._auxdata_indices, dtype='int')
+        factors = tensorlib.astensor(self._auxdata_factors)
+        if len(tensorlib.shape(pars)) == 2:
+            indices = tensorlib.reshape(indices, (1, -1))
+            return _batched_gather(pars, indices, 0) * factors
+        return tensorlib.gather(pars, indices) * factors
 
     def _modifications(self, pars):
+        tensorlib, _ = get_backend()
+        if (
+            self.config.incremental
+            and tensorlib.name == 'numpy'
+            and len(tensorlib.shape(pars)) == 1
+        ):
+            return self._incremental_modifications(pars)
+
         deltas = list(
             filter(
                 lambda x: x is not None,
@@ -357,6 +912,39 @@ class Model(object):
 
         return deltas, factors
 
+    def _incremental_modifications(self, pars):
+        # Each combined modifier is reduced to the sum of its deltas or the
+        # product of its factors, and cached together with the values of the
+        # parameters it reads. Only the modifiers whose parameters changed
+        # since the last call are evaluated again, e.g. a single one when a
+        # scan or a finite difference moves a single parameter. The cache is
+        # only used with numpy, for which the outputs cannot be part of the
+        # graph of a gradient computation.
+        tensorlib, _ = get_backend()
+        deltas, factors = [], []
+        for keys, reduced, reduce in [
+            (self._delta_mods, deltas, tensorlib.sum),
+            (self._factor_mods, factors, tensorlib.product),
+        ]:
+            for k in keys:
+                values = tensorlib.gather(pars, self._modifiers_par_indices[k])
+                cached = self._modifications_cache.get(k)
+                # the dtype changes with the precision of the backend
+                if (
+                    cached is None
+                    or cached[0].dtype != values.dtype
+                    or not np.array_equal(cached[0], values)
+                ):
+                    output = self.modifiers_appliers[k].apply(pars)
+                    if output is not None:
+                        output = tensorlib.reshape(
+                            reduce(output, axis=0), (1,) + tensorlib.shape(output)[1:]
+                        )
+                    cached = self._modifications_cache[k] = (values, output)
+                if cached[1] is not None:
+                    reduced.append(cached[1])
+        return deltas, factors
+
     def expected_actualdata(self, pars):
         """
         For a single channel single sample, we compute
@@ -380,23 +968,34 @@ class Model(object):
             1. The main pdf of data and modified rates
             2. All Gaussian constraint as one call
             3. All Poisson constraints as one call
+
+        If ``pars`` is a batch of parameter vectors of shape ``(batch, n_pars)``
+        the batch is evaluated along the alpha axis of the modifiers and the
+        expected rates are returned with shape ``(batch, n_bins)``.
         """
         tensorlib, _ = get_backend()
         pars = tensorlib.astensor(pars)
 
         deltas, factors = self._modifications(pars)
 
-        allsum = tensorlib.concatenate(deltas + [tensorlib.astensor(self.thenom)])
-
-        nom_plus_delta = tensorlib.sum(allsum, axis=0)
-        nom_plus_delta = tensorlib.reshape(
-            nom_plus_delta, (1,) + tensorlib.shape(nom_plus_delta)
-        )
-
-        allfac = tensorlib.concatenate(factors + [nom_plus_delta])
+        # the nominal has a single alpha, broadcast it against the modifiers
+        nom_plus_delta = tensorlib.astensor(self.thenom)[0]
+        if deltas:
+            nom_plus_delta = nom_plus_delta + _reduce_into_buffers(
+                deltas, tensorlib.sum, 'Model.deltas', self
+            )
 
-        newbysample = tensorlib.product(allfac, axis=0)
+        newbysample = nom_plus_delta
+        if factors:
+            newbysample = (
+                _reduce_into_buffers(factors, tensorlib.product, 'Model.factors', self)
+                * nom_plus_delta
+            )
         newresults = tensorlib.sum(newbysample, axis=0)
+        if self._constant_rates is not None:
+            newresults = newresults + tensorlib.astensor(self._constant_rates)
+        if len(tensorlib.shape(pars)) == 2:
+            return newresults
         return newresults[0]  # only one alphas
 
     def expected_data(self, pars, include_auxdata=True):
@@ -412,35 +1011,69 @@ class Model(object):
             if expected_constraints is None
             else [expected_actual, expected_constraints]
         )
-        return tensorlib.concatenate(tocat)
+        return tensorlib.concatenate(tocat, axis=-1)
 
     def constraint_logpdf(self, auxdata, pars):
-        normal = self.constraints_gaussian.logpdf(auxdata, pars)
-        poisson = self.constraints_poisson.logpdf(auxdata, pars)
-        return normal + poisson
+        return self.constraints.logpdf(auxdata, pars)
 
     def mainlogpdf(self, maindata, pars):
         tensorlib, _ = get_backend()
         lambdas_data = self.expected_actualdata(pars)
         summands = tensorlib.poisson_logpdf(maindata, lambdas_data)
+        if len(tensorlib.shape(summands)) == 2:
+            # masking would flatten the batch, zero the non-finite terms instead
+            tosum = tensorlib.where(
+                tensorlib.isfinite(summands),
+                summands,
+                tensorlib.zeros(tensorlib.shape(summands)),
+            )
+            return tensorlib.accumulate(tosum, axis=1)
         tosum = tensorlib.boolean_mask(summands, tensorlib.isfinite(summands))
-        mainpdf = tensorlib.sum(tosum)
+        mainpdf = tensorlib.accumulate(tosum)
         return mainpdf
 
     def logpdf(self, pars, data):
+        """
+        Compute the log value of the full density.
+
+        Either argument can carry a leading batch dimension. A batch of
+        datasets, e.g. toys, is evaluated against the expected rates computed
+        once for the given parameters. If both are batched, the batch sizes
+        must agree and the pairs are evaluated element-wise.
+
+        Args:
+            pars (`tensor`): The parameter values, either a single vector of shape
+                             ``(n_pars,)`` or a batch of shape ``(batch, n_pars)``
+            data (`tensor`): The measurement data and the auxiliary data, either
+                             of shape ``(n_bins + n_aux,)`` or
+                             ``(batch, n_bins + n_aux)``
+
+        Returns:
+            Tensor: The log density of shape ``(1,)``, or ``(batch,)`` if
+                    either argument is batched
+        """
         try:
             tensorlib, _ = get_backend()
+            conversions = tensorlib.conversions
             pars, data = tensorlib.astensor(pars), tensorlib.astensor(data)
-            cut = tensorlib.shape(data)[0] - len(self.config.auxdata)
-            actual_data, aux_data = data[:cut], data[cut:]
+            cut = tensorlib.shape(data)[-1] - len(self.config.auxdata)
+            if len(tensorlib.shape(data)) == 2:
+                actual_data, aux_data = data[:, :cut], data[:, cut:]
+            else:
+                actual_data, aux_data = data[:cut], data[cut:]
 
             mainpdf = self.mainlogpdf(actual_data, pars)
             constraint = self.constraint_logpdf(aux_data, pars)
 
             result = mainpdf + constraint
-            return result * tensorlib.ones(
-                (1)
-            )  # ensure (1,) array shape also for numpy
+            # every conversion is a copy that the precomputed tensors avoid
+            log.debug(
+                'logpdf did %d tensor conversions', tensorlib.conversions - conversions
+            )
+            if len(tensorlib.shape(pars)) == 2 or len(tensorlib.shape(data)) == 2:
+                return result
+            # ensure (1,) array shape also for numpy
+            return tensorlib.reshape(result, (1,))
         except:
             log.error(
                 'eval failed for data {} pars: {}'.format(
@@ -449,6 +1082,746 @@ class Model(object):
             )
             raise
 
+    def logpdf_and_grad(self, pars, data):
+        """
+        Compute the log value of the full density and its gradient.
+
+        The gradient is derived analytically: the derivative of the Poisson
+        main term with respect to the expected rates is propagated through
+        the additive and multiplicative modifiers, including the piecewise
+        derivatives of the interpolators, and the derivatives of the
+        constraint terms are added. This costs about as much as a single
+        evaluation, where finite differences need one per parameter.
+
+        Only a single parameter vector and dataset are supported, and only
+        with the numpy backend.
+
+        Args:
+            pars (`tensor`): The parameter values of shape ``(n_pars,)``
+            data (`tensor`): The measurement data and the auxiliary data
+
+        Returns:
+            tuple: The log density of shape ``(1,)``, as computed by
+                   :meth:`logpdf`, and its gradient of shape ``(n_pars,)``
+        """
+        tensorlib, _ = get_backend()
+        if tensorlib.name != 'numpy':
+            raise NotImplementedError(
+                'The analytic gradient is only available for the numpy backend.'
+            )
+        pars, data = tensorlib.astensor(pars), tensorlib.astensor(data)
+        cut = tensorlib.shape(data)[0] - len(self.config.auxdata)
+        actual_data, aux_data = data[:cut], data[cut:]
+
+        deltas, delta_derivatives = [], []
+        for k in self._delta_mods:
+            delta = self.modifiers_appliers[k].apply(pars)
+            if delta is not None:
+                deltas.append(delta)
+                delta_derivatives.append(self.modifiers_appliers[k].derivatives(pars))
+        factors, factor_derivatives = [], []
+        for k in self._factor_mods:
+            factor = self.modifiers_appliers[k].apply(pars)
+            if factor is not None:
+                factors.append(factor)
+                factor_derivatives.append(self.modifiers_appliers[k].derivatives(pars))
+
+        nom_plus_delta = tensorlib.astensor(self.thenom)[0]
+        if deltas:
+            nom_plus_delta = nom_plus_delta + tensorlib.sum(
+                tensorlib.concatenate(deltas), axis=0
+            )
+        factors = tensorlib.concatenate(
+            factors or [tensorlib.ones((1,) + tensorlib.shape(nom_plus_delta))]
+        )
+        # the product of all factors but one, from the products of the
+        # factors before and after it
+        ones = tensorlib.ones((1,) + tensorlib.shape(nom_plus_delta))
+        factors_before = np.cumprod(tensorlib.concatenate([ones, factors[:-1]]), axis=0)
+        factors_after = np.cumprod(
+            tensorlib.concatenate([ones, factors[:0:-1]]), axis=0
+        )[::-1]
+        product = tensorlib.product(factors, axis=0)
+
+        lambdas_data = tensorlib.sum(product * nom_plus_delta, axis=0)[0]
+        if self._constant_rates is not None:
+            lambdas_data = lambdas_data + self._constant_rates
+        summands = tensorlib.poisson_logpdf(actual_data, lambdas_data)
+        finite = tensorlib.isfinite(summands)
+        mainpdf = tensorlib.accumulate(tensorlib.boolean_mask(summands, finite))
+        # d/dlambda of n log(lambda) - lambda, for the terms that are kept
+        dmain = tensorlib.where(
+            finite,
+            tensorlib.divide(actual_data, lambdas_data) - 1,
+            tensorlib.zeros(tensorlib.shape(summands)),
+        )
+
+        derivatives, par_indices = [], []
+        for derivative, indices in delta_derivatives:
+            derivatives.append(dmain * product * derivative)
+            par_indices.append(indices)
+        offset = 0
+        for derivative, indices in factor_derivatives:
+            rows = slice(offset, offset + tensorlib.shape(derivative)[0])
+            offset = rows.stop
+            derivatives.append(
+                dmain
+                * nom_plus_delta
+                * factors_before[rows]
+                * factors_after[rows]
+                * derivative
+            )
+            par_indices.append(indices)
+        for constraint in [self.constraints_gaussian, self.constraints_poisson]:
+            constraint_derivatives = constraint.logpdf_derivatives(aux_data, pars)
+            if constraint_derivatives is not None:
+                derivatives.append(constraint_derivatives[0])
+                par_indices.append(constraint_derivatives[1])
+
+        # sum up the derivatives with respect to the same parameter
+        n_pars = tensorlib.shape(pars)[0]
+        grad = np.bincount(
+            np.concatenate(
+                [
+                    np.broadcast_to(indices, np.shape(derivative)).ravel()
+                    for derivative, indices in zip(derivatives, par_indices)
+                ]
+            ),
+            weights=np.concatenate([np.ravel(d) for d in derivatives]),
+            minlength=n_pars,
+        )[:n_pars]
+
+        result = mainpdf + self.constraint_logpdf(aux_data, pars)
+        return tensorlib.reshape(result, (1,)), grad
+
+    def _modifier_derivatives(self, keys, pars):
+        # the values, first and second derivatives and parameter indices of
+        # the stacked modifiers, each of shape (n_mods, n_samples * n_bins)
+        stacks = []
+        for k in keys:
+            applier = self.modifiers_appliers[k]
+            value = applier.apply(pars)
+            if value is None:
+                continue
+            first, indices = applier.derivatives(pars)
+            second, _ = applier.derivatives(pars, order=2)
+            stacks.append(
+                [
+                    np.reshape(
+                        np.broadcast_to(array, np.shape(value)), (len(value), -1)
+                    )
+                    for array in [value, first, second, indices]
+                ]
+            )
+        if not stacks:
+            return None
+        return [np.concatenate(arrays) for arrays in zip(*stacks)]
+
+    def _hessian(self, pars, data, second_order=True, dense=True):
+        tensorlib, _ = get_backend()
+        if tensorlib.name != 'numpy':
+            raise NotImplementedError(
+                'The analytic Hessian is only available for the numpy backend.'
+            )
+        pars, data = tensorlib.astensor(pars), tensorlib.astensor(data)
+        cut = tensorlib.shape(data)[0] - len(self.config.auxdata)
+        actual_data, aux_data = data[:cut], data[cut:]
+        n_pars = tensorlib.shape(pars)[0]
+        n_bins = tensorlib.shape(self.thenom)[-1]
+
+        # work on flat (sample, bin) cells
+        nom_plus_delta = np.reshape(self.thenom, (-1,))
+        bins = np.arange(len(nom_plus_delta)) % n_bins
+        deltas = self._modifier_derivatives(self._delta_mods, pars)
+        factors = self._modifier_derivatives(self._factor_mods, pars)
+        if deltas is not None:
+            nom_plus_delta = nom_plus_delta + np.sum(deltas[0], axis=0)
+        product = np.prod(factors[0], axis=0) if factors is not None else 1.0
+
+        lambdas_data = np.bincount(
+            bins, weights=product * nom_plus_delta, minlength=n_bins
+        )
+        if self._constant_rates is not None:
+            lambdas_data = lambdas_data + self._constant_rates
+        finite = tensorlib.isfinite(tensorlib.poisson_logpdf(actual_data, lambdas_data))
+        # first and second derivative of n log(lambda) - lambda, for the terms
+        # that are kept
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dmain = np.where(finite, actual_data / lambdas_data - 1, 0)[bins]
+            ddmain = np.where(finite, -actual_data / lambdas_data ** 2, 0)
+
+        # only keep the entries of each cell that depend on a parameter, this
+        # is a handful per cell even for the dense layout
+        jacobian, hessian = [], []
+        if deltas is not None:
+            _, first, second, indices = deltas
+            first, second, indices = _compact_entries(
+                (first != 0) | (second != 0), [first, second, indices]
+            )
+            delta_terms = first, indices
+            jacobian.append((product * first, bins, indices))
+            if second_order:
+                hessian.append((dmain * product * second, indices, indices))
+        if factors is not None:
+            values, first, second, indices = factors
+            active = (first != 0) | (second != 0)
+            constant = np.prod(np.where(active, 1, values), axis=0)
+            valid, values, first, second, indices = _compact_entries(
+                active, [active, values, first, second, indices]
+            )
+            values = np.where(valid, values, 1)
+            others = constant * _products_but_one(values)
+            jacobian.append((nom_plus_delta * others * first, bins, indices))
+            if second_order:
+                hessian.append(
+                    (dmain * nom_plus_delta * others * second, indices, indices)
+                )
+                if deltas is not None:
+                    # the cross terms of the deltas and factors of a cell
+                    cross = dmain * delta_terms[0][:, None] * (others * first)
+                    hessian.append((cross, delta_terms[1][:, None], indices))
+                    hessian.append((cross, indices, delta_terms[1][:, None]))
+                for entry in range(len(values)):
+                    # the product of all factors but this and another one
+                    without_entry = values.copy()
+                    without_entry[entry] = 1
+                    cross = (
+                        dmain
+                        * nom_plus_delta
+                        * constant
+                        * _products_but_one(without_entry)
+                        * first[entry]
+                        * first
+                    )
+                    cross[entry] = 0
+                    hessian.append((cross, indices[entry], indices))
+
+        # the main term is a sum over bins, each depending on few parameters
+        # (e.g. only the gammas of its own bin), so the outer products of the
+        # derivatives are taken as a sparse matrix product
+        jacobian = _sparse_sum(jacobian, (n_bins, n_pars)).tocsr()
+        result = jacobian.T.dot(sparse.diags(ddmain).dot(jacobian))
+
+        for constraint in [self.constraints_gaussian, self.constraints_poisson]:
+            constraint_derivatives = constraint.logpdf_derivatives(
+                aux_data, pars, order=2
+            )
+            if constraint_derivatives is not None:
+                second, indices = constraint_derivatives
+                hessian.append((second, indices, indices))
+        result = result + _sparse_sum(hessian, (n_pars, n_pars))
+        # the sparse matrix is kept for the Newton solves of the fits
+        return result.toarray() if dense else result.tocsr()
+
+    def hessian(self, pars, data):
+        """
+        Compute the Hessian matrix of the log value of the full density.
+
+        Like :meth:`logpdf_and_grad`, it is derived analytically from the
+        first and second derivatives of the modifiers and constraints. Each
+        bin of the main term only depends on the few parameters of the
+        modifiers acting on it, so the outer products of its derivatives are
+        accumulated sparsely. The per-bin ``staterror`` and ``shapesys``
+        gammas hence only add a block-diagonal contribution, and the cost
+        does not grow with the square of their number.
+
+        Only a single parameter vector and dataset are supported, and only
+        with the numpy backend.
+
+        Args:
+            pars (`tensor`): The parameter values of shape ``(n_pars,)``
+            data (`tensor`): The measurement data and the auxiliary data
+
+        Returns:
+            Tensor: The Hessian of shape ``(n_pars, n_pars)``
+        """
+        return self._hessian(pars, data)
+
+    def fisher_information(self, pars):
+        """
+        Compute the expected Fisher information matrix.
+
+        This is the negative Hessian of the log density, evaluated for the
+        expected data at ``pars`` (the Asimov dataset). The second derivatives
+        of the rates are then weighted by zero, so only the outer products of
+        their first derivatives are computed.
+
+        Only the numpy backend is supported.
+
+        Args:
+            pars (`tensor`): The parameter values of shape ``(n_pars,)``
+
+        Returns:
+            Tensor: The Fisher information of shape ``(n_pars, n_pars)``
+        """
+        return -self._hessian(pars, self.expected_data(pars), second_order=False)
+
     def pdf(self, pars, data):
         tensorlib, _ = get_backend()
         return tensorlib.exp(self.logpdf(pars, data))
+
+    def bind(self, data, constants=True):
+        """
+        Bind the model to a fixed dataset, e.g. for the fits of a test statistic.
+
+        The terms of the log density that only depend on the data are
+        computed once, see :class:`_BoundModel`. The bound model must be
+        created again after :meth:`update_sample`.
+
+        Without ``constants``, the bound log density leaves out the terms
+        that do not depend on the parameters, i.e. the normalization of the
+        Poisson and Gaussian terms. This is enough for fits and differences
+        of the log density, like :math:`q_{\\mu}`.
+
+        Example:
+
+            >>> import pyhf
+            >>> model = pyhf.simplemodels.hepdata_like([5.0], [10.0], [3.5])
+            >>> data = [12.0] + model.config.auxdata
+            >>> bound = model.bind(data)
+            >>> bound.logpdf(model.config.suggested_init())
+            array([-4.46957599])
+
+        Args:
+            data (`tensor`): The measurement data and the auxiliary data
+            constants (`bool`): Whether to include the constant terms
+
+        Returns:
+            bound (`_BoundModel`): The model bound to ``data``
+        """
+        return _BoundModel(self, data, constants=constants)
+
+    def compile(self):
+        """
+        Flatten the expected rates and the log density into a static program.
+
+        The structure of the model is walked once, see :class:`_CompiledModel`.
+        Unlike :meth:`save_compiled`, nothing is stored: the program is kept
+        in memory and follows backend changes. It must be compiled again
+        after :meth:`update_sample`.
+
+        Example:
+
+            >>> import pyhf
+            >>> model = pyhf.simplemodels.hepdata_like([5.0], [10.0], [3.5])
+            >>> compiled = model.compile()
+            >>> pars = model.config.suggested_init()
+            >>> compiled.expected_actualdata(pars)
+            array([15.])
+            >>> compiled.logpdf(pars, [12.0] + model.config.auxdata)
+            array([-4.46957599])
+
+        Returns:
+            compiled (`_CompiledModel`): The compiled model
+        """
+        return _CompiledModel(self)
+
+    def compiled_key(self):
+        """
+        The key identifying the compiled state of the model.
+
+        It is a hash of the specification, the schema, the configuration
+        options and the pyhf version, so two models with the same key are
+        interchangeable.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest
+        """
+        # the key is also the fingerprint of the model in the fit cache, so it
+        # is kept until the model is modified by update_sample
+        if getattr(self, '_key', None) is None:
+            self._key = _compiled_key(self.spec, self.schema, self._config_kwargs)
+        return self._key
+
+    def save_compiled(self, path):
+        """
+        Save the compiled state of the model to a file.
+
+        This is everything built during construction: the configuration and
+        ``par_map``, the nominal rates, the combined modifiers with their
+        masks, histogram sets and interpolators, and the constraint terms. The
+        file can be loaded with :meth:`load_compiled` by any process using the
+        same pyhf version, skipping validation and construction altogether.
+
+        The file is a numpy ``.npz`` archive of the arrays of the model, with
+        the pyhf version, :meth:`compiled_key` and the structure of the model
+        in a JSON header. It holds no pickled objects, so loading it does not
+        execute any code.
+
+        Args:
+            path (`str`): The file to write to
+        """
+        arrays = {}
+        state = _encode_state(dict(self.__dict__, _modifications_cache={}), arrays, {})
+        header = {'version': __version__, 'key': self.compiled_key(), 'state': state}
+        with open(path, 'wb') as compiled_file:
+            np.savez(compiled_file, header=np.array(json.dumps(header)), **arrays)
+
+    @classmethod
+    def load_compiled(cls, path, spec=None, **config_kwargs):
+        """
+        Load a model saved with :meth:`save_compiled`.
+
+        Example:
+
+            >>> import pyhf
+            >>> model = pyhf.simplemodels.hepdata_like([5.0], [10.0], [3.5])
+            >>> model.save_compiled('model.pyhf')  # doctest: +SKIP
+            >>> model = pyhf.Model.load_compiled('model.pyhf')  # doctest: +SKIP
+
+        Args:
+            path (`str`): The file to read from
+            spec (`jsonable`): If given, the file must have been compiled from
+                               this specification, with the schema and model
+                               configuration given as keyword arguments
+
+        Returns:
+            model (`Model`): The model, ready for the current backend
+
+        Raises:
+            ~pyhf.exceptions.InvalidCompiledModel: The file was written by a
+                different pyhf version, does not match ``spec`` or refers to
+                objects other than the ones of a model
+        """
+        with open(path, 'rb') as compiled_file:
+            compiled = np.load(compiled_file, allow_pickle=False)
+            header = json.loads(str(compiled['header']))
+            if header['version'] != __version__:
+                raise exceptions.InvalidCompiledModel(
+                    '{0:s} was compiled with pyhf {1:s}, this is pyhf {2:s}.'.format(
+                        path, header['version'], __version__
+                    )
+                )
+            if spec is not None:
+                schema = config_kwargs.pop('schema', utils.get_default_schema())
+                if header['key'] != _compiled_key(spec, schema, config_kwargs):
+                    raise exceptions.InvalidCompiledModel(
+                        '{0:s} was not compiled from the given specification.'.format(
+                            path
+                        )
+                    )
+            arrays = {name: compiled[name] for name in compiled.files}
+            state = _decode_state(header['state'], arrays, {})
+
+        model = cls.__new__(cls)
+        model.__dict__.update(state)
+        model._modifications_cache = {}
+        for obj in model._precomputed():
+            obj._track_backend()
+        return model
+
+    def _precomputed(self):
+        # the objects that keep their backend tensors per backend, see
+        # pyhf.tensor.common._BackendCached
+        objs = [self.constraints_gaussian, self.constraints_poisson, self.constraints]
+        for applier in self.modifiers_appliers.values():
+            applier = applier._sparse if applier._sparse is not None else applier
+            objs.append(applier)
+            if getattr(applier, 'interpolator', None) is not None:
+                objs.append(applier.interpolator)
+        return objs
+
+
+class _BoundModel(_BackendCached):
+    def __init__(self, model, data, constants=True):
+        r"""
+        A model bound to a fixed dataset.
+
+        During a fit, only the parameters change, yet :meth:`Model.logpdf`
+        splits the data, computes :math:`\log n!` for the Poisson terms,
+        gathers the auxiliary data of the constraints and masks the
+        non-finite terms of the main pdf with a data-dependent shape on every
+        call. Here all of this is done once, and the log density of a single
+        parameter vector is evaluated with fixed shapes.
+
+        The bound model can be used in place of the model, e.g. to pass it
+        to the optimizers together with its ``data``. For any other data,
+        or a batch of parameters, it falls back to the model.
+
+        Args:
+            model (`Model`): The model
+            data (`tensor`): The measurement data and the auxiliary data, not
+                             to be modified while bound
+            constants (`bool`): Whether to include the terms of the log
+                                density that do not depend on the parameters
+        """
+        tensorlib, _ = get_backend()
+        self.model = model
+        self.data = data
+        self.constants = constants
+        self._data = default_backend.astensor(tensorlib.tolist(data))
+        self._track_backend()
+
+    def _precompute(self):
+        tensorlib, _ = get_backend()
+        cut = default_backend.shape(self._data)[0] - len(self.model.config.auxdata)
+        actual_data, aux_data = self._data[:cut], self._data[cut:]
+        self.actual_data = tensorlib.astensor(default_backend.tolist(actual_data))
+        main_normalization = -gammaln(actual_data + 1.0)
+        if not self.constants:
+            main_normalization = 0 * main_normalization
+        self.main_normalization = tensorlib.astensor(
+            default_backend.tolist(main_normalization)
+        )
+        self.bound_constraints = self.model.constraints._bind(
+            aux_data, constants=self.constants
+        )
+        # the terms left out, which logpdf_and_grad takes off the log density
+        # of the model
+        self.constant_terms = 0.0
+        if not self.constants:
+            self.constant_terms = float(
+                default_backend.sum(-gammaln(actual_data + 1.0))
+            )
+            constraints = self.model.constraints._bind(aux_data, constants=True)
+            if constraints is not None:
+                self.constant_terms += float(constraints[1])
+
+    def __getattr__(self, name):
+        if name in self.__dict__.get('_backend_attrs', ()):
+            return _BackendCached.__getattr__(self, name)
+        # everything else is taken from the model
+        return getattr(self.model, name)
+
+    def logpdf(self, pars, data=None):
+        """
+        Compute the log value of the full density.
+
+        Args:
+            pars (`tensor`): The parameter values
+            data (`tensor`): The data, the bound data if ``None``
+
+        Returns:
+            Tensor: The log density, as computed by :meth:`Model.logpdf`
+        """
+        if data is not None and data is not self.data:
+            return self.model.logpdf(pars, data)
+        tensorlib, _ = get_backend()
+        pars = tensorlib.astensor(pars)
+        if len(tensorlib.shape(pars)) == 2:
+            return self.model.logpdf(pars, self.data)
+
+        lambdas_data = self.model.expected_actualdata(pars)
+        summands = (
+            self.actual_data * tensorlib.log(lambdas_data)
+            - lambdas_data
+            + self.main_normalization
+        )
+        mainpdf = tensorlib.accumulate(
+            tensorlib.where(
+                tensorlib.isfinite(summands),
+                summands,
+                tensorlib.zeros(tensorlib.shape(summands)),
+            )
+        )
+        constraint = self.model.constraints._bound_logpdf(self.bound_constraints, pars)
+        return tensorlib.reshape(mainpdf + constraint, (1,))
+
+    def logpdf_and_grad(self, pars, data=None):
+        """
+        Compute the log value of the full density and its gradient.
+
+        Args:
+            pars (`tensor`): The parameter values
+            data (`tensor`): The data, the bound data if ``None``
+
+        Returns:
+            tuple: The log density, as computed by :meth:`logpdf`, and its
+                   gradient, as computed by :meth:`Model.logpdf_and_grad`
+        """
+        if data is not None and data is not self.data:
+            return self.model.logpdf_and_grad(pars, data)
+        logpdf, grad = self.model.logpdf_and_grad(pars, self.data)
+        return logpdf - self.constant_terms, grad
+
+
+class _CompiledModel(_BackendCached):
+    def __init__(self, model):
+        """
+        The expected rates and the log density of a model as a static program.
+
+        On every call, :meth:`Model.expected_actualdata` asks each combined
+        modifier for its output, drops the missing ones, and concatenates and
+        reduces the rest. Here the model is walked once instead. Every
+        combined modifier is expressed by its (modifier, sample, bin) entries,
+        see :class:`pyhf.modifiers.sparse.sparse_applier`, and the entries of
+        all of them are merged into a single program:
+
+            1. gather the parameters of all entries
+            2. interpolate the histosys and normsys entries
+            3. gather the deltas and the factors of each (sample, bin) from
+               the entries and reduce them
+            4. apply them to the nominal rates and sum over the samples
+
+        The tensors of the program are precomputed for the current backend,
+        and the steps that do not depend on any parameter are folded into
+        constants.
+
+        The compiled model can be used in place of the model. For a batch of
+        parameters or data it falls back to the model.
+
+        Args:
+            model (`Model`): The model
+        """
+        self.model = model
+        self._appliers = [
+            (op_code, applier)
+            for op_code, keys in [
+                ('addition', model._delta_mods),
+                ('multiplication', model._factor_mods),
+            ]
+            for applier in [model.modifiers_appliers[k]._as_sparse() for k in keys]
+            if applier is not None
+        ]
+        self._track_backend()
+
+    def _precompute(self):
+        tensorlib, _ = get_backend()
+        self.tensorlib = tensorlib
+        entry_indices = []
+        self.programs = {}
+        for op_code in ['addition', 'multiplication']:
+            appliers = [a for o, a in self._appliers if o == op_code]
+            if not appliers:
+                self.programs[op_code] = None
+                continue
+            n_entries = sum(applier.n_entries for applier in appliers)
+            segments, access, offset = [], [], 0
+            for applier in appliers:
+                if applier.interpolator is not None:
+                    applier.interpolator._sync_backend()
+                start = len(entry_indices)
+                entry_indices += applier._entry_indices
+                stop = len(entry_indices)
+                if (
+                    applier.interpolator is None
+                    and segments
+                    and segments[-1][1] is None
+                ):
+                    # consecutive entries without interpolation are one segment
+                    start = segments.pop()[0].start
+                segments.append((slice(start, stop), applier.interpolator))
+                # point the slots of the applier into the entries of all
+                # appliers, with the default value after the last entry
+                indices = default_backend.astensor(applier._access_indices, dtype='int')
+                access.append(
+                    default_backend.where(
+                        indices == applier.n_entries, n_entries, indices + offset
+                    )
+                )
+                offset += applier.n_entries
+            self.programs[op_code] = (
+                segments,
+                tensorlib.astensor([appliers[0]._default]),
+                tensorlib.astensor(
+                    default_backend.tolist(default_backend.concatenate(access)),
+                    dtype='int',
+                ),
+            )
+        self.entry_indices = tensorlib.astensor(entry_indices, dtype='int')
+
+        nominal = self.model.thenom[0, :, 0, :]
+        constant_rates = self.model._constant_rates
+        if constant_rates is None:
+            constant_rates = default_backend.zeros(default_backend.shape(nominal)[-1:])
+        self.nominal = tensorlib.astensor(default_backend.tolist(nominal))
+        self.constant_rates = tensorlib.astensor(default_backend.tolist(constant_rates))
+        # without any modifiers the rates do not depend on the parameters
+        self.rates = None
+        if not self._appliers:
+            self.rates = tensorlib.astensor(
+                default_backend.tolist(
+                    default_backend.sum(nominal, axis=0) + constant_rates
+                )
+            )
+        self.n_bins = default_backend.shape(nominal)[-1]
+        self.zeros = tensorlib.zeros((self.n_bins,))
+
+    def _run(self, values, op_code, reduce):
+        # the reduced deltas or factors of each (sample, bin)
+        tensorlib = self.tensorlib
+        segments, default, access = self.programs[op_code]
+        results = [
+            values[entries]
+            if interpolator is None
+            else tensorlib.reshape(
+                interpolator(tensorlib.reshape(values[entries], (-1, 1))), (-1,)
+            )
+            for entries, interpolator in segments
+        ]
+        return reduce(
+            tensorlib.gather(tensorlib.concatenate(results + [default]), access), axis=0
+        )
+
+    def __getattr__(self, name):
+        if name in self.__dict__.get('_backend_attrs', ()):
+            return _BackendCached.__getattr__(self, name)
+        # everything else is taken from the model
+        return getattr(self.model, name)
+
+    def expected_actualdata(self, pars):
+        """
+        Compute the expected rates, as :meth:`Model.expected_actualdata`.
+
+        Args:
+            pars (`tensor`): The parameter values
+
+        Returns:
+            Tensor: The expected rates
+        """
+        tensorlib = self.tensorlib
+        pars = tensorlib.astensor(pars)
+        if len(tensorlib.shape(pars)) == 2:
+            return self.model.expected_actualdata(pars)
+        if self.rates is not None:
+            return self.rates
+
+        values = tensorlib.gather(pars, self.entry_indices)
+        rates = self.nominal
+        if self.programs['addition'] is not None:
+            rates = rates + self._run(values, 'addition', tensorlib.sum)
+        if self.programs['multiplication'] is not None:
+            rates = rates * self._run(values, 'multiplication', tensorlib.product)
+        return tensorlib.sum(rates, axis=0) + self.constant_rates
+
+    def expected_data(self, pars, include_auxdata=True):
+        tensorlib = self.tensorlib
+        pars = tensorlib.astensor(pars)
+        expected_actual = self.expected_actualdata(pars)
+        if not include_auxdata:
+            return expected_actual
+        expected_constraints = self.model.expected_auxdata(pars)
+        if expected_constraints is None:
+            return expected_actual
+        return tensorlib.concatenate([expected_actual, expected_constraints], axis=-1)
+
+    def logpdf(self, pars, data):
+        """
+        Compute the log value of the full density, as :meth:`Model.logpdf`.
+
+        Args:
+            pars (`tensor`): The parameter values
+            data (`tensor`): The measurement data and the auxiliary data
+
+        Returns:
+            Tensor: The log density
+        """
+        tensorlib = self.tensorlib
+        pars, data = tensorlib.astensor(pars), tensorlib.astensor(data)
+        if len(tensorlib.shape(pars)) == 2 or len(tensorlib.shape(data)) == 2:
+            return self.model.logpdf(pars, data)
+
+        summands = tensorlib.poisson_logpdf(
+            data[: self.n_bins], self.expected_actualdata(pars)
+        )
+        mainpdf = tensorlib.accumulate(
+            tensorlib.where(tensorlib.isfinite(summands), summands, self.zeros)
+        )
+        constraint = self.model.constraints.logpdf(data[self.n_bins :], pars)
+        return tensorlib.reshape(mainpdf + constraint, (1,))
+
+    def bind(self, data, constants=True):
+        """
+        Bind the compiled model to a fixed dataset, see :meth:`Model.bind`.
+        """
+        return _BoundModel(self, data, constants=constants)
@@ -0,0 +1,124 @@
+from .. import get_backend, default_backend, events
+
+
+def _batched_gather(pars, indices, batch_axis):
+    """
+    Gather from a batch of parameter vectors.
+
+    The ``(batch, n_pars)`` parameters are flattened and the per-vector
+    ``indices`` are offset by ``n_pars`` for every entry in the batch. This
+    only relies on a one-dimensional ``gather``, which all backends provide.
+
+    Args:
+        pars (`tensor`): The parameters of shape ``(batch, n_pars)``
+        indices (`tensor`): Integer indices into a single parameter vector, with
+                            a dimension of size 1 at ``batch_axis``
+        batch_axis (`int`): The axis of the result that enumerates the batch
+
+    Returns:
+        Tensor: The gathered values, with the batch at ``batch_axis``
+    """
+    tensorlib, _ = get_backend()
+    batch_size, n_pars = tensorlib.shape(pars)
+    offsets_shape = [1] * len(tensorlib.shape(indices))
+    offsets_shape[batch_axis] = batch_size
+    offsets = default_backend.reshape(
+        default_backend.astensor(range(0, batch_size * n_pars, n_pars), dtype='int'),
+        offsets_shape,
+    )
+    return tensorlib.gather(
+        tensorlib.reshape(pars, (-1,)),
+        indices + tensorlib.astensor(default_backend.tolist(offsets), dtype='int'),
+    )
+
+
+def _backend_key(tensorlib):
+    # tensors can be shared between backend instances that agree on these
+    return (tensorlib.name, tensorlib.precision, getattr(tensorlib, 'session', None))
+
+
+class _BackendCached(object):
+    """
+    Keep the tensors built by ``_precompute`` for every backend used.
+
+    The attributes that ``_precompute`` sets are recorded and cached per
+    backend. When the backend changes, the ones already built for the new
+    backend are swapped in, otherwise they are dropped and rebuilt by
+    ``_precompute`` on first access. Objects that are never used with a
+    backend thus never build its tensors, and switching back and forth
+    between backends does not rebuild anything.
+    """
+
+    def _track_backend(self):
+        # build the tensors for the current backend and follow backend changes,
+        # also after loading a saved object whose caches are not usable
+        self._backend_attrs = self.__dict__.get('_backend_attrs', ())
+        for attr in self._backend_attrs:
+            self.__dict__.pop(attr, None)
+        self._backend_caches = {}
+        self._fill_backend_cache()
+        events.subscribe('tensorlib_changed', weak=True)(self._backend_changed)
+
+    def _fill_backend_cache(self):
+        tensorlib, _ = get_backend()
+        before = set(self.__dict__)
+        self._precompute()
+        attrs = set(self._backend_attrs) | (set(self.__dict__) - before)
+        self._backend_attrs = tuple(sorted(attrs))
+        self._backend_key = _backend_key(tensorlib)
+        self._backend_caches[self._backend_key] = {
+            attr: self.__dict__[attr] for attr in attrs if attr in self.__dict__
+        }
+
+    def _backend_changed(self):
+        tensorlib, _ = get_backend()
+        key = _backend_key(tensorlib)
+        if key == self._backend_key:
+            return
+        if self._backend_key in self._backend_caches:
+            # keep what was (re)assigned since the cache was filled
+            self._backend_caches[self._backend_key] = {
+                attr: self.__dict__[attr]
+                for attr in self._backend_attrs
+                if attr in self.__dict__
+            }
+        for attr in self._backend_attrs:
+            self.__dict__.pop(attr, None)
+        self._backend_key = key
+        self.__dict__.update(self._backend_caches.get(key, {}))
+
+    def _sync_backend(self):
+        # make sure the tensors are for the current backend, also for objects
+        # that do not follow backend changes
+        if '_backend_caches' not in self.__dict__:
+            return self._precompute()
+        self._backend_changed()
+
+    def _refresh(self):
+        """
+        Rebuild the tensors after the data they are computed from changed.
+
+        The tensors of the current backend are rebuilt right away, the ones
+        of other backends on first use.
+        """
+        if '_backend_caches' not in self.__dict__:
+            # not following backend changes
+            return self._precompute()
+        for attr in self._backend_attrs:
+            self.__dict__.pop(attr, None)
+        self._backend_caches = {}
+        self._fill_backend_cache()
+
+    def __getattr__(self, name):
+        # only called for missing attributes, i.e. tensors not built yet
+        if name not in self.__dict__.get('_backend_attrs', ()):
+            raise AttributeError(
+                "'{0:s}' object has no attribute '{1:s}'".format(
+                    type(self).__name__, name
+                )
+            )
+        self._fill_backend_cache()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(name)
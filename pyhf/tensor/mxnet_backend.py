@@ -1,8 +1,8 @@
 from mxnet import nd
+import numpy as np
 
 import logging
 import math  # Required for normal()
-from numbers import Number  # Required for normal()
 from scipy.stats import norm  # Required for normal_cdf()
 
 log = logging.getLogger(__name__)
@@ -13,6 +13,27 @@ class mxnet_backend(object):
 
     def __init__(self, **kwargs):
         self.name = 'mxnet'
+        self.precision = kwargs.get('precision', '32b')
+        dtypemaps = {
+            '32b': {'float': 'float32', 'int': 'int32', 'bool': 'uint8'},
+            '64b': {'float': 'float64', 'int': 'int64', 'bool': 'uint8'},
+        }
+        if self.precision not in dtypemaps:
+            raise ValueError('unsupported precision {}'.format(self.precision))
+        self.dtypemap = dtypemaps[self.precision]
+        # the number of real conversions and copies done by astensor
+        self.conversions = 0
+
+    def buffer(self, shape, dtype='float', name=None, owner=None):
+        """
+        No scratch tensors, see :meth:`pyhf.tensor.numpy_backend.buffer`.
+
+        This backend ignores the ``out`` argument of the tensor operations.
+
+        Returns:
+            None
+        """
+        return None
 
     def clip(self, tensor_in, min, max):
         """
@@ -87,7 +108,7 @@ class mxnet_backend(object):
             (rows1 * cols1, rows2 * cols2),
         )
 
-    def gather(self, tensor, indices):
+    def gather(self, tensor, indices, out=None):
         return tensor[indices]
 
     def boolean_mask(self, tensor, mask):
@@ -98,21 +119,25 @@ class mxnet_backend(object):
         """
         Convert to a MXNet NDArray.
 
+        An NDArray of the requested dtype is returned as is.
+
         Args:
             tensor_in (Number or Tensor): Tensor object
 
         Returns:
             MXNet NDArray: A multi-dimensional, fixed-size homogenous array.
         """
-        dtypemap = {'float': 'float32', 'int': 'int32', 'bool': 'uint8'}
-        dtype = dtypemap[dtype]
+        dtype = self.dtypemap[dtype]
+        if isinstance(tensor_in, nd.NDArray) and tensor_in.dtype == np.dtype(dtype):
+            return tensor_in
+        self.conversions += 1
         try:
             tensor = nd.array(tensor_in, dtype=dtype)
         except ValueError:
             tensor = nd.array([tensor_in], dtype=dtype)
         return tensor
 
-    def sum(self, tensor_in, axis=None):
+    def sum(self, tensor_in, axis=None, out=None):
         """
         Compute the sum of array elements over given axes.
 
@@ -129,7 +154,25 @@ class mxnet_backend(object):
         else:
             return nd.sum(tensor_in, axis)
 
-    def product(self, tensor_in, axis=None):
+    def accumulate(self, tensor_in, axis=None):
+        """
+        Sum the elements in double precision, irrespective of the precision
+        of the backend, e.g. for the terms of a log-likelihood.
+
+        Args:
+            tensor_in (Tensor): Tensor object
+            axis (Number): The axis over which to sum
+
+        Returns:
+            MXNet NDArray: The sum in double precision
+        """
+        tensor_in = self.astensor(tensor_in).astype('float64')
+        if axis is None or tensor_in.shape == nd.array([]).size:
+            return nd.sum(tensor_in)
+        else:
+            return nd.sum(tensor_in, axis)
+
+    def product(self, tensor_in, axis=None, out=None):
         """
         Product of array elements over given axes.
 
@@ -160,7 +203,7 @@ class mxnet_backend(object):
         Returns:
             MXNet NDArray: ndarray of 1's with given shape.
         """
-        return nd.ones(shape)
+        return nd.ones(shape, dtype=self.dtypemap['float'])
 
     def zeros(self, shape):
         """
@@ -172,7 +215,7 @@ class mxnet_backend(object):
         Returns:
             MXNet NDArray: ndarray of 0's with given shape.
         """
-        return nd.zeros(shape)
+        return nd.zeros(shape, dtype=self.dtypemap['float'])
 
     def power(self, tensor_in_1, tensor_in_2):
         """
@@ -244,7 +287,7 @@ class mxnet_backend(object):
         tensor_in = self.astensor(tensor_in)
         return nd.exp(tensor_in)
 
-    def stack(self, sequence, axis=0):
+    def stack(self, sequence, axis=0, out=None):
         """
         Join a sequence of arrays along a new axis.
 
@@ -261,7 +304,7 @@ class mxnet_backend(object):
         """
         return nd.stack(*sequence, axis=axis)
 
-    def where(self, mask, tensor_in_1, tensor_in_2):
+    def where(self, mask, tensor_in_1, tensor_in_2, out=None):
         """
         Apply a boolean selection mask to the elements of the input tensors.
 
@@ -294,7 +337,7 @@ class mxnet_backend(object):
             nd.multiply(nd.subtract(1, mask), tensor_in_2),
         )
 
-    def concatenate(self, sequence, axis=0):
+    def concatenate(self, sequence, axis=0, out=None):
         """
         Join the elements of the sequence.
 
@@ -358,7 +401,7 @@ class mxnet_backend(object):
     def reshape(self, tensor, newshape):
         return nd.reshape(tensor, newshape)
 
-    def einsum(self, subscripts, *operands):
+    def einsum(self, subscripts, *operands, **kwargs):
         """
         A generalized contraction between tensors of arbitrary dimension.
 
@@ -375,8 +418,10 @@ class mxnet_backend(object):
         return self.astensor([])
 
     def poisson_logpdf(self, n, lam):
-        n = self.astensor(n)
-        lam = self.astensor(lam)
+        # in double precision, irrespective of the precision of the backend,
+        # as the terms of a log-likelihood, see accumulate
+        n = self.astensor(n).astype('float64')
+        lam = self.astensor(lam).astype('float64')
         return n * nd.log(lam) - lam - nd.gammaln(n + 1.0)
 
     def poisson(self, n, lam):
@@ -412,11 +457,15 @@ class mxnet_backend(object):
         return nd.exp((nd.log(lam) * n) - lam - nd.gammaln(n + 1.0))
 
     def normal_logpdf(self, x, mu, sigma):
+        # in double precision, as poisson_logpdf
+        x = self.astensor(x).astype('float64')
+        mu = self.astensor(mu).astype('float64')
+        sigma = self.astensor(sigma).astype('float64')
         # This is currently copied directly from PyTorch's source until a better
         # way can be found to do this in MXNet
         # https://github.com/pytorch/pytorch/blob/39520ffec15ab7e97691fed048de1832e83785e8/torch/distributions/normal.py#L70-L76
         variance = sigma ** 2
-        log_scale = math.log(sigma) if isinstance(sigma, Number) else sigma.log()
+        log_scale = sigma.log()
         return (
             -((x - mu) ** 2) / (2 * variance)
             - log_scale
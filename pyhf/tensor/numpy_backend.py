@@ -1,5 +1,6 @@
 import numpy as np
 import logging
+import weakref
 from scipy.special import gammaln
 from scipy.stats import norm
 
@@ -11,6 +12,67 @@ class numpy_backend(object):
 
     def __init__(self, **kwargs):
         self.name = 'numpy'
+        self.precision = kwargs.get('precision', '64b')
+        dtypemaps = {
+            '32b': {'float': np.float32, 'int': np.int32, 'bool': np.bool_},
+            '64b': {'float': np.float64, 'int': np.int64, 'bool': np.bool_},
+        }
+        if self.precision not in dtypemaps:
+            raise ValueError('unsupported precision {}'.format(self.precision))
+        self.dtypemap = dtypemaps[self.precision]
+        self._buffers = {}
+        # the buffers of each owner live as long as the owner
+        self._owned_buffers = weakref.WeakKeyDictionary()
+        # the number of real conversions and copies done by astensor
+        self.conversions = 0
+
+    def buffer(self, shape, dtype='float', name=None, owner=None):
+        """
+        A scratch tensor to pass as ``out`` to the tensor operations.
+
+        The buffers are pooled by ``owner``, ``name``, shape and dtype: asking
+        again for the same buffer returns the same memory, with undefined
+        contents. Use them for intermediate results that are no longer needed
+        once the calling function returns, and give the buffers that are
+        alive at the same time different names. Objects that use buffers
+        pass themselves as ``owner``, so that different objects never share
+        them, and the buffers are dropped together with the owner.
+
+        The pool is not thread-safe: the same object must not be evaluated
+        in several threads at once.
+
+        Example:
+
+            >>> import pyhf
+            >>> pyhf.set_backend(pyhf.tensor.numpy_backend())
+            >>> a = pyhf.tensorlib.astensor([[1, 2], [3, 4]])
+            >>> out = pyhf.tensorlib.buffer((2,), name='example')
+            >>> pyhf.tensorlib.sum(a, axis=0, out=out) is out
+            True
+            >>> out is pyhf.tensorlib.buffer((2,), name='example')
+            True
+
+        Args:
+            shape (`tuple`): The shape of the buffer
+            dtype (`str`): The dtype of the buffer, see :meth:`astensor`
+            name (`str`): The name of the buffer
+            owner (`object`): The object the buffer belongs to, any object
+                              that supports weak references
+
+        Returns:
+            `numpy.ndarray`: The buffer
+        """
+        if owner is None:
+            buffers = self._buffers
+        else:
+            buffers = self._owned_buffers.get(owner)
+            if buffers is None:
+                buffers = self._owned_buffers[owner] = {}
+        key = (name, tuple(shape), dtype)
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = buffers[key] = np.empty(shape, dtype=self.dtypemap[dtype])
+        return buffer
 
     def clip(self, tensor_in, min, max):
         """
@@ -47,8 +109,10 @@ class numpy_backend(object):
         tensor_in_2 = self.astensor(tensor_in_2)
         return np.outer(tensor_in_1, tensor_in_2)
 
-    def gather(self, tensor, indices):
-        return tensor[indices]
+    def gather(self, tensor, indices, out=None):
+        if out is None:
+            return tensor[indices]
+        return np.take(tensor, indices, axis=0, out=out)
 
     def boolean_mask(self, tensor, mask):
         return tensor[mask]
@@ -60,30 +124,48 @@ class numpy_backend(object):
         """
         Convert to a NumPy array.
 
+        An array of the requested dtype is returned as is.
+
         Args:
             tensor_in (Number or Tensor): Tensor object
 
         Returns:
             `numpy.ndarray`: A multi-dimensional, fixed-size homogenous array.
         """
-        dtypemap = {'float': np.float64, 'int': np.int64, 'bool': np.bool_}
-        dtype = dtypemap[dtype]
+        dtype = self.dtypemap[dtype]
+        if type(tensor_in) is np.ndarray and tensor_in.dtype == dtype:
+            return tensor_in
+        self.conversions += 1
         return np.asarray(tensor_in, dtype=dtype)
 
-    def sum(self, tensor_in, axis=None):
-        return np.sum(tensor_in, axis=axis)
+    def sum(self, tensor_in, axis=None, out=None):
+        return np.sum(tensor_in, axis=axis, out=out)
+
+    def accumulate(self, tensor_in, axis=None):
+        """
+        Sum the elements in double precision, irrespective of the precision
+        of the backend, e.g. for the terms of a log-likelihood.
 
-    def product(self, tensor_in, axis=None):
-        return np.product(tensor_in, axis=axis)
+        Args:
+            tensor_in (Tensor): Tensor object
+            axis (Number): The axis over which to sum
+
+        Returns:
+            `numpy.ndarray`: The sum in double precision
+        """
+        return np.sum(tensor_in, axis=axis, dtype=np.float64)
+
+    def product(self, tensor_in, axis=None, out=None):
+        return np.product(tensor_in, axis=axis, out=out)
 
     def abs(self, tensor):
         return np.abs(tensor)
 
     def ones(self, shape):
-        return np.ones(shape)
+        return np.ones(shape, dtype=self.dtypemap['float'])
 
     def zeros(self, shape):
-        return np.zeros(shape)
+        return np.zeros(shape, dtype=self.dtypemap['float'])
 
     def power(self, tensor_in_1, tensor_in_2):
         return np.power(tensor_in_1, tensor_in_2)
@@ -100,25 +182,30 @@ class numpy_backend(object):
     def exp(self, tensor_in):
         return np.exp(tensor_in)
 
-    def stack(self, sequence, axis=0):
-        return np.stack(sequence, axis=axis)
+    def stack(self, sequence, axis=0, out=None):
+        return np.stack(sequence, axis=axis, out=out)
 
-    def where(self, mask, tensor_in_1, tensor_in_2):
-        return np.where(mask, tensor_in_1, tensor_in_2)
+    def where(self, mask, tensor_in_1, tensor_in_2, out=None):
+        if out is None:
+            return np.where(mask, tensor_in_1, tensor_in_2)
+        np.copyto(out, tensor_in_2)
+        np.copyto(out, tensor_in_1, where=np.asarray(mask, dtype=np.bool_))
+        return out
 
-    def concatenate(self, sequence, axis=0):
+    def concatenate(self, sequence, axis=0, out=None):
         """
         Join a sequence of arrays along an existing axis.
 
         Args:
             sequence: sequence of tensors
             axis: dimension along which to concatenate
+            out: the tensor to write the result to, see :meth:`buffer`
 
         Returns:
             output: the concatenated tensor
 
         """
-        return np.concatenate(sequence, axis=axis)
+        return np.concatenate(sequence, axis=axis, out=out)
 
     def simple_broadcast(self, *args):
         """
@@ -148,7 +235,7 @@ class numpy_backend(object):
     def reshape(self, tensor, newshape):
         return np.reshape(tensor, newshape)
 
-    def einsum(self, subscripts, *operands):
+    def einsum(self, subscripts, *operands, **kwargs):
         """
         Evaluates the Einstein summation convention on the operands.
 
@@ -161,15 +248,21 @@ class numpy_backend(object):
         Args:
             subscripts: str, specifies the subscripts for summation
             operands: list of array_like, these are the tensors for the operation
+            out: the tensor to write the result to, see :meth:`buffer`
 
         Returns:
             tensor: the calculation based on the Einstein summation convention
         """
-        return np.einsum(subscripts, *operands)
+        out = kwargs.get('out')
+        if out is None:
+            return np.einsum(subscripts, *operands)
+        return np.einsum(subscripts, *operands, out=out, casting='same_kind')
 
     def poisson_logpdf(self, n, lam):
-        n = np.asarray(n)
-        lam = np.asarray(lam)
+        # in double precision, irrespective of the precision of the backend,
+        # as the terms of a log-likelihood, see accumulate
+        n = np.asarray(n, dtype=np.float64)
+        lam = np.asarray(lam, dtype=np.float64)
         return n * np.log(lam) - lam - gammaln(n + 1.0)
 
     def poisson(self, n, lam):
@@ -202,6 +295,10 @@ class numpy_backend(object):
         # this is much faster than
         # norm.logpdf(x, loc=mu, scale=sigma)
         # https://codereview.stackexchange.com/questions/69718/fastest-computation-of-n-likelihoods-on-normal-distributions
+        # in double precision, as poisson_logpdf
+        x = np.asarray(x, dtype=np.float64)
+        mu = np.asarray(mu, dtype=np.float64)
+        sigma = np.asarray(sigma, dtype=np.float64)
         root2 = np.sqrt(2)
         root2pi = np.sqrt(2 * np.pi)
         prefactor = -np.log(sigma * root2pi)
@@ -10,6 +10,27 @@ class pytorch_backend(object):
 
     def __init__(self, **kwargs):
         self.name = 'pytorch'
+        self.precision = kwargs.get('precision', '32b')
+        dtypemaps = {
+            '32b': {'float': torch.float32, 'int': torch.int32, 'bool': torch.uint8},
+            '64b': {'float': torch.float64, 'int': torch.int64, 'bool': torch.uint8},
+        }
+        if self.precision not in dtypemaps:
+            raise ValueError('unsupported precision {}'.format(self.precision))
+        self.dtypemap = dtypemaps[self.precision]
+        # the number of real conversions and copies done by astensor
+        self.conversions = 0
+
+    def buffer(self, shape, dtype='float', name=None, owner=None):
+        """
+        No scratch tensors, see :meth:`pyhf.tensor.numpy_backend.buffer`.
+
+        This backend ignores the ``out`` argument of the tensor operations.
+
+        Returns:
+            None
+        """
+        return None
 
     def clip(self, tensor_in, min, max):
         """
@@ -51,17 +72,21 @@ class pytorch_backend(object):
         """
         Convert to a PyTorch Tensor.
 
+        A tensor of the requested dtype is returned as is.
+
         Args:
             tensor_in (Number or Tensor): Tensor object
 
         Returns:
             torch.Tensor: A multi-dimensional matrix containing elements of a single data type.
         """
-        dtypemap = {'float': torch.float, 'int': torch.int, 'bool': torch.uint8}
-        dtype = dtypemap[dtype]
+        dtype = self.dtypemap[dtype]
+        if isinstance(tensor_in, torch.Tensor) and tensor_in.dtype == dtype:
+            return tensor_in
+        self.conversions += 1
         return torch.as_tensor(tensor_in, dtype=dtype)
 
-    def gather(self, tensor, indices):
+    def gather(self, tensor, indices, out=None):
         return torch.take(tensor, indices.type(torch.LongTensor))
 
     def boolean_mask(self, tensor, mask):
@@ -74,7 +99,7 @@ class pytorch_backend(object):
     def shape(self, tensor):
         return tuple(map(int, tensor.shape))
 
-    def sum(self, tensor_in, axis=None):
+    def sum(self, tensor_in, axis=None, out=None):
         tensor_in = self.astensor(tensor_in)
         return (
             torch.sum(tensor_in)
@@ -82,7 +107,26 @@ class pytorch_backend(object):
             else torch.sum(tensor_in, axis)
         )
 
-    def product(self, tensor_in, axis=None):
+    def accumulate(self, tensor_in, axis=None):
+        """
+        Sum the elements in double precision, irrespective of the precision
+        of the backend, e.g. for the terms of a log-likelihood.
+
+        Args:
+            tensor_in (Tensor): Tensor object
+            axis (Number): The axis over which to sum
+
+        Returns:
+            torch.Tensor: The sum in double precision
+        """
+        tensor_in = torch.as_tensor(tensor_in, dtype=torch.float64)
+        return (
+            torch.sum(tensor_in)
+            if (axis is None or tensor_in.shape == torch.Size([]))
+            else torch.sum(tensor_in, axis)
+        )
+
+    def product(self, tensor_in, axis=None, out=None):
         tensor_in = self.astensor(tensor_in)
         return torch.prod(tensor_in) if axis is None else torch.prod(tensor_in, axis)
 
@@ -91,10 +135,10 @@ class pytorch_backend(object):
         return torch.abs(tensor)
 
     def ones(self, shape):
-        return torch.Tensor(torch.ones(shape))
+        return torch.ones(shape, dtype=self.dtypemap['float'])
 
     def zeros(self, shape):
-        return torch.Tensor(torch.zeros(shape))
+        return torch.zeros(shape, dtype=self.dtypemap['float'])
 
     def power(self, tensor_in_1, tensor_in_2):
         tensor_in_1 = self.astensor(tensor_in_1)
@@ -118,16 +162,16 @@ class pytorch_backend(object):
         tensor_in = self.astensor(tensor_in)
         return torch.exp(tensor_in)
 
-    def stack(self, sequence, axis=0):
+    def stack(self, sequence, axis=0, out=None):
         return torch.stack(sequence, dim=axis)
 
-    def where(self, mask, tensor_in_1, tensor_in_2):
-        mask = self.astensor(mask).type(torch.FloatTensor)
+    def where(self, mask, tensor_in_1, tensor_in_2, out=None):
+        mask = self.astensor(mask).type(self.dtypemap['float'])
         tensor_in_1 = self.astensor(tensor_in_1)
         tensor_in_2 = self.astensor(tensor_in_2)
         return mask * tensor_in_1 + (1 - mask) * tensor_in_2
 
-    def concatenate(self, sequence, axis=0):
+    def concatenate(self, sequence, axis=0, out=None):
         """
         Join a sequence of arrays along an existing axis.
 
@@ -189,7 +233,7 @@ class pytorch_backend(object):
         ]
         return broadcast
 
-    def einsum(self, subscripts, *operands):
+    def einsum(self, subscripts, *operands, **kwargs):
         """
         This function provides a way of computing multilinear expressions (i.e.
         sums of products) using the Einstein summation convention.
@@ -205,8 +249,10 @@ class pytorch_backend(object):
         return torch.einsum(subscripts, ops)
 
     def poisson_logpdf(self, n, lam):
-        n = self.astensor(n)
-        lam = self.astensor(lam)
+        # in double precision, irrespective of the precision of the backend,
+        # as the terms of a log-likelihood, see accumulate
+        n = torch.as_tensor(n, dtype=torch.float64)
+        lam = torch.as_tensor(lam, dtype=torch.float64)
         return torch.distributions.Poisson(lam).log_prob(n)
 
     def poisson(self, n, lam):
@@ -238,9 +284,10 @@ class pytorch_backend(object):
         return torch.exp(torch.distributions.Poisson(lam).log_prob(n))
 
     def normal_logpdf(self, x, mu, sigma):
-        x = self.astensor(x)
-        mu = self.astensor(mu)
-        sigma = self.astensor(sigma)
+        # in double precision, as poisson_logpdf
+        x = torch.as_tensor(x, dtype=torch.float64)
+        mu = torch.as_tensor(mu, dtype=torch.float64)
+        sigma = torch.as_tensor(sigma, dtype=torch.float64)
         normal = torch.distributions.Normal(mu, sigma)
         return normal.log_prob(x)
 
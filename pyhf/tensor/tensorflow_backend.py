@@ -11,6 +11,27 @@ class tensorflow_backend(object):
     def __init__(self, **kwargs):
         self.session = kwargs.get('session')
         self.name = 'tensorflow'
+        self.precision = kwargs.get('precision', '32b')
+        dtypemaps = {
+            '32b': {'float': tf.float32, 'int': tf.int32, 'bool': tf.bool},
+            '64b': {'float': tf.float64, 'int': tf.int64, 'bool': tf.bool},
+        }
+        if self.precision not in dtypemaps:
+            raise ValueError('unsupported precision {}'.format(self.precision))
+        self.dtypemap = dtypemaps[self.precision]
+        # the number of real conversions and casts done by astensor
+        self.conversions = 0
+
+    def buffer(self, shape, dtype='float', name=None, owner=None):
+        """
+        No scratch tensors, see :meth:`pyhf.tensor.numpy_backend.buffer`.
+
+        This backend ignores the ``out`` argument of the tensor operations.
+
+        Returns:
+            None
+        """
+        return None
 
     def clip(self, tensor_in, min, max):
         """
@@ -85,7 +106,7 @@ class tensorflow_backend(object):
         )
         return tf.einsum('i,j->ij', tensor_in_1, tensor_in_2)
 
-    def gather(self, tensor, indices):
+    def gather(self, tensor, indices, out=None):
         return tf.gather(tensor, indices)
 
     def boolean_mask(self, tensor, mask):
@@ -98,26 +119,30 @@ class tensorflow_backend(object):
         """
         Convert to a TensorFlow Tensor.
 
+        A tensor of the requested dtype is returned as is.
+
         Args:
             tensor_in (Number or Tensor): Tensor object
 
         Returns:
             `tf.Tensor`: A symbolic handle to one of the outputs of a `tf.Operation`.
         """
-        dtypemap = {'float': tf.float32, 'int': tf.int32, 'bool': tf.bool}
-        dtype = dtypemap[dtype]
+        dtype = self.dtypemap[dtype]
 
         if isinstance(tensor_in, tf.Tensor):
+            if tensor_in.dtype == dtype:
+                return tensor_in
             v = tensor_in
         else:
             if isinstance(tensor_in, (int, float)):
                 tensor_in = [tensor_in]
             v = tf.convert_to_tensor(tensor_in)
-        if v.dtype is not dtype:
+        self.conversions += 1
+        if v.dtype != dtype:
             v = tf.cast(v, dtype)
         return v
 
-    def sum(self, tensor_in, axis=None):
+    def sum(self, tensor_in, axis=None, out=None):
         tensor_in = self.astensor(tensor_in)
         return (
             tf.reduce_sum(tensor_in)
@@ -125,7 +150,26 @@ class tensorflow_backend(object):
             else tf.reduce_sum(tensor_in, axis)
         )
 
-    def product(self, tensor_in, axis=None):
+    def accumulate(self, tensor_in, axis=None):
+        """
+        Sum the elements in double precision, irrespective of the precision
+        of the backend, e.g. for the terms of a log-likelihood.
+
+        Args:
+            tensor_in (Tensor): Tensor object
+            axis (Number): The axis over which to sum
+
+        Returns:
+            `tf.Tensor`: The sum in double precision
+        """
+        tensor_in = tf.cast(self.astensor(tensor_in), tf.float64)
+        return (
+            tf.reduce_sum(tensor_in)
+            if (axis is None or tensor_in.shape == tf.TensorShape([]))
+            else tf.reduce_sum(tensor_in, axis)
+        )
+
+    def product(self, tensor_in, axis=None, out=None):
         tensor_in = self.astensor(tensor_in)
         return (
             tf.reduce_prod(tensor_in)
@@ -138,10 +182,10 @@ class tensorflow_backend(object):
         return tf.abs(tensor)
 
     def ones(self, shape):
-        return tf.ones(shape)
+        return tf.ones(shape, dtype=self.dtypemap['float'])
 
     def zeros(self, shape):
-        return tf.zeros(shape)
+        return tf.zeros(shape, dtype=self.dtypemap['float'])
 
     def power(self, tensor_in_1, tensor_in_2):
         tensor_in_1 = self.astensor(tensor_in_1)
@@ -171,16 +215,16 @@ class tensorflow_backend(object):
         tensor_in = self.astensor(tensor_in)
         return tf.exp(tensor_in)
 
-    def stack(self, sequence, axis=0):
+    def stack(self, sequence, axis=0, out=None):
         return tf.stack(sequence, axis=axis)
 
-    def where(self, mask, tensor_in_1, tensor_in_2):
+    def where(self, mask, tensor_in_1, tensor_in_2, out=None):
         mask = self.astensor(mask)
         tensor_in_1 = self.astensor(tensor_in_1)
         tensor_in_2 = self.astensor(tensor_in_2)
         return mask * tensor_in_1 + (1 - mask) * tensor_in_2
 
-    def concatenate(self, sequence, axis=0):
+    def concatenate(self, sequence, axis=0, out=None):
         """
         Join a sequence of arrays along an existing axis.
 
@@ -243,7 +287,7 @@ class tensorflow_backend(object):
         ]
         return broadcast
 
-    def einsum(self, subscripts, *operands):
+    def einsum(self, subscripts, *operands, **kwargs):
         """
         A generalized contraction between tensors of arbitrary dimension.
 
@@ -276,7 +320,7 @@ class tensorflow_backend(object):
             >>> with sess.as_default():
             ...     sess.run(pyhf.tensorlib.poisson_logpdf(5., 6.))
             ...
-            array([-1.8286943], dtype=float32)
+            array([-1.8286944])
 
         Args:
             n (`tensor` or `float`): The value at which to evaluate the approximation to the Poisson distribution p.m.f.
@@ -287,8 +331,10 @@ class tensorflow_backend(object):
         Returns:
             TensorFlow Tensor: Value of the continous approximation to log(Poisson(n|lam))
         """
-        n = self.astensor(n)
-        lam = self.astensor(lam)
+        # in double precision, irrespective of the precision of the backend,
+        # as the terms of a log-likelihood, see accumulate
+        n = tf.cast(self.astensor(n), tf.float64)
+        lam = tf.cast(self.astensor(lam), tf.float64)
         return tfp.distributions.Poisson(lam).log_prob(n)
 
     def poisson(self, n, lam):
@@ -338,7 +384,7 @@ class tensorflow_backend(object):
             >>> with sess.as_default():
             ...     sess.run(pyhf.tensorlib.normal_logpdf(0.5, 0., 1.))
             ...
-            array([-1.0439385], dtype=float32)
+            array([-1.04393853])
 
         Args:
             x (`tensor` or `float`): The value at which to evaluate the Normal distribution p.d.f.
@@ -348,9 +394,10 @@ class tensorflow_backend(object):
         Returns:
             TensorFlow Tensor: Value of log(Normal(x|mu, sigma))
         """
-        x = self.astensor(x)
-        mu = self.astensor(mu)
-        sigma = self.astensor(sigma)
+        # in double precision, as poisson_logpdf
+        x = tf.cast(self.astensor(x), tf.float64)
+        mu = tf.cast(self.astensor(mu), tf.float64)
+        sigma = tf.cast(self.astensor(sigma), tf.float64)
         normal = tfp.distributions.Normal(mu, sigma)
         return normal.log_prob(x)
 
@@ -1,9 +1,13 @@
+import collections
+import hashlib
 import json
 import jsonschema
+import numpy as np
 import pkg_resources
 
 from .exceptions import InvalidSpecification
 from . import get_backend
+from .tensor.common import _backend_key
 
 
 def get_default_schema():
@@ -45,7 +49,175 @@ def loglambdav(pars, data, pdf):
     return -2 * pdf.logpdf(pars, data)
 
 
-def qmu(mu, data, pdf, init_pars, par_bounds):
+def _loglambdav_and_grad(pars, data, pdf):
+    logpdf, grad = pdf.logpdf_and_grad(pars, data)
+    return -2 * logpdf, -2 * grad
+
+
+def _loglambdav_hessian(pars, data, pdf):
+    # a sparse matrix, of the same structure as the Hessian of the model
+    return -2 * pdf._hessian(pars, data, dense=False)
+
+
+# optimizers that can make use of the gradient and the Hessian pick them up
+# from here
+loglambdav.value_and_grad = _loglambdav_and_grad
+loglambdav.hessian = _loglambdav_hessian
+
+
+class FitCache(object):
+    def __init__(self, maxsize=128):
+        """
+        A cache of the best fits of :func:`qmu`, :func:`generate_asimov_data`
+        and :func:`hypotest`, which evicts the least recently used fits.
+
+        In a scan over the parameter of interest, the global fits to the
+        observed data and the fits to the Asimov data do not depend on the
+        tested value, and are only done once. A fit is identified by the
+        fingerprint of the model (see :meth:`pyhf.pdf.Model.compiled_key`)
+        and its POI, a hash of the data, the bounds, the values of the fixed
+        parameters (including the POI of a conditional fit), and the backend
+        and optimizer with its settings. The initial values of the free
+        parameters are not part of it, so a fit is found in the cache however
+        it was started. To leave a minimum found before, e.g. a local one,
+        pass ``fit_cache=False`` to the functions using the cache.
+
+        Args:
+            maxsize (`int`): The number of fits to keep, ``0`` disables the cache
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fits = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._fits)
+
+    def clear(self):
+        self._fits.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, constrained_mu, data, pdf, init_pars, par_bounds, fixed_params):
+        tensorlib, optimizer = get_backend()
+        values = data if isinstance(data, list) else tensorlib.tolist(data)
+        data_hash = hashlib.sha256(
+            np.asarray(values, dtype=np.float64).tobytes()
+        ).hexdigest()
+        fixed_values = tuple(
+            (i, float(init))
+            for i, (init, fixed) in enumerate(zip(init_pars, fixed_params))
+            if fixed
+        )
+        optimizer_settings = tuple(
+            sorted(
+                (k, v)
+                for k, v in vars(optimizer).items()
+                if isinstance(v, (bool, int, float, str, type(None)))
+            )
+        )
+        return (
+            pdf.compiled_key(),
+            pdf.config.poi_index,
+            data_hash,
+            tuple(tuple(float(b) for b in bounds) for bounds in par_bounds),
+            fixed_values,
+            None if constrained_mu is None else float(constrained_mu),
+            _backend_key(tensorlib),
+            type(optimizer).__name__,
+            optimizer_settings,
+        )
+
+    def get(self, key):
+        try:
+            value = self._fits.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        # most recently used fits are kept at the end
+        self._fits[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._fits.pop(key, None)
+        self._fits[key] = value
+        while len(self._fits) > self.maxsize:
+            self._fits.popitem(last=False)
+
+
+# the fits of qmu, generate_asimov_data and hypotest are looked up here
+fit_cache = FitCache()
+
+
+def _bestfit(
+    constrained_mu, data, pdf, bound, init_pars, par_bounds, fixed_params, cached
+):
+    # the best fit (a global fit if constrained_mu is None) and its
+    # loglambdav, from the fit cache if it was done before and cached is set.
+    # The bound model leaves out the constant terms of the likelihood, which
+    # is fine for the differences the cached values are used in.
+    _, optimizer = get_backend()
+    if cached:
+        key = fit_cache.key(
+            constrained_mu, data, pdf, init_pars, par_bounds, fixed_params
+        )
+        result = fit_cache.get(key)
+        if result is not None:
+            return result
+    if constrained_mu is None:
+        bestfit = optimizer.unconstrained_bestfit(
+            loglambdav, data, bound, init_pars, par_bounds, fixed_params
+        )
+    else:
+        bestfit = optimizer.constrained_bestfit(
+            loglambdav, constrained_mu, data, bound, init_pars, par_bounds, fixed_params
+        )
+    result = bestfit, loglambdav(bestfit, data, bound)
+    if cached:
+        fit_cache.put(key, result)
+    return result
+
+
+def _warm_start_pars(
+    warm_start, key, init_pars, fixed_params, constrained_mu, data, bound
+):
+    # the best fit stored under key, with the fixed parameters kept at their
+    # initial values, or the initial values if the objective of the fit is
+    # not finite there
+    tensorlib, _ = get_backend()
+    seed = warm_start.get(key)
+    if seed is None:
+        return init_pars
+    seed = [
+        init if fixed else value
+        for value, init, fixed in zip(seed, init_pars, fixed_params)
+    ]
+    pars = list(seed)
+    if constrained_mu is not None:
+        pars[bound.config.poi_index] = constrained_mu
+    if not all(np.isfinite(tensorlib.tolist(loglambdav(pars, data, bound)))):
+        return init_pars
+    return seed
+
+
+def _store_warm_start(warm_start, key, pars):
+    tensorlib, _ = get_backend()
+    warm_start[key] = pars if isinstance(pars, list) else tensorlib.tolist(pars)
+
+
+def qmu(
+    mu,
+    data,
+    pdf,
+    init_pars,
+    par_bounds,
+    fixed_params=None,
+    warm_start=None,
+    fit_cache=True,
+):
     r"""
     The test statistic, :math:`q_{\mu}`, for establishing an upper
     limit on the strength parameter, :math:`\mu`, as defiend in
@@ -70,6 +242,9 @@ def qmu(mu, data, pdf, init_pars, par_bounds):
         pdf (|pyhf.pdf.Model|_): The HistFactory statistical model used in the likelihood ratio calculation
         init_pars (Tensor): The initial parameters
         par_bounds(Tensor): The bounds on the paramter values
+        fixed_params (list of bool): The parameters held at their initial values in the fits, by default the ones configured as ``fixed`` in the model specification
+        warm_start (dict): The best fits of a previous call for the same data, e.g. for a neighbouring :math:`\mu`, which the fits are started from. It is updated with the best fits of this call.
+        fit_cache (bool): Whether to look up the fits in and store them to :data:`pyhf.utils.fit_cache`, see :class:`FitCache`
 
     .. |pyhf.pdf.Model| replace:: ``pyhf.pdf.Model``
     .. _pyhf.pdf.Model: https://diana-hep.org/pyhf/_generated/pyhf.pdf.Model.html
@@ -78,22 +253,74 @@ def qmu(mu, data, pdf, init_pars, par_bounds):
         Float: The calculated test statistic, :math:`q_{\mu}`
     """
     tensorlib, optimizer = get_backend()
-    mubhathat = optimizer.constrained_bestfit(
-        loglambdav, mu, data, pdf, init_pars, par_bounds
+    if fixed_params is None:
+        fixed_params = pdf.config.suggested_fixed()
+    if warm_start is None:
+        warm_start = {}
+    # both fits evaluate the likelihood of the same data, and only the
+    # difference of the two is used
+    bound = pdf.bind(data, constants=False)
+    muhatbhat, loglambdav_hat = _bestfit(
+        None,
+        data,
+        pdf,
+        bound,
+        _warm_start_pars(
+            warm_start, 'unconstrained', init_pars, fixed_params, None, data, bound
+        ),
+        par_bounds,
+        fixed_params,
+        fit_cache,
     )
-    muhatbhat = optimizer.unconstrained_bestfit(
-        loglambdav, data, pdf, init_pars, par_bounds
+    _store_warm_start(warm_start, 'unconstrained', muhatbhat)
+    # the conditional fit is only started from a previous conditional fit, the
+    # global fit can be far from it and in a region where it gets stuck
+    mubhathat, loglambdav_hathat = _bestfit(
+        mu,
+        data,
+        pdf,
+        bound,
+        _warm_start_pars(
+            warm_start, 'constrained', init_pars, fixed_params, mu, data, bound
+        ),
+        par_bounds,
+        fixed_params,
+        fit_cache,
     )
-    qmu = loglambdav(mubhathat, data, pdf) - loglambdav(muhatbhat, data, pdf)
+    _store_warm_start(warm_start, 'constrained', mubhathat)
+    qmu = loglambdav_hathat - loglambdav_hat
     qmu = tensorlib.where(muhatbhat[pdf.config.poi_index] > mu, [0], qmu)
     return qmu
 
 
-def generate_asimov_data(asimov_mu, data, pdf, init_pars, par_bounds):
-    _, optimizer = get_backend()
-    bestfit_nuisance_asimov = optimizer.constrained_bestfit(
-        loglambdav, asimov_mu, data, pdf, init_pars, par_bounds
+def generate_asimov_data(
+    asimov_mu,
+    data,
+    pdf,
+    init_pars,
+    par_bounds,
+    fixed_params=None,
+    warm_start=None,
+    fit_cache=True,
+):
+    if fixed_params is None:
+        fixed_params = pdf.config.suggested_fixed()
+    if warm_start is None:
+        warm_start = {}
+    bound = pdf.bind(data, constants=False)
+    bestfit_nuisance_asimov, _ = _bestfit(
+        asimov_mu,
+        data,
+        pdf,
+        bound,
+        _warm_start_pars(
+            warm_start, 'constrained', init_pars, fixed_params, asimov_mu, data, bound
+        ),
+        par_bounds,
+        fixed_params,
+        fit_cache,
     )
+    _store_warm_start(warm_start, 'constrained', bestfit_nuisance_asimov)
     return pdf.expected_data(bestfit_nuisance_asimov)
 
 
@@ -129,7 +356,17 @@ def pvals_from_teststat(sqrtqmu_v, sqrtqmuA_v):
     return CLsb, CLb, CLs
 
 
-def hypotest(poi_test, data, pdf, init_pars=None, par_bounds=None, **kwargs):
+def hypotest(
+    poi_test,
+    data,
+    pdf,
+    init_pars=None,
+    par_bounds=None,
+    fixed_params=None,
+    warm_start=None,
+    fit_cache=True,
+    **kwargs
+):
     r"""
     Computes :math:`p`-values and test statistics for a single value of the parameter of interest
 
@@ -139,6 +376,9 @@ def hypotest(poi_test, data, pdf, init_pars=None, par_bounds=None, **kwargs):
         pdf (|pyhf.pdf.Model|_): The HistFactory statistical model
         init_pars (Array or Tensor): The initial parameter values to be used for minimization
         par_bounds (Array or Tensor): The parameter value bounds to be used for minimization
+        fixed_params (list of bool): The parameters held at their initial values in the minimization
+        warm_start (dict): The best fits of a previous call for the same data, which the fits are started from, see :func:`hypotest_scan`. It is updated with the best fits of this call.
+        fit_cache (bool): Whether to look up the fits in and store them to :data:`pyhf.utils.fit_cache`, see :class:`FitCache`
 
     .. |pyhf.pdf.Model| replace:: ``pyhf.pdf.Model``
     .. _pyhf.pdf.Model: https://diana-hep.org/pyhf/_generated/pyhf.pdf.Model.html
@@ -201,16 +441,51 @@ def hypotest(poi_test, data, pdf, init_pars=None, par_bounds=None, **kwargs):
 
     init_pars = init_pars or pdf.config.suggested_init()
     par_bounds = par_bounds or pdf.config.suggested_bounds()
+    fixed_params = fixed_params or pdf.config.suggested_fixed()
+    warm_start = warm_start if warm_start is not None else {}
     tensorlib, _ = get_backend()
 
     asimov_mu = 0.0
-    asimov_data = generate_asimov_data(asimov_mu, data, pdf, init_pars, par_bounds)
-
-    qmu_v = tensorlib.clip(qmu(poi_test, data, pdf, init_pars, par_bounds), 0, max=None)
+    asimov_fits = warm_start.setdefault('asimov_data', {})
+    asimov_data = generate_asimov_data(
+        asimov_mu,
+        data,
+        pdf,
+        init_pars,
+        par_bounds,
+        fixed_params,
+        asimov_fits,
+        fit_cache,
+    )
+    qmu_v = tensorlib.clip(
+        qmu(
+            poi_test,
+            data,
+            pdf,
+            init_pars,
+            par_bounds,
+            fixed_params,
+            warm_start.setdefault('observed', {}),
+            fit_cache,
+        ),
+        0,
+        max=None,
+    )
     sqrtqmu_v = tensorlib.sqrt(qmu_v)
 
     qmuA_v = tensorlib.clip(
-        qmu(poi_test, asimov_data, pdf, init_pars, par_bounds), 0, max=None
+        qmu(
+            poi_test,
+            asimov_data,
+            pdf,
+            init_pars,
+            par_bounds,
+            fixed_params,
+            warm_start.setdefault('asimov', {}),
+            fit_cache,
+        ),
+        0,
+        max=None,
     )
     sqrtqmuA_v = tensorlib.sqrt(qmuA_v)
 
@@ -235,3 +510,54 @@ def hypotest(poi_test, data, pdf, init_pars=None, par_bounds=None, **kwargs):
 
     # Enforce a consistent return type of the observed CLs
     return tuple(_returns) if len(_returns) > 1 else _returns[0]
+
+
+def hypotest_scan(
+    poi_tests, data, pdf, init_pars=None, par_bounds=None, fixed_params=None, **kwargs
+):
+    r"""
+    Computes :func:`hypotest` for a scan over values of the parameter of interest
+
+    The fits for each value of the parameter of interest are started from the
+    best fits for the previous one, so the values are best given in order.
+
+    Example:
+
+        >>> import pyhf
+        >>> model = pyhf.simplemodels.hepdata_like([5.0], [10.0], [3.5])
+        >>> data = [12.0] + model.config.auxdata
+        >>> results = pyhf.utils.hypotest_scan([0.5, 1.0, 1.5], data, model)
+        >>> len(results)
+        3
+
+    Args:
+        poi_tests (list of Numbers): The values of the parameter of interest (POI)
+        data (Tensor): The measurement data and the auxiliary data
+        pdf (|pyhf.pdf.Model|_): The HistFactory statistical model
+        init_pars (Array or Tensor): The initial parameter values of the first fits
+        par_bounds (Array or Tensor): The parameter value bounds to be used for minimization
+        fixed_params (list of bool): The parameters held at their initial values in the minimization
+
+    .. |pyhf.pdf.Model| replace:: ``pyhf.pdf.Model``
+    .. _pyhf.pdf.Model: https://diana-hep.org/pyhf/_generated/pyhf.pdf.Model.html
+
+    Keyword Args:
+        The keyword arguments of :func:`hypotest`
+
+    Returns:
+        List: The results of :func:`hypotest` for each value of the POI
+    """
+    warm_start = {}
+    return [
+        hypotest(
+            poi_test,
+            data,
+            pdf,
+            init_pars,
+            par_bounds,
+            fixed_params,
+            warm_start=warm_start,
+            **kwargs
+        )
+        for poi_test in poi_tests
+    ]
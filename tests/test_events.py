@@ -1,4 +1,9 @@
+import gc
+import sys
+import weakref
+
 import pytest
+import pyhf
 import pyhf.events as events
 import mock
 
@@ -55,3 +60,55 @@ def test_trigger_noevent():
     assert noop_m.is_called_once()
 
     events.noop = noop
+
+
+def test_subscribe_weak():
+    ename = 'test'
+
+    class Subscriber(object):
+        def __init__(self):
+            self.calls = 0
+
+        def method(self):
+            self.calls += 1
+
+    subscriber = Subscriber()
+    events.subscribe(ename, weak=True)(subscriber.method)
+    assert subscriber.method in events.__events.get(ename)
+    events.trigger(ename)()
+    assert subscriber.calls == 1
+
+    ref = weakref.ref(subscriber)
+    del subscriber
+    gc.collect()
+    assert ref() is None
+    events.trigger(ename)()
+    assert len(events.__events.get(ename)) == 0
+    del events.__events[ename]
+
+
+@pytest.mark.skipif(sys.version_info < (3,), reason='tracemalloc needs Python 3')
+def test_models_are_collected():
+    import tracemalloc
+
+    ename = 'tensorlib_changed'
+
+    def build(n):
+        refs = [
+            weakref.ref(pyhf.simplemodels.hepdata_like([5.0], [50.0], [3.0]))
+            for _ in range(n)
+        ]
+        gc.collect()
+        return refs
+
+    tracemalloc.start()
+    build(100)
+    before, _ = tracemalloc.get_traced_memory()
+    refs = build(2000)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert all(ref() is None for ref in refs)
+    # the subscriptions of the collected models are pruned
+    assert len(events.__events.get(ename, [])) < 100
+    assert after - before < 1024 * 1024
@@ -103,3 +103,11 @@ def test_missing_optimizer(isolate_modules, param):
         None,
         CACHE_MODULE,
     )
+
+
+def test_import_clean_interpreter():
+    # pyhf builds its default optimizer while it is being imported, so the
+    # optimizers must not need the partially initialized package
+    import subprocess
+
+    subprocess.check_call([sys.executable, '-c', 'import pyhf'])
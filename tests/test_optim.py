@@ -72,3 +72,116 @@ def test_optim(backend, source, spec, mu):
         pyhf.utils.loglambdav, mu, data, pdf, init_pars, par_bounds
     )
     assert pyhf.tensorlib.tolist(result)
+
+
+@pytest.mark.only_pytorch
+@pytest.mark.only_tensorflow
+def test_scipy_autodiff(backend, source, spec):
+    pdf = pyhf.Model(spec)
+    data = source['bindata']['data'] + pdf.config.auxdata
+
+    init_pars = pdf.config.suggested_init()
+    par_bounds = pdf.config.suggested_bounds()
+
+    pyhf.set_backend(pyhf.tensorlib, pyhf.optimize.scipy_optimizer())
+    optim = pyhf.optimizer
+    value_and_grad, jac = optim._objective_and_jac(
+        pyhf.utils.loglambdav, data, pdf, init_pars
+    )
+    assert jac is True
+    value, grad = value_and_grad(init_pars, data, pdf)
+    assert len(grad) == len(init_pars)
+
+    autodiff = optim.unconstrained_bestfit(
+        pyhf.utils.loglambdav, data, pdf, init_pars, par_bounds
+    )
+    pyhf.set_backend(pyhf.tensorlib, pyhf.optimize.scipy_optimizer(autodiff=False))
+    finite_differences = pyhf.optimizer.unconstrained_bestfit(
+        pyhf.utils.loglambdav, data, pdf, init_pars, par_bounds
+    )
+    assert all(low <= v <= high for v, (low, high) in zip(autodiff, par_bounds))
+    assert pytest.approx(list(finite_differences), rel=1e-2) == list(autodiff)
+
+
+@pytest.mark.skip_mxnet
+def test_optim_fixed_params(backend, source, spec):
+    spec = dict(spec, parameters=[{'name': 'bkg_norm', 'inits': [0.5], 'fixed': True}])
+    pdf = pyhf.Model(spec)
+    data = source['bindata']['data'] + pdf.config.auxdata
+
+    init_pars = pdf.config.suggested_init()
+    par_bounds = pdf.config.suggested_bounds()
+    fixed_params = pdf.config.suggested_fixed()
+    bkg_norm = pdf.config.par_slice('bkg_norm').start
+    assert fixed_params[bkg_norm] and sum(fixed_params) == 1
+
+    optim = pyhf.optimizer
+
+    result = optim.unconstrained_bestfit(
+        pyhf.utils.loglambdav, data, pdf, init_pars, par_bounds, fixed_params
+    )
+    result = pyhf.tensorlib.tolist(result)
+    assert result[bkg_norm] == pytest.approx(0.5)
+
+    result = optim.constrained_bestfit(
+        pyhf.utils.loglambdav, 1.5, data, pdf, init_pars, par_bounds, fixed_params
+    )
+    result = pyhf.tensorlib.tolist(result)
+    assert result[bkg_norm] == pytest.approx(0.5)
+    assert result[pdf.config.poi_index] == pytest.approx(1.5)
+
+
+def test_scipy_conditional_lbfgsb():
+    # the rates of this model stay positive within the bounds
+    pdf = pyhf.simplemodels.hepdata_like([12.0, 11.0], [50.0, 52.0], [3.0, 7.0])
+    data = [51.0, 48.0] + pdf.config.auxdata
+
+    init_pars = pdf.config.suggested_init()
+    par_bounds = pdf.config.suggested_bounds()
+
+    slsqp = pyhf.optimize.scipy_optimizer().constrained_bestfit(
+        pyhf.utils.loglambdav, 1.0, data, pdf, init_pars, par_bounds
+    )
+    lbfgsb = pyhf.optimize.scipy_optimizer(method='L-BFGS-B').constrained_bestfit(
+        pyhf.utils.loglambdav, 1.0, data, pdf, init_pars, par_bounds
+    )
+    assert lbfgsb[pdf.config.poi_index] == 1.0
+    assert pytest.approx(list(slsqp), rel=1e-4) == list(lbfgsb)
+
+
+@pytest.mark.only_numpy
+def test_newton_optimizer(backend, source, spec):
+    pdf = pyhf.Model(spec)
+    data = source['bindata']['data'] + pdf.config.auxdata
+
+    init_pars = pdf.config.suggested_init()
+    par_bounds = pdf.config.suggested_bounds()
+
+    scipy = pyhf.optimize.scipy_optimizer()
+    newton = pyhf.optimize.newton_optimizer()
+    for method in ['unconstrained_bestfit', 'constrained_bestfit']:
+        args = (data, pdf, init_pars, par_bounds)
+        if method == 'constrained_bestfit':
+            args = (1.0,) + args
+        expected = getattr(scipy, method)(pyhf.utils.loglambdav, *args)
+        result = getattr(newton, method)(pyhf.utils.loglambdav, *args)
+        assert pytest.approx(list(expected), rel=1e-4, abs=1e-6) == list(result)
+
+    result = newton._newton(pyhf.utils.loglambdav, data, pdf, init_pars, par_bounds)
+    assert result.success and result.nit < 20
+
+    # the reference values of validation/data/2bin_histosys_example2.json,
+    # see tests/test_validation.py
+    pyhf.set_backend(pyhf.tensorlib, newton)
+    CLs_obs, CLs_exp = pyhf.utils.hypotest(1.0, data, pdf, return_expected_set=True)
+    assert float(CLs_obs) == pytest.approx(0.1001463460725534, rel=8e-5)
+    assert [float(x) for x in CLs_exp] == pytest.approx(
+        [
+            7.134513306138892e-06,
+            0.00012547100627138575,
+            0.001880010666437615,
+            0.02078964907605385,
+            0.13692494523572218,
+        ],
+        rel=8e-5,
+    )
@@ -512,3 +512,882 @@ def test_lumi_np_scaling():
         110.0 * alpha_lumi,
         1.0 * alpha_lumi,
     ]
+
+
+@pytest.mark.skip_mxnet
+def test_pdf_batched_pars(backend):
+    spec = {
+        'channels': [
+            {
+                'name': 'channel1',
+                'samples': [
+                    {
+                        'name': 'signal',
+                        'data': [10.0, 20.0],
+                        'modifiers': [
+                            {'name': 'mu', 'type': 'normfactor', 'data': None}
+                        ],
+                    },
+                    {
+                        'name': 'background1',
+                        'data': [100.0, 150.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_histo',
+                                'type': 'histosys',
+                                'data': {
+                                    'lo_data': [90.0, 140.0],
+                                    'hi_data': [105.0, 170.0],
+                                },
+                            },
+                            {
+                                'name': 'stat_channel1',
+                                'type': 'staterror',
+                                'data': [5.0, 6.0],
+                            },
+                        ],
+                    },
+                    {
+                        'name': 'background2',
+                        'data': [30.0, 25.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_norm',
+                                'type': 'normsys',
+                                'data': {'lo': 0.9, 'hi': 1.2},
+                            },
+                            {'name': 'bkg_shape', 'type': 'shapesys', 'data': [3, 4]},
+                        ],
+                    },
+                ],
+            },
+            {
+                'name': 'channel2',
+                'samples': [
+                    {
+                        'name': 'background1',
+                        'data': [50.0],
+                        'modifiers': [
+                            {'name': 'bkg_free', 'type': 'shapefactor', 'data': None}
+                        ],
+                    }
+                ],
+            },
+        ]
+    }
+    pdf = pyhf.Model(spec)
+    tensorlib, _ = backend
+
+    init_pars = pdf.config.suggested_init()
+    data = pdf.expected_data(init_pars)
+    batch = [
+        [v + 0.1 * (i + 1) * (-1) ** j for j, v in enumerate(init_pars)]
+        for i in range(3)
+    ]
+
+    batched_logpdf = tensorlib.tolist(pdf.logpdf(batch, data))
+    assert len(batched_logpdf) == len(batch)
+    assert batched_logpdf == pytest.approx(
+        [tensorlib.tolist(pdf.logpdf(pars, data))[0] for pars in batch], rel=1e-5
+    )
+
+    batched_expected = tensorlib.tolist(pdf.expected_data(batch))
+    for pars, expected in zip(batch, batched_expected):
+        assert expected == pytest.approx(
+            tensorlib.tolist(pdf.expected_data(pars)), rel=1e-5
+        )
+
+
+@pytest.mark.skip_mxnet
+def test_pdf_batched_data(backend):
+    source = {
+        "binning": [2, -0.5, 1.5],
+        "bindata": {
+            "data": [120.0, 180.0],
+            "bkg": [100.0, 150.0],
+            "bkgerr": [10.0, 10.0],
+            "sig": [30.0, 95.0],
+        },
+    }
+    pdf = pyhf.simplemodels.hepdata_like(
+        source['bindata']['sig'], source['bindata']['bkg'], source['bindata']['bkgerr']
+    )
+    tensorlib, _ = backend
+
+    pars = pdf.config.suggested_init()
+    toys = [
+        source['bindata']['data'] + pdf.config.auxdata,
+        [110.0, 170.0] + pdf.config.auxdata,
+        [130.0, 190.0] + [auxdata + 1.0 for auxdata in pdf.config.auxdata],
+    ]
+
+    batched_logpdf = tensorlib.tolist(pdf.logpdf(pars, toys))
+    assert len(batched_logpdf) == len(toys)
+    assert batched_logpdf == pytest.approx(
+        [tensorlib.tolist(pdf.logpdf(pars, data))[0] for data in toys], rel=1e-5
+    )
+
+
+@pytest.mark.skip_mxnet
+def test_pdf_sparse_modifiers(backend):
+    spec = {
+        'channels': [
+            {
+                'name': 'channel1',
+                'samples': [
+                    {
+                        'name': 'signal',
+                        'data': [10.0, 20.0],
+                        'modifiers': [
+                            {'name': 'mu', 'type': 'normfactor', 'data': None},
+                            {'name': 'lumi', 'type': 'lumi', 'data': None},
+                        ],
+                    },
+                    {
+                        'name': 'background1',
+                        'data': [100.0, 150.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_histo',
+                                'type': 'histosys',
+                                'data': {
+                                    'lo_data': [90.0, 140.0],
+                                    'hi_data': [105.0, 170.0],
+                                },
+                            },
+                            {
+                                'name': 'bkg_norm',
+                                'type': 'normsys',
+                                'data': {'lo': 0.95, 'hi': 1.1},
+                            },
+                            {
+                                'name': 'stat_channel1',
+                                'type': 'staterror',
+                                'data': [5.0, 6.0],
+                            },
+                        ],
+                    },
+                    {
+                        'name': 'background2',
+                        'data': [30.0, 25.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_norm',
+                                'type': 'normsys',
+                                'data': {'lo': 0.9, 'hi': 1.2},
+                            },
+                            {'name': 'bkg_shape', 'type': 'shapesys', 'data': [3, 4]},
+                        ],
+                    },
+                ],
+            },
+            {
+                'name': 'channel2',
+                'samples': [
+                    {
+                        'name': 'background1',
+                        'data': [50.0],
+                        'modifiers': [
+                            {'name': 'bkg_free', 'type': 'shapefactor', 'data': None},
+                            {'name': 'lumi', 'type': 'lumi', 'data': None},
+                        ],
+                    }
+                ],
+            },
+        ],
+        'parameters': [
+            {
+                'name': 'lumi',
+                'auxdata': [1.0],
+                'sigmas': [0.05],
+                'bounds': [[0.5, 1.5]],
+                'inits': [1.0],
+            }
+        ],
+    }
+    dense_pdf = pyhf.Model(spec)
+    sparse_pdf = pyhf.Model(spec, sparse=True)
+    tensorlib, _ = backend
+
+    init_pars = dense_pdf.config.suggested_init()
+    data = dense_pdf.expected_data(init_pars)
+    batch = [
+        [v + 0.2 * (i + 1) * (-1) ** j for j, v in enumerate(init_pars)]
+        for i in range(3)
+    ]
+
+    for pars in [init_pars] + batch:
+        assert tensorlib.tolist(sparse_pdf.expected_data(pars)) == pytest.approx(
+            tensorlib.tolist(dense_pdf.expected_data(pars)), rel=1e-5
+        )
+    assert tensorlib.tolist(sparse_pdf.logpdf(batch, data)) == pytest.approx(
+        tensorlib.tolist(dense_pdf.logpdf(batch, data)), rel=1e-5
+    )
+
+
+@pytest.mark.skip_mxnet
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_compiled(backend, tmpdir, sparse):
+    spec = pyhf.simplemodels.hepdata_like([12.0, 11.0], [50.0, 52.0], [3.0, 7.0]).spec
+    pdf = pyhf.Model(spec, sparse=sparse)
+    tensorlib, _ = backend
+
+    path = str(tmpdir.join('model.pyhf'))
+    pdf.save_compiled(path)
+    loaded = pyhf.Model.load_compiled(path, spec=spec, sparse=sparse)
+    assert loaded.compiled_key() == pdf.compiled_key()
+    assert loaded.config.par_order == pdf.config.par_order
+
+    init_pars = pdf.config.suggested_init()
+    data = pdf.expected_data(init_pars)
+    pars = [v * 1.1 for v in init_pars]
+    assert tensorlib.tolist(loaded.expected_data(pars)) == pytest.approx(
+        tensorlib.tolist(pdf.expected_data(pars))
+    )
+    assert tensorlib.tolist(loaded.logpdf(pars, data)) == pytest.approx(
+        tensorlib.tolist(pdf.logpdf(pars, data))
+    )
+
+    # the file holds no pickled objects
+    with np.load(path, allow_pickle=False) as compiled:
+        assert 'header' in compiled.files
+
+    with pytest.raises(pyhf.exceptions.InvalidCompiledModel):
+        pyhf.Model.load_compiled(path, spec=spec, sparse=not sparse)
+    spec['channels'][0]['samples'][0]['data'] = [13.0, 11.0]
+    with pytest.raises(pyhf.exceptions.InvalidCompiledModel):
+        pyhf.Model.load_compiled(path, spec=spec, sparse=sparse)
+
+    # the loaded arrays still share memory, as the ones built by the model
+    loaded.update_sample('singlechannel', 'background', data=[55.0, 50.0])
+    pdf.update_sample('singlechannel', 'background', data=[55.0, 50.0])
+    assert tensorlib.tolist(loaded.logpdf(pars, data)) == pytest.approx(
+        tensorlib.tolist(pdf.logpdf(pars, data))
+    )
+
+
+@pytest.mark.skip_mxnet
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_update_sample(backend, sparse):
+    def make_spec(signal, signal_modifiers):
+        return {
+            'channels': [
+                {
+                    'name': 'channel1',
+                    'samples': [
+                        {
+                            'name': 'signal',
+                            'data': signal,
+                            'modifiers': [
+                                {'name': 'mu', 'type': 'normfactor', 'data': None}
+                            ]
+                            + signal_modifiers,
+                        },
+                        {
+                            'name': 'background',
+                            'data': [50.0, 60.0],
+                            'modifiers': [
+                                {
+                                    'name': 'stat_channel1',
+                                    'type': 'staterror',
+                                    'data': [5.0, 6.0],
+                                },
+                                {
+                                    'name': 'bkg_norm',
+                                    'type': 'normsys',
+                                    'data': {'lo': 0.9, 'hi': 1.1},
+                                },
+                            ],
+                        },
+                    ],
+                }
+            ]
+        }
+
+    def signal_modifiers(scale):
+        return [
+            {
+                'name': 'sig_histo',
+                'type': 'histosys',
+                'data': {
+                    'lo_data': [9.0 * scale, 18.0 * scale],
+                    'hi_data': [11.0 * scale, 23.0 * scale],
+                },
+            },
+            {
+                'name': 'sig_norm',
+                'type': 'normsys',
+                'data': {'lo': 1.0 - 0.05 * scale, 'hi': 1.0 + 0.05 * scale},
+            },
+            {
+                'name': 'stat_channel1',
+                'type': 'staterror',
+                'data': [1.0 * scale, 2.0 * scale],
+            },
+            {'name': 'sig_shape', 'type': 'shapesys', 'data': [2.0, 3.0 * scale]},
+        ]
+
+    pdf = pyhf.Model(make_spec([10.0, 20.0], signal_modifiers(1.0)), sparse=sparse)
+    pdf.update_sample(
+        'channel1', 'signal', data=[30.0, 40.0], modifiers=signal_modifiers(2.0)
+    )
+    fresh_pdf = pyhf.Model(
+        make_spec([30.0, 40.0], signal_modifiers(2.0)), sparse=sparse
+    )
+    tensorlib, _ = backend
+
+    assert pdf.spec == fresh_pdf.spec
+    assert pdf.config.auxdata == pytest.approx(fresh_pdf.config.auxdata)
+    pars = [v * 1.1 for v in pdf.config.suggested_init()]
+    data = fresh_pdf.expected_data(fresh_pdf.config.suggested_init())
+    assert tensorlib.tolist(pdf.expected_data(pars)) == pytest.approx(
+        tensorlib.tolist(fresh_pdf.expected_data(pars))
+    )
+    assert tensorlib.tolist(pdf.logpdf(pars, data)) == pytest.approx(
+        tensorlib.tolist(fresh_pdf.logpdf(pars, data))
+    )
+
+    with pytest.raises(pyhf.exceptions.InvalidModel):
+        pdf.update_sample('channel1', 'other', data=[1.0, 2.0])
+    with pytest.raises(pyhf.exceptions.InvalidModel):
+        pdf.update_sample('channel1', 'signal', data=[1.0])
+    with pytest.raises(pyhf.exceptions.InvalidModel):
+        pdf.update_sample(
+            'channel1',
+            'signal',
+            modifiers=[{'name': 'bkg_norm', 'type': 'normsys', 'data': {}}],
+        )
+
+
+@pytest.fixture
+def spec_all_modifiers():
+    return {
+        'channels': [
+            {
+                'name': 'channel1',
+                'samples': [
+                    {
+                        'name': 'signal',
+                        'data': [10.0, 20.0],
+                        'modifiers': [
+                            {'name': 'mu', 'type': 'normfactor', 'data': None},
+                            {'name': 'lumi', 'type': 'lumi', 'data': None},
+                            {
+                                'name': 'sig_histo',
+                                'type': 'histosys',
+                                'data': {
+                                    'lo_data': [8.0, 19.0],
+                                    'hi_data': [13.0, 22.0],
+                                },
+                            },
+                        ],
+                    },
+                    {
+                        'name': 'background',
+                        'data': [100.0, 150.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_norm',
+                                'type': 'normsys',
+                                'data': {'lo': 0.9, 'hi': 1.2},
+                            },
+                            {
+                                'name': 'stat_channel1',
+                                'type': 'staterror',
+                                'data': [5.0, 6.0],
+                            },
+                            {'name': 'bkg_shape', 'type': 'shapesys', 'data': [7, 9]},
+                            {'name': 'lumi', 'type': 'lumi', 'data': None},
+                        ],
+                    },
+                ],
+            },
+            {
+                'name': 'channel2',
+                'samples': [
+                    {
+                        'name': 'background',
+                        'data': [50.0],
+                        'modifiers': [
+                            {'name': 'bkg_free', 'type': 'shapefactor', 'data': None}
+                        ],
+                    }
+                ],
+            },
+        ],
+        'parameters': [
+            {
+                'name': 'lumi',
+                'auxdata': [1.0],
+                'sigmas': [0.05],
+                'bounds': [[0.5, 1.5]],
+                'inits': [1.0],
+            }
+        ],
+    }
+
+
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_logpdf_and_grad(spec_all_modifiers, sparse):
+    pdf = pyhf.Model(spec_all_modifiers, sparse=sparse)
+    data = [115.0, 160.0, 55.0] + pdf.config.auxdata
+
+    for shift in [-0.3, 0.2, 1.4]:
+        pars = [v + shift for v in pdf.config.suggested_init()]
+        logpdf, grad = pdf.logpdf_and_grad(pars, data)
+        assert logpdf.tolist() == pytest.approx(pdf.logpdf(pars, data).tolist())
+
+        epsilon = 1e-6
+        numerical = []
+        for i in range(len(pars)):
+            up, down = list(pars), list(pars)
+            up[i] += epsilon
+            down[i] -= epsilon
+            numerical.append(
+                (pdf.logpdf(up, data)[0] - pdf.logpdf(down, data)[0]) / (2 * epsilon)
+            )
+        assert grad.tolist() == pytest.approx(numerical, rel=1e-5, abs=1e-5)
+
+
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_hessian(spec_all_modifiers, sparse):
+    pdf = pyhf.Model(spec_all_modifiers, sparse=sparse)
+    data = [115.0, 160.0, 55.0] + pdf.config.auxdata
+
+    for shift in [-0.3, 0.2, 1.4]:
+        pars = [v + shift for v in pdf.config.suggested_init()]
+        hessian = pdf.hessian(pars, data)
+        assert np.allclose(hessian, hessian.T)
+
+        epsilon = 1e-6
+        numerical = []
+        for i in range(len(pars)):
+            up, down = list(pars), list(pars)
+            up[i] += epsilon
+            down[i] -= epsilon
+            numerical.append(
+                (pdf.logpdf_and_grad(up, data)[1] - pdf.logpdf_and_grad(down, data)[1])
+                / (2 * epsilon)
+            )
+        assert np.allclose(hessian, numerical, rtol=1e-5, atol=1e-5)
+
+    pars = pdf.config.suggested_init()
+    fisher = pdf.fisher_information(pars)
+    assert np.allclose(fisher, -pdf.hessian(pars, pdf.expected_data(pars)))
+    # the gammas of different bins are not correlated through the main term
+    gammas = pdf.config.par_slice('stat_channel1')
+    assert fisher[gammas, gammas][0, 1] == 0
+
+
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_incremental(mocker, spec_all_modifiers, sparse):
+    pdf = pyhf.Model(spec_all_modifiers, sparse=sparse)
+    incremental = pyhf.Model(spec_all_modifiers, sparse=sparse, incremental=True)
+    data = [115.0, 160.0, 55.0] + pdf.config.auxdata
+
+    pars = pdf.config.suggested_init()
+    assert incremental.logpdf(pars, data) == pytest.approx(pdf.logpdf(pars, data))
+
+    staterror = mocker.spy(incremental.modifiers_appliers['staterror'], 'apply')
+    normsys = mocker.spy(incremental.modifiers_appliers['normsys'], 'apply')
+    for value in [1.1, 0.9]:
+        pars[pdf.config.par_slice('stat_channel1').start] = value
+        assert incremental.logpdf(pars, data) == pytest.approx(pdf.logpdf(pars, data))
+    assert staterror.call_count == 2
+    assert normsys.call_count == 0
+
+    # the batched evaluation is not cached
+    pars = [pars, pdf.config.suggested_init()]
+    assert incremental.logpdf(pars, data).tolist() == pytest.approx(
+        pdf.logpdf(pars, data).tolist()
+    )
+
+    incremental.update_sample('channel1', 'background', data=[90.0, 140.0])
+    pdf.update_sample('channel1', 'background', data=[90.0, 140.0])
+    pars = pdf.config.suggested_init()
+    assert incremental.logpdf(pars, data) == pytest.approx(pdf.logpdf(pars, data))
+
+
+def test_pdf_bind(spec_all_modifiers):
+    pdf = pyhf.Model(spec_all_modifiers)
+    data = [0.0, 160.0, 55.0] + pdf.config.auxdata
+    bound = pdf.bind(data)
+    assert bound.config is pdf.config
+
+    for shift in [-0.3, 0.2, 1.4]:
+        pars = [v + shift for v in pdf.config.suggested_init()]
+        assert bound.logpdf(pars).tolist() == pytest.approx(
+            pdf.logpdf(pars, data).tolist()
+        )
+        assert bound.logpdf(pars, data).tolist() == pytest.approx(
+            pdf.logpdf(pars, data).tolist()
+        )
+
+    pars = pdf.config.suggested_init()
+    other_data = [115.0, 160.0, 55.0] + pdf.config.auxdata
+    assert bound.logpdf(pars, other_data).tolist() == pytest.approx(
+        pdf.logpdf(pars, other_data).tolist()
+    )
+    assert bound.logpdf([pars, pars]).tolist() == pytest.approx(
+        pdf.logpdf([pars, pars], data).tolist()
+    )
+
+    unnormalized = pdf.bind(data, constants=False)
+    shifted = [v + 0.2 for v in pars]
+    assert (
+        unnormalized.logpdf(shifted) - unnormalized.logpdf(pars)
+    ).tolist() == pytest.approx(
+        (pdf.logpdf(shifted, data) - pdf.logpdf(pars, data)).tolist()
+    )
+    # with and without the gradient, the same terms are left out
+    for bound in [bound, unnormalized]:
+        logpdf, grad = bound.logpdf_and_grad(shifted)
+        assert logpdf.tolist() == pytest.approx(bound.logpdf(shifted).tolist())
+        assert grad.tolist() == pytest.approx(
+            pdf.logpdf_and_grad(shifted, data)[1].tolist()
+        )
+
+
+@pytest.mark.skip_mxnet
+def test_pdf_expected_auxdata(backend, spec_all_modifiers):
+    pdf = pyhf.Model(spec_all_modifiers)
+    tensorlib, _ = backend
+
+    def per_paramset(pars):
+        return [
+            aux
+            for parname in pdf.config.auxdata_order
+            for aux in pyhf.tensorlib.tolist(
+                pdf.config.param_set(parname).expected_data(
+                    tensorlib.astensor(pars[pdf.config.par_slice(parname)])
+                )
+            )
+        ]
+
+    init = pdf.config.suggested_init()
+    shifted = [v * 1.3 + 0.1 for v in init]
+    assert pyhf.tensorlib.tolist(
+        pdf.expected_auxdata(tensorlib.astensor(shifted))
+    ) == pytest.approx(per_paramset(shifted))
+    assert pyhf.tensorlib.tolist(
+        pdf.expected_auxdata(tensorlib.astensor([init, shifted]))
+    ) == [pytest.approx(per_paramset(init)), pytest.approx(per_paramset(shifted))]
+
+
+@pytest.mark.skip_mxnet
+def test_pdf_fused_constraints(backend, spec_all_modifiers):
+    pdf = pyhf.Model(spec_all_modifiers)
+    tensorlib, _ = backend
+    auxdata = tensorlib.astensor(pdf.config.auxdata)
+    init = pdf.config.suggested_init()
+    shifted = [v * 1.1 + 0.05 for v in init]
+
+    def separate(pars):
+        pars = tensorlib.astensor(pars)
+        return pyhf.tensorlib.tolist(
+            pdf.constraints_gaussian.logpdf(auxdata, pars)
+            + pdf.constraints_poisson.logpdf(auxdata, pars)
+        )
+
+    fused = pdf.constraints.logpdf(auxdata, tensorlib.astensor(shifted))
+    assert pyhf.tensorlib.tolist(fused) == pytest.approx(separate(shifted))
+    assert pyhf.tensorlib.tolist(
+        pdf.constraints.logpdf(auxdata, tensorlib.astensor([init, shifted]))
+    ) == pytest.approx(separate([init, shifted]))
+
+    # without the constant terms, only the normalization is missing
+    differences = [
+        pyhf.tensorlib.tolist(
+            pdf.constraints.logpdf(auxdata, tensorlib.astensor(pars))
+            - pdf.constraints.logpdf(auxdata, tensorlib.astensor(pars), constants=False)
+        )
+        for pars in [init, shifted]
+    ]
+    assert differences[0] == pytest.approx(differences[1])
+    assert differences[0] != pytest.approx(0.0)
+
+
+@pytest.mark.skip_mxnet
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_compile(backend, spec_all_modifiers, sparse):
+    pdf = pyhf.Model(spec_all_modifiers, sparse=sparse)
+    compiled = pdf.compile()
+    tensorlib, _ = backend
+    assert compiled.config is pdf.config
+
+    data = tensorlib.astensor([0.0, 160.0, 55.0] + pdf.config.auxdata)
+    for shift in [-0.3, 0.0, 0.2]:
+        pars = tensorlib.astensor([v + shift for v in pdf.config.suggested_init()])
+        assert pyhf.tensorlib.tolist(compiled.expected_data(pars)) == pytest.approx(
+            pyhf.tensorlib.tolist(pdf.expected_data(pars))
+        )
+        assert pyhf.tensorlib.tolist(compiled.logpdf(pars, data)) == pytest.approx(
+            pyhf.tensorlib.tolist(pdf.logpdf(pars, data))
+        )
+
+    # batches fall back to the model
+    batch = tensorlib.astensor([pdf.config.suggested_init()] * 2)
+    assert pyhf.tensorlib.tolist(compiled.logpdf(batch, data)) == pytest.approx(
+        pyhf.tensorlib.tolist(pdf.logpdf(batch, data))
+    )
+
+    pars = tensorlib.astensor(pdf.config.suggested_init())
+    assert pyhf.tensorlib.tolist(compiled.bind(data).logpdf(pars)) == pytest.approx(
+        pyhf.tensorlib.tolist(pdf.logpdf(pars, data))
+    )
+
+
+def test_pdf_fold_constants():
+    spec = {
+        'channels': [
+            {
+                'name': 'channel1',
+                'samples': [
+                    {
+                        'name': 'signal',
+                        'data': [10.0, 20.0],
+                        'modifiers': [
+                            {'name': 'mu', 'type': 'normfactor', 'data': None},
+                            {
+                                'name': 'sig_norm',
+                                'type': 'normsys',
+                                'data': {'lo': 1.0, 'hi': 1.0},
+                            },
+                        ],
+                    },
+                    {
+                        'name': 'background',
+                        'data': [100.0, 150.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_histo',
+                                'type': 'histosys',
+                                'data': {
+                                    'lo_data': [100.0, 150.0],
+                                    'hi_data': [100.0, 150.0],
+                                },
+                            }
+                        ],
+                    },
+                    {'name': 'fakes', 'data': [5.0, 6.0], 'modifiers': []},
+                ],
+            },
+            {
+                'name': 'channel2',
+                'samples': [
+                    {
+                        'name': 'background',
+                        'data': [50.0],
+                        'modifiers': [
+                            {
+                                'name': 'bkg_histo',
+                                'type': 'histosys',
+                                'data': {'lo_data': [45.0], 'hi_data': [55.0]},
+                            }
+                        ],
+                    }
+                ],
+            },
+        ]
+    }
+    pdf = pyhf.Model(spec)
+    folded = pyhf.Model(spec, fold_constants=True)
+    assert folded.folded == {
+        'modifiers': [
+            ('channel1', 'background', 'histosys', 'bkg_histo'),
+            ('channel1', 'signal', 'normsys', 'sig_norm'),
+        ],
+        'samples': [('channel1', 'background'), ('channel1', 'fakes')],
+        'combined': ['normsys/sig_norm'],
+    }
+    assert sorted(folded.config.samples) == ['background', 'signal']
+    assert folded.config.par_order == pdf.config.par_order
+    assert folded.config.auxdata == pdf.config.auxdata
+
+    data = [120.0, 180.0, 48.0] + pdf.config.auxdata
+    for shift in [-0.3, 0.2, 1.4]:
+        pars = [v + shift for v in pdf.config.suggested_init()]
+        assert folded.expected_data(pars).tolist() == pytest.approx(
+            pdf.expected_data(pars).tolist()
+        )
+        assert folded.logpdf(pars, data).tolist() == pytest.approx(
+            pdf.logpdf(pars, data).tolist()
+        )
+
+    with pytest.raises(pyhf.exceptions.InvalidModel):
+        folded.update_sample('channel1', 'signal', data=[1.0, 2.0])
+    folded.update_sample('channel2', 'background', data=[60.0])
+    pdf.update_sample('channel2', 'background', data=[60.0])
+    pars = pdf.config.suggested_init()
+    assert folded.expected_actualdata(pars).tolist() == pytest.approx(
+        pdf.expected_actualdata(pars).tolist()
+    )
+
+    # without any uncertainties, a shapesys is fixed and can only be folded
+    spec['channels'][0]['samples'][2]['modifiers'] = [
+        {'name': 'fakes_shape', 'type': 'shapesys', 'data': [0.0, 0.0]}
+    ]
+    folded = pyhf.Model(spec, fold_constants=True)
+    assert 'shapesys/fakes_shape' in folded.folded['combined']
+    assert sorted(
+        folded.expected_actualdata(folded.config.suggested_init()).tolist()
+    ) == pytest.approx([50.0, 115.0, 176.0])
+
+
+@pytest.mark.parametrize('sparse', [False, True], ids=['dense', 'sparse'])
+def test_pdf_merge_samples(sparse):
+    def background(name, data, modifiers):
+        return {
+            'name': name,
+            'data': data,
+            'modifiers': [
+                {'name': 'lumi', 'type': 'lumi', 'data': None},
+                {'name': 'stat', 'type': 'staterror', 'data': [1.0, 2.0]},
+            ]
+            + modifiers,
+        }
+
+    spec = {
+        'channels': [
+            {
+                'name': 'channel',
+                'samples': [
+                    {
+                        'name': 'signal',
+                        'data': [10.0, 20.0],
+                        'modifiers': [
+                            {'name': 'mu', 'type': 'normfactor', 'data': None},
+                            {'name': 'lumi', 'type': 'lumi', 'data': None},
+                        ],
+                    },
+                    background(
+                        'diboson',
+                        [30.0, 10.0],
+                        [
+                            {
+                                'name': 'jes',
+                                'type': 'histosys',
+                                'data': {
+                                    'lo_data': [28.0, 9.0],
+                                    'hi_data': [33.0, 12.0],
+                                },
+                            }
+                        ],
+                    ),
+                    background('ttV', [5.0, 0.0], []),
+                    background(
+                        'ttbar',
+                        [100.0, 80.0],
+                        [{'name': 'ttbar_shape', 'type': 'shapesys', 'data': [5, 4]}],
+                    ),
+                ],
+            }
+        ],
+        'parameters': [
+            {
+                'name': 'lumi',
+                'auxdata': [1.0],
+                'sigmas': [0.05],
+                'bounds': [[0.5, 1.5]],
+                'inits': [1.0],
+            }
+        ],
+    }
+    pdf = pyhf.Model(spec, sparse=sparse)
+    merged = pyhf.Model(spec, sparse=sparse, merge_samples=True)
+    assert merged.merged == [('channel', 'diboson', ['diboson', 'ttV'])]
+    assert sorted(merged.config.samples) == ['diboson', 'signal', 'ttbar']
+    assert merged.config.par_order == pdf.config.par_order
+    assert merged.config.auxdata == pytest.approx(pdf.config.auxdata)
+
+    for shift in [-0.3, 0.2, 1.4]:
+        pars = [v + shift for v in pdf.config.suggested_init()]
+        assert merged.expected_data(pars).tolist() == pytest.approx(
+            pdf.expected_data(pars).tolist()
+        )
+
+    with pytest.raises(pyhf.exceptions.InvalidModel):
+        merged.update_sample('channel', 'ttV', data=[1.0, 2.0])
+    merged.update_sample('channel', 'signal', data=[1.0, 2.0])
+    pdf.update_sample('channel', 'signal', data=[1.0, 2.0])
+    pars = pdf.config.suggested_init()
+    assert merged.expected_data(pars).tolist() == pytest.approx(
+        pdf.expected_data(pars).tolist()
+    )
+
+
+def test_expected_data_buffers_do_not_alias(backend):
+    pdf = pyhf.simplemodels.hepdata_like([5.0, 6.0], [50.0, 52.0], [3.0, 4.0])
+    init = pdf.config.suggested_init()
+    first = pyhf.tensorlib.tolist(pdf.expected_actualdata(init))
+    result = pdf.expected_actualdata(init)
+    pars = list(init)
+    pars[pdf.config.poi_index] = 2.0
+    pars[pdf.config.par_slice('uncorr_bkguncrt').start] = 1.2
+    pdf.expected_actualdata(pars)
+    assert pyhf.tensorlib.tolist(result) == pytest.approx(first)
+    assert pyhf.tensorlib.tolist(pdf.expected_actualdata(init)) == pytest.approx(first)
+
+
+def test_logpdf_conversions():
+    pyhf.set_backend(pyhf.tensor.numpy_backend())
+    pdf = pyhf.simplemodels.hepdata_like([5.0, 6.0], [50.0, 52.0], [3.0, 4.0])
+    pars = pyhf.tensorlib.astensor(pdf.config.suggested_init())
+    data = pyhf.tensorlib.astensor([51.0, 48.0] + pdf.config.auxdata)
+    conversions = pyhf.tensorlib.conversions
+    pdf.logpdf(pars, data)
+    assert pyhf.tensorlib.conversions == conversions
+    pdf.logpdf(pyhf.tensorlib.tolist(pars), pyhf.tensorlib.tolist(data))
+    assert pyhf.tensorlib.conversions == conversions + 2
+
+
+@pytest.mark.skip_mxnet
+def test_logpdf_precision(backend):
+    tb = pyhf.tensorlib
+    kwargs = {'session': tb.session} if tb.name == 'tensorflow' else {}
+    single = type(tb)(precision='32b', **kwargs)
+    double = type(tb)(precision='64b', **kwargs)
+    pdf = pyhf.simplemodels.hepdata_like([5.0, 6.0], [50.0, 52.0], [3.0, 4.0])
+    pars = pdf.config.suggested_init()
+    data = [51.0, 48.0] + pdf.config.auxdata
+    pyhf.set_backend(double)
+    expected = pyhf.tensorlib.tolist(pdf.logpdf(pars, data))
+
+    pyhf.set_backend(single)
+    assert pdf.expected_actualdata(pars).dtype == single.astensor([1.0]).dtype
+    result = pdf.logpdf(pars, data)
+    # the terms and sums of the log-likelihood are in double precision
+    assert result.dtype == double.astensor([1.0]).dtype
+    assert pyhf.tensorlib.tolist(result) == pytest.approx(expected, rel=1e-6)
+
+
+def test_backend_caches():
+    pdf = pyhf.simplemodels.hepdata_like([5.0, 6.0], [50.0, 52.0], [3.0, 4.0])
+    pars = pdf.config.suggested_init()
+    data = [51.0, 48.0] + pdf.config.auxdata
+    shapesys = pdf.modifiers_appliers['shapesys']
+    mask = shapesys.shapesys_mask
+    expected = pyhf.tensorlib.tolist(pdf.logpdf(pars, data))
+
+    # the tensors of another backend are only built on first use
+    pyhf.set_backend(pyhf.tensor.numpy_backend(precision='32b'))
+    assert 'shapesys_mask' not in shapesys.__dict__
+    assert pyhf.tensorlib.tolist(pdf.logpdf(pars, data)) == pytest.approx(
+        expected, rel=1e-6
+    )
+    assert shapesys.shapesys_mask.dtype == np.float32
+    mask_32b = shapesys.shapesys_mask
+
+    # and kept when switching back and forth
+    pyhf.set_backend(pyhf.tensor.numpy_backend())
+    assert shapesys.shapesys_mask is mask
+    pyhf.set_backend(pyhf.tensor.numpy_backend(precision='32b'))
+    assert shapesys.shapesys_mask is mask_32b
+
+    # changing the data rebuilds them, for the other backends on first use
+    weights = pdf.constraints.weights
+    pdf.update_sample('singlechannel', 'background', data=[60.0, 62.0])
+    assert pdf.constraints.weights is not weights
+    pyhf.set_backend(pyhf.tensor.numpy_backend())
+    assert 'weights' not in pdf.constraints.__dict__
+    assert pdf.constraints.weights.dtype == np.float64
@@ -1,6 +1,8 @@
+import gc
 import pytest
 import numpy as np
 import pyhf
+import weakref
 from pyhf.simplemodels import hepdata_like
 
 
@@ -190,6 +192,91 @@ def test_einsum(backend):
         )
 
 
+def test_out_buffers(backend):
+    tb = pyhf.tensorlib
+    a = tb.astensor([[1, 2, 3], [4, 5, 6]])
+    out = tb.buffer((3,), name='test_out_buffers')
+    assert tb.tolist(tb.sum(a, axis=0, out=out)) == [5, 7, 9]
+    assert tb.tolist(tb.product(a, axis=0, out=out)) == [4, 10, 18]
+    assert tb.tolist(
+        tb.where(
+            tb.astensor([1, 0, 1]), tb.astensor([1, 1, 1]), tb.astensor([2, 2, 2]), out
+        )
+    ) == [1, 2, 1]
+    stacked = tb.stack(
+        [tb.astensor([1, 2, 3]), tb.astensor([4, 5, 6])], out=tb.buffer((2, 3))
+    )
+    assert tb.tolist(stacked) == [[1, 2, 3], [4, 5, 6]]
+    concatenated = tb.concatenate(
+        [tb.astensor([1, 2]), tb.astensor([3, 4])], out=tb.buffer((4,))
+    )
+    assert tb.tolist(concatenated) == [1, 2, 3, 4]
+    if out is None:
+        return
+    # the numpy buffers are pooled and written to in place
+    assert tb.buffer((3,), name='test_out_buffers') is out
+    assert tb.buffer((3,), name='other') is not out
+    assert tb.buffer((3,), dtype='int', name='test_out_buffers') is not out
+    assert tb.sum(a, axis=0, out=out) is out
+    assert tb.einsum('ij->j', a, out=out) is out
+    assert tb.tolist(out) == [5, 7, 9]
+
+
+def test_out_buffers_owner():
+    tb = pyhf.tensor.numpy_backend()
+
+    class Owner(object):
+        pass
+
+    owner = Owner()
+    out = tb.buffer((3,), name='test_out_buffers', owner=owner)
+    assert tb.buffer((3,), name='test_out_buffers', owner=owner) is out
+    assert tb.buffer((3,), name='test_out_buffers') is not out
+    assert tb.buffer((3,), name='test_out_buffers', owner=Owner()) is not out
+    # the buffers are dropped together with their owner
+    out = weakref.ref(out)
+    del owner
+    gc.collect()
+    assert out() is None
+
+
+def test_astensor_no_copy(backend):
+    tb = pyhf.tensorlib
+    tensor = tb.astensor([1.0, 2.0, 3.0])
+    conversions = tb.conversions
+    assert tb.astensor(tensor) is tensor
+    assert tb.conversions == conversions
+    tb.astensor(tensor, dtype='int')
+    tb.astensor([1.0, 2.0])
+    assert tb.conversions == conversions + 2
+
+
+def test_precision(backend):
+    tb = pyhf.tensorlib
+    kwargs = {'session': tb.session} if tb.name == 'tensorflow' else {}
+    single = type(tb)(precision='32b', **kwargs)
+    double = type(tb)(precision='64b', **kwargs)
+    # the dtypes as the tensors of the backend report them
+    float32 = single.astensor([1.0]).dtype
+    float64 = double.astensor([1.0]).dtype
+    assert float32 != float64
+    assert (
+        single.astensor([1], dtype='int').dtype
+        != double.astensor([1], dtype='int').dtype
+    )
+    assert single.ones((2,)).dtype == float32
+    assert single.accumulate(single.astensor([1.0, 2.0])).dtype == float64
+    # the terms of a log-likelihood are in double precision as well
+    assert single.poisson_logpdf([5.0], [6.0]).dtype == float64
+    assert single.normal_logpdf([0.5], [0.0], [1.0]).dtype == float64
+    assert single.tolist(single.poisson_logpdf([5.0], [6.0])) == pytest.approx(
+        double.tolist(double.poisson_logpdf([5.0], [6.0])), rel=1e-12
+    )
+    assert pyhf.tensor.numpy_backend().astensor([1.0]).dtype == np.float64
+    with pytest.raises(ValueError):
+        type(tb)(precision='16b')
+
+
 def test_list_to_list(backend):
     tb = pyhf.tensorlib
     # test when no other tensor operations are done
@@ -132,3 +132,151 @@ def test_hypotest_return_test_statistics(tmpdir, hypotest_args):
     assert check_uniform_type(result[3])
     assert len(result[4]) == 2
     assert check_uniform_type(result[4])
+
+
+@pytest.fixture(scope='module')
+def histosys_args():
+    # the conditional fits of this model end at negative rates when they are
+    # started from the global fit
+    pdf = pyhf.Model(
+        {
+            'channels': [
+                {
+                    'name': 'singlechannel',
+                    'samples': [
+                        {
+                            'name': 'signal',
+                            'data': [30.0, 95.0],
+                            'modifiers': [
+                                {'name': 'mu', 'type': 'normfactor', 'data': None}
+                            ],
+                        },
+                        {
+                            'name': 'background',
+                            'data': [100.0, 150.0],
+                            'modifiers': [
+                                {
+                                    'name': 'bkg_norm',
+                                    'type': 'histosys',
+                                    'data': {
+                                        'lo_data': [98.0, 100.0],
+                                        'hi_data': [102.0, 190.0],
+                                    },
+                                }
+                            ],
+                        },
+                    ],
+                }
+            ]
+        }
+    )
+    data = [120.0, 180.0] + pdf.config.auxdata
+    return 1.0, data, pdf
+
+
+@pytest.mark.parametrize('args', ['hypotest_args', 'histosys_args'])
+def test_hypotest_warm_start(request, args):
+    """
+    Check that fits started from the best fits of a previous call find the
+    same results as fits started from the initial values, and that
+    pyhf.utils.hypotest_scan chains them
+    """
+    _, data, pdf = request.getfixturevalue(args)
+    poi_tests = [0.5, 1.0, 1.5]
+    # all fits are done, none is taken from the cache
+    cold = [
+        [
+            float(x)
+            for x in pyhf.utils.hypotest(
+                poi_test, data, pdf, fit_cache=False, return_expected=True
+            )
+        ]
+        for poi_test in poi_tests
+    ]
+
+    warm_start = {}
+    CLs = pyhf.utils.hypotest(1.0, data, pdf, warm_start=warm_start, fit_cache=False)
+    assert float(CLs) == pytest.approx(cold[1][0], rel=1e-6)
+    assert sorted(warm_start) == ['asimov', 'asimov_data', 'observed']
+    assert sorted(warm_start['observed']) == ['constrained', 'unconstrained']
+    assert warm_start['observed']['constrained'][pdf.config.poi_index] == 1.0
+    CLs = pyhf.utils.hypotest(1.0, data, pdf, warm_start=warm_start, fit_cache=False)
+    assert float(CLs) == pytest.approx(cold[1][0], rel=1e-6)
+
+    scan = pyhf.utils.hypotest_scan(
+        poi_tests, data, pdf, fit_cache=False, return_expected=True
+    )
+    for result, expected in zip(scan, cold):
+        assert [float(x) for x in result] == pytest.approx(expected, rel=1e-6)
+
+
+def test_fit_cache(hypotest_args):
+    """
+    Check that the fits that do not depend on the tested POI value are only
+    done once in a scan, and that the least recently used fits are evicted
+    """
+    _, data, pdf = hypotest_args
+    pyhf.utils.fit_cache.clear()
+    CLs = pyhf.utils.hypotest_scan([0.5, 1.0, 1.5], data, pdf)
+    # the first point needs all five fits, the others only the conditional
+    # fits to the observed and the Asimov data
+    assert pyhf.utils.fit_cache.misses == 5 + 2 * 2
+    assert pyhf.utils.fit_cache.hits == 2 * 3
+    assert pyhf.utils.hypotest(1.0, data, pdf) == CLs[1]
+    assert pyhf.utils.fit_cache.misses == 9
+
+    cache = pyhf.utils.FitCache(maxsize=2)
+    for key in ['a', 'b', 'c']:
+        cache.put(key, key)
+    assert len(cache) == 2 and cache.get('a') is None
+    assert cache.get('b') == 'b'
+    cache.put('d', 'd')
+    assert cache.get('c') is None and cache.get('b') == 'b'
+
+
+def test_fit_cache_set_poi():
+    pdf = pyhf.Model(
+        {
+            'channels': [
+                {
+                    'name': 'singlechannel',
+                    'samples': [
+                        {
+                            'name': 'signal_a',
+                            'data': [10.0, 5.0],
+                            'modifiers': [
+                                {'name': 'a', 'type': 'normfactor', 'data': None}
+                            ],
+                        },
+                        {
+                            'name': 'signal_b',
+                            'data': [4.0, 9.0],
+                            'modifiers': [
+                                {'name': 'b', 'type': 'normfactor', 'data': None}
+                            ],
+                        },
+                        {'name': 'background', 'data': [50.0, 52.0], 'modifiers': []},
+                    ],
+                }
+            ]
+        },
+        poiname='a',
+    )
+    data = [60.0, 62.0] + pdf.config.auxdata
+    pyhf.utils.fit_cache.clear()
+    CLs_a = pyhf.utils.hypotest(1.0, data, pdf)
+    pdf.config.set_poi('b')
+    CLs_b = pyhf.utils.hypotest(1.0, data, pdf)
+    assert float(CLs_b) != pytest.approx(float(CLs_a), rel=1e-3)
+    assert pyhf.utils.fit_cache.hits == 0
+    assert float(CLs_b) == float(pyhf.utils.hypotest(1.0, data, pdf, fit_cache=False))
+
+
+def test_fit_cache_update_sample():
+    pdf = pyhf.simplemodels.hepdata_like(
+        signal_data=[12.0, 11.0], bkg_data=[50.0, 52.0], bkg_uncerts=[3.0, 7.0]
+    )
+    key = pdf.compiled_key()
+    assert pdf.compiled_key() == key
+    pdf.update_sample('singlechannel', 'signal', data=[6.0, 5.5])
+    assert pdf.compiled_key() != key
@@ -701,11 +701,13 @@ def validate_hypotest(pdf, data, mu_test, expected_result, tolerance=1e-6):
     'setup_and_tolerance',
     [
         (setup_1bin_shapesys(), 1e-6),
-        (setup_1bin_lumi(), 1e-6),
-        (setup_1bin_normsys(), 1e-6),
+        # the exact minima of the fits are up to 1e-5 (lumi), 1.5e-4 (normsys)
+        # and 1e-4 (couplednorm) from the reference values
+        (setup_1bin_lumi(), 1.5e-5),
+        (setup_1bin_normsys(), 2e-4),
         (setup_2bin_histosys(), 8e-5),
         (setup_2bin_2channel(), 1e-6),
-        (setup_2bin_2channel_couplednorm(), 1e-6),
+        (setup_2bin_2channel_couplednorm(), 1.5e-4),
         (setup_2bin_2channel_coupledhistosys(), 1e-6),
         (setup_2bin_2channel_coupledshapefactor(), 2.5e-6),
     ],